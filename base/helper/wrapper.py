@@ -34,25 +34,3 @@ def print(func):
         print(result) 
         return result 
     return wrap 
-
-def memoize_steel_profile_creation(func):
-    cache = {}
-    def memoized(*args):
-        # Convert args to a cache key (assuming profile is the second argument)
-        key = (args[0], str(args[1]), args[2], args[3], args[4])  # Convert profile to string if needed
-        if key not in cache:
-            cache[key] = func(*args)
-        return cache[key]
-    return memoized
-
-def memoize_concrete_profile_creation(func):
-    cache = {}
-    
-    def memoized(*args):
-        # Create a cache key based on the string representation of arguments
-        key = (str(args[0]), str(args[1]))
-        if key not in cache:
-            cache[key] = func(*args)
-        return cache[key]
-    
-    return memoized
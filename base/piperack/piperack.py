@@ -72,6 +72,9 @@ class PiperackStructure:
         self.portal_beam_dict = None
         self.portal_tier_beams = None
 
+        # Model snapshot the categorisation was built from
+        self.snapshot = None
+
 class Piperack:
     def __init__(self,name = 'MPR'):
         self.name = name        
@@ -128,10 +131,12 @@ class Piperack:
         with open(filename, 'rb') as file:
             return pickle.load(file)
 
-    def generate_structural_components(self, geometry,property):
+    def generate_structural_components(self, geometry,property,snapshot=None):
         """
         Generates structural components and their IDs based on the piperack configuration.
         Returns a PiperackStructure object with all components as properties.
+
+        Pass an existing ModelSnapshot to reuse it instead of reading the model again.
         """
         structure = PiperackStructure()
         
@@ -199,8 +204,10 @@ class Piperack:
         structure.portal_z_set = set(portal_zs)
         
         # Get nodes and beams from geometry
-        nodes = get_node_incidences(geometry=geometry)
-        beam_objects = get_beam_objects(geometry=geometry, property=property, nodes=nodes)
+        if snapshot is None:
+            snapshot = get_model_snapshot(geometry=geometry, property=property)
+        structure.snapshot = snapshot
+        beam_objects = snapshot.as_beams()
         
         tier_elevations = [tier.base.y for tier in self.tiers]
         portal_zs = [portal.base.z for portal in portals]
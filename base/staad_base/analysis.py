@@ -0,0 +1,242 @@
+import os
+import time
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future
+from base.staad_base.root import *
+from base.staad_base.anl_parser import AnlParser
+
+_run_ids = itertools.count(1)
+_listeners = []
+_last_run = None
+
+def on_analysis_complete(listener) -> None:
+    """Call listener(run) after every AnalysisRun finishes, e.g. to drop result caches of the previous run."""
+    _listeners.append(listener)
+
+def remove_analysis_listener(listener) -> None:
+    if(listener in _listeners):
+        _listeners.remove(listener)
+
+def last_analysis_run() -> 'AnalysisRun':
+    """The most recently finished run of this Python session, None before the first one."""
+    return _last_run
+
+def anl_path(std_path: str):
+    """Output file STAAD writes next to the input, whichever case the extension has on disk."""
+    if(not std_path):
+        return None
+    stem = os.path.splitext(std_path)[0]
+    for ext in ('.ANL', '.anl'):
+        if(os.path.exists(stem + ext)):
+            return stem + ext
+    return stem + '.ANL'
+
+def results_probe(file_name=get_staad_file_name) -> tuple:
+    """
+    (model path, .ANL mtime, .ANL size): one GetSTAADFile call and a stat. It changes whenever
+    STAAD writes new results, also for analyses started from the STAAD window, and when
+    another model is opened; result caches compare it to decide whether they are stale.
+    """
+    path = file_name() if file_name else None
+    output = anl_path(path)
+    if(output and os.path.exists(output)):
+        stat = os.stat(output)
+        return path, stat.st_mtime, stat.st_size
+    return path, None, None
+
+class AnalysisRun(Future):
+    """
+    Future of one STAAD analysis; the result is the final AnalysisStatus.
+
+    Attributes:
+        run_id (int): Increases with every run of the session; result caches key on it.
+        file_name (str): STAAD input that was analysed.
+        progress (float): 0..1 from the input lines STAAD has echoed to the output file, None without one.
+        polls (int): IsAnalyzing calls made.
+        return_value: What AnalyzeEx returned.
+        results (AnlResults): Output file contents when the run was started with parse_output.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.run_id = next(_run_ids)
+        self.file_name = None
+        self.progress = None
+        self.polls = 0
+        self.return_value = None
+        self.results = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self) -> float:
+        if(self.started is None):
+            return 0.0
+        return (self.finished if self.finished is not None else time.perf_counter()) - self.started
+
+    def __await__(self):
+        return asyncio.wrap_future(self).__await__()
+
+    def __repr__(self):
+        state = 'running' if not self.done() else self.result().name if self.exception() is None else 'failed'
+        return f"AnalysisRun(run_id={self.run_id}, {state}, {self.elapsed:.2f} s, polls={self.polls})"
+
+class _OutputTail:
+    """Reads what STAAD appended to the output file since the last look."""
+
+    def __init__(self, path: str, started_at: float, parser: AnlParser):
+        self.path = path
+        self.started_at = started_at
+        self.parser = parser
+        self.offset = 0
+
+    def read(self) -> bool:
+        """True when the file grew."""
+        try:
+            stat = os.stat(self.path)
+        except (OSError, TypeError):
+            return False
+        # a file older than the run is the previous output, not yet replaced by STAAD
+        if(stat.st_mtime < self.started_at - 1 or stat.st_size == self.offset):
+            return False
+        if(stat.st_size < self.offset):
+            self.offset = 0
+            self.parser = AnlParser()
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            f.seek(self.offset)
+            text = f.read()
+            self.offset = f.tell()
+        self.parser.feed(text)
+        return True
+
+class AnalysisRunner:
+    """
+    Runs the STAAD analysis without blocking, polling IsAnalyzing with adaptive back-off.
+
+    The first poll comes after first_interval; every poll that finds the solver still
+    busy stretches the wait by backoff up to max_interval, and output written in the
+    meantime shrinks it again, so short runs are noticed within a few tens of ms
+    instead of a fixed 5 s tick. start() polls on its own thread (with its own COM
+    apartment via the connection manager) and returns an AnalysisRun future at once.
+
+    Example:
+        run = AnalysisRunner().start(on_progress=lambda run: print(f"{run.progress or 0:.0%}"))
+        candidates = optimiser.prepare_next()       # CPU work while the solver runs
+        status = run.result()                       # or: status = await run
+    """
+
+    def __init__(self, connection: StaadConnection = None, first_interval: float = 0.05,
+                 max_interval: float = 2.0, backoff: float = 1.5):
+        self.connection = connection if connection is not None else get_connection()
+        self.first_interval = first_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+    def _execute(self, openSTAAD, run: AnalysisRun, silent: int, hidden: int, on_progress, parse_output: bool,
+                 wait: int = 0) -> AnalysisStatus:
+        run.file_name = get_staad_file_name(openSTAAD)
+        output = None
+        total_lines = 0
+        if(on_progress is not None or parse_output):
+            output = _OutputTail(anl_path(run.file_name), time.time(), AnlParser())
+            try:
+                with open(run.file_name, 'rb') as f:
+                    total_lines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+            except (OSError, TypeError):
+                pass
+
+        openSTAAD.SetSilentMode(silent)
+        run.started = time.perf_counter()
+        run.return_value = openSTAAD.AnalyzeEx(silent, hidden, wait)
+
+        interval = self.first_interval
+        while True:
+            time.sleep(interval)
+            run.polls += 1
+            analyzing = openSTAAD.IsAnalyzing()
+            grew = output.read() if output is not None else False
+            if(grew and total_lines):
+                run.progress = min(1.0, output.parser.input_line / total_lines)
+            if(on_progress is not None and (grew or not analyzing)):
+                on_progress(run)
+            if(not analyzing):
+                break
+            interval = max(self.first_interval, interval / self.backoff) if grew else min(self.max_interval, interval * self.backoff)
+
+        if(output is not None):
+            output.read()
+            run.results = output.parser.close()
+        return self._status(openSTAAD, run)
+
+    def _status(self, openSTAAD, run: AnalysisRun) -> AnalysisStatus:
+        status = None
+        try:
+            status = openSTAAD.GetAnalysisStatus()
+        except Exception:
+            pass
+        if(status in AnalysisStatus._value2member_map_):
+            return AnalysisStatus(status)
+        # STAAD without GetAnalysisStatus: judge from the output file when it was read
+        if(run.results is not None):
+            if(run.results.errors):
+                return AnalysisStatus.COMPLETED_WITH_ERRORS
+            if(run.results.warnings):
+                return AnalysisStatus.COMPLETED_WITH_WARNINGS
+        return AnalysisStatus.COMPLETED_SUCCESS
+
+    def _complete(self, run: AnalysisRun, status=None, exc: BaseException = None) -> None:
+        global _last_run
+        run.finished = time.perf_counter()
+        if(exc is not None):
+            run.set_exception(exc)
+            return
+        _last_run = run
+        run.set_result(status)
+        for listener in list(_listeners):
+            try:
+                listener(run)
+            except Exception as e:
+                print(f"Analysis listener {listener!r} failed: {e}")
+
+    def start(self, silent: int = 1, hidden: int = 0, on_progress=None, parse_output: bool = False) -> AnalysisRun:
+        """
+        Start the analysis and return straight away.
+
+        Args:
+            on_progress (callable, optional): on_progress(run) whenever the output file grew and at the end.
+            parse_output (bool): Parse the output file while it is written; run.results holds it afterwards.
+        """
+        run = AnalysisRun()
+        run.set_running_or_notify_cancel()
+
+        def target():
+            try:
+                self._complete(run, self._execute(self.connection.openSTAAD(), run, silent, hidden, on_progress, parse_output))
+            except BaseException as e:
+                self._complete(run, exc=e)
+            finally:
+                self.connection.close()
+
+        threading.Thread(target=target, name=f'staad-analysis-{run.run_id}', daemon=True).start()
+        return run
+
+    def run(self, openSTAAD=None, silent: int = 1, hidden: int = 0, on_progress=None, parse_output: bool = False,
+            wait: int = 0) -> AnalysisRun:
+        """
+        Blocking variant on the calling thread, with the given application object or this thread's connection.
+        wait is AnalyzeEx's own flag: 1 lets STAAD return only when the solver is done, before the first poll.
+        """
+        run = AnalysisRun()
+        run.set_running_or_notify_cancel()
+        openSTAAD = openSTAAD if openSTAAD is not None else self.connection.openSTAAD()
+        try:
+            self._complete(run, self._execute(openSTAAD, run, silent, hidden, on_progress, parse_output, wait))
+        except BaseException as e:
+            self._complete(run, exc=e)
+            raise
+        return run
+
+    async def run_async(self, silent: int = 1, hidden: int = 0, on_progress=None, parse_output: bool = False) -> AnalysisStatus:
+        return await self.start(silent, hidden, on_progress, parse_output)
@@ -0,0 +1,300 @@
+import os
+import re
+import numpy as np
+from base.staad_base.result_tensor import *
+
+# "  2204. PERFORM ANALYSIS PRINT STATICS CHECK": STAAD echoes every input line it processes
+ECHO_LINE = re.compile(r'^\s*(\d+)\.\s(.*)$')
+UNITS_LINE = re.compile(r'ALL UNITS ARE\s*-+\s*(.+?)\s*(\(|$)')
+WARNING_LINE = re.compile(r'\*\*+\s*WARNING|WARNING\s*\*\*', re.IGNORECASE)
+ERROR_LINE = re.compile(r'\*\*+\s*ERROR|ERROR\s*\*\*', re.IGNORECASE)
+END_OF_RUN = re.compile(r'END OF (THE )?STAAD', re.IGNORECASE)
+DESIGN_HEADER = re.compile(r'MEMBER\s+TABLE\s+RESULT')
+# classic check table: "*     15 ST   WPB600X300X177.77   (UPN SECTIONS)"
+DESIGN_MEMBER = re.compile(r'^\s*(\*?)\s*(\d+)\s+(ST|D|TA|LD|SD|T|CM|TC|BC|FR|SA|ST\w*)\s+(.+?)\s*(\(.*\))?\s*$')
+# boxed check table of newer releases: "|  Member No:  15   Profile:  ST  ISMB300  (INDIAN SECTIONS)  |"
+BOX_FIELD = re.compile(r'(Member No|Profile|Status|Ratio|Loadcase|Ref|Location)\s*:\s*(.+?)(?=\s{2,}\w[\w ]*:|\s*\|?\s*$)')
+
+class SteelDesignTable:
+    """Steel check results by member, the last check of a member wins (e.g. after SELECT).
+
+    Attributes:
+        members (np.ndarray): int32 member numbers.
+        ratios (np.ndarray): float64 critical ratio.
+        cases (np.ndarray): int32 governing load case.
+        clauses, statuses, sections (list[str]): Governing clause, 'PASS' / 'FAIL', section name.
+    """
+
+    def __init__(self, rows: dict):
+        members = sorted(rows)
+        self.members = np.array(members, dtype=np.int32)
+        self.ratios = np.array([rows[m]['ratio'] for m in members], dtype=np.float64)
+        self.cases = np.array([rows[m]['case'] for m in members], dtype=np.int32)
+        self.clauses = [rows[m]['clause'] for m in members]
+        self.statuses = [rows[m]['status'] for m in members]
+        self.sections = [rows[m]['section'] for m in members]
+        self.index = {member: row for row, member in enumerate(members)}
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, member_no):
+        return int(member_no) in self.index
+
+    def ratio(self, member_no) -> float:
+        return float(self.ratios[self.index[int(member_no)]])
+
+    def row(self, member_no) -> dict:
+        row = self.index[int(member_no)]
+        return {'beam': int(self.members[row]), 'critical_ratio': float(self.ratios[row]), 'case': int(self.cases[row]),
+                'clause': self.clauses[row], 'status': self.statuses[row], 'section': self.sections[row]}
+
+    def failing(self, limit: float = 1.0) -> np.ndarray:
+        return self.members[(self.ratios > limit) | np.array([status == 'FAIL' for status in self.statuses], dtype=bool)]
+
+class AnlResults:
+    """What parse_anl / AnlParser read from a STAAD output file.
+
+    Attributes:
+        member_forces (ResultTensor): (members × cases × 12) local end forces, END_FORCE_COMPONENTS.
+        reactions (ResultTensor): (supports × cases × 6) global support reactions, FORCE_COMPONENTS.
+        displacements (ResultTensor): (joints × cases × 6) global joint displacements, DISPLACEMENT_COMPONENTS.
+        design (SteelDesignTable): Steel code check per member.
+        warnings, errors (list): (line number, text).
+        input_line (int): Last input line STAAD echoed, i.e. how far the run got.
+        finished (bool): The END OF STAAD banner was read.
+    """
+
+    def __init__(self, member_forces, reactions, design, warnings, errors, input_line, finished, displacements=None):
+        self.member_forces = member_forces
+        self.reactions = reactions
+        self.displacements = displacements
+        self.design = design
+        self.warnings = warnings
+        self.errors = errors
+        self.input_line = input_line
+        self.finished = finished
+
+class AnlParser:
+    """
+    Incremental parser of STAAD .ANL output.
+
+    feed() takes text in chunks of any size (a partial last line is kept for the next
+    chunk), so a file can be parsed while STAAD is still writing it; results() builds
+    the arrays from what was read so far. Tables are recognised by their headers,
+    repeated page headers inside a table are skipped.
+
+    Example:
+        parser = AnlParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        results = parser.results()
+        results.member_forces.get(37, 101)      # 12 end forces
+    """
+
+    def __init__(self):
+        self.line_no = 0
+        self.input_line = 0
+        self.finished = False
+        self.units = None
+        self.warnings = []
+        self.errors = []
+        self._tail = ''
+        self._state = None
+        self._forces = ([], [], [])
+        self._force_units = None
+        self._reactions = ([], [], [])
+        self._reaction_units = None
+        self._displacements = ([], [], [])
+        self._displacement_units = None
+        self._design = {}
+        self._member = None
+        self._case = None
+        self._end = 0
+        self._pending = None
+
+    def feed(self, text: str) -> None:
+        lines = (self._tail + text).split('\n')
+        self._tail = lines.pop()
+        for line in lines:
+            self._line(line.rstrip('\r'))
+
+    def close(self) -> AnlResults:
+        if(self._tail):
+            self._line(self._tail.rstrip('\r'))
+            self._tail = ''
+        return self.results()
+
+    def _line(self, line: str) -> None:
+        self.line_no += 1
+        stripped = line.strip()
+        if(not stripped):
+            return
+        if(self._state in ('forces', 'reactions', 'displacements') and stripped[0].isdigit()):
+            # fast path for the bulk of a large output: purely numeric table rows
+            values = self._numbers(stripped)
+            if(values is not None):
+                if(self._state == 'forces'):
+                    return self._force_row(values)
+                return self._node_row(values, self._reactions if self._state == 'reactions' else self._displacements)
+        if('UNITS ARE' in stripped):
+            match = UNITS_LINE.search(stripped)
+            if(match):
+                self.units = ' '.join(match.group(1).split())
+            return
+        if('WARNING' in stripped.upper() and WARNING_LINE.search(stripped)):
+            self.warnings.append((self.line_no, stripped))
+            return
+        if('ERROR' in stripped.upper() and ERROR_LINE.search(stripped)):
+            self.errors.append((self.line_no, stripped))
+            return
+
+        upper = stripped.upper()
+        if('MEMBER END FORCES' in upper):
+            self._state, self._member, self._case, self._force_units = 'forces', None, None, None
+            return
+        if('SUPPORT REACTIONS' in upper):
+            self._state, self._member, self._reaction_units = 'reactions', None, None
+            units = upper.split('-UNIT', 1)
+            if(len(units) == 2):
+                self._reaction_units = ' '.join(units[1].split('STRUCTURE')[0].split())
+            return
+        if('JOINT DISPLACEMENT' in upper):
+            # "JOINT DISPLACEMENT (CM   RADIANS)    STRUCTURE TYPE = SPACE"
+            self._state, self._member = 'displacements', None
+            units = upper.split('(', 1)
+            self._displacement_units = units[1].split()[0] if len(units) == 2 and units[1].split() else None
+            return
+        if('CODE CHECKING' in upper or 'MEMBER NO:' in upper or DESIGN_HEADER.search(upper)):
+            if(self._state != 'design'):
+                self._state, self._pending = 'design', None
+            if('MEMBER NO:' not in upper):
+                return
+        if(END_OF_RUN.search(stripped)):
+            self.finished = True
+            self._state = None
+            return
+
+        # table rows start with an integer, never with 'N.', so an echoed input line also ends any table
+        echo = ECHO_LINE.match(line)
+        if(echo):
+            self.input_line = int(echo.group(1))
+            self._state = None
+            return
+
+        if(self._state == 'design'):
+            self._design_row(stripped)
+
+    def _numbers(self, stripped: str):
+        try:
+            return [float(token) for token in stripped.split()]
+        except ValueError:
+            return None
+
+    def _force_row(self, values: list) -> None:
+        # "member case joint 6 forces", "case joint 6 forces" or "joint 6 forces" for the second end
+        if(len(values) < 7 or len(values) > 9):
+            return
+        if(len(values) == 9):
+            self._member, self._case, self._end = int(values[0]), int(values[1]), 0
+        elif(len(values) == 8):
+            self._case, self._end = int(values[0]), 0
+        else:
+            self._end += 1
+        if(self._member is None or self._end > 1):
+            return
+        members, cases, rows = self._forces
+        if(self._end == 0):
+            members.append(self._member)
+            cases.append(self._case)
+            rows.append(values[-6:] + [np.nan] * 6)
+        else:
+            rows[-1][6:] = values[-6:]
+        self._force_units = self._force_units or self.units
+
+    def _node_row(self, values: list, table: tuple) -> None:
+        # "joint case 6 values", then "case 6 values" for the joint's further cases
+        if(len(values) not in (7, 8)):
+            return
+        if(len(values) == 8):
+            self._member = int(values[0])
+        if(self._member is None):
+            return
+        nodes, cases, rows = table
+        nodes.append(self._member)
+        cases.append(int(values[-7]))
+        rows.append(values[-6:])
+
+    def _design_row(self, stripped: str) -> None:
+        if('MEMBER NO:' in stripped.upper() or 'STATUS:' in stripped.upper() or 'REF:' in stripped.upper()):
+            return self._design_box(stripped)
+        match = DESIGN_MEMBER.match(stripped)
+        if(match):
+            self._pending = {'member': int(match.group(2)), 'section': match.group(4).strip()}
+            return
+        if(self._pending is not None):
+            tokens = stripped.split()
+            if(len(tokens) >= 4 and tokens[0].upper() in ('PASS', 'FAIL')):
+                try:
+                    ratio, case = float(tokens[-2]), int(float(tokens[-1]))
+                except ValueError:
+                    self._pending = None
+                    return
+                self._design[self._pending['member']] = {'ratio': ratio, 'case': case, 'status': tokens[0].upper(),
+                                                         'clause': ' '.join(tokens[1:-2]), 'section': self._pending['section']}
+                self._pending = None
+
+    def _design_box(self, stripped: str) -> None:
+        fields = {key.lower(): value.strip() for key, value in BOX_FIELD.findall(stripped.strip('| '))}
+        if('member no' in fields):
+            words = fields['member no'].split()
+            profile = fields.get('profile', '').split('(')[0].split()
+            self._pending = {'member': int(words[0]), 'section': ' '.join(profile[1:] if len(profile) > 1 else profile),
+                             'ratio': 0.0, 'case': 0, 'status': '', 'clause': ''}
+            return
+        if(self._pending is None):
+            return
+        try:
+            if('status' in fields):
+                self._pending['status'] = fields['status'].split()[0].upper()
+            if('ratio' in fields):
+                self._pending['ratio'] = float(fields['ratio'].split()[0])
+            if('loadcase' in fields):
+                self._pending['case'] = int(float(fields['loadcase'].split()[0]))
+            if('ref' in fields):
+                self._pending['clause'] = fields['ref']
+        except ValueError:
+            return
+        if(self._pending['status']):
+            self._design[self._pending['member']] = {key: self._pending[key] for key in ('ratio', 'case', 'status', 'clause', 'section')}
+
+    def results(self) -> AnlResults:
+        members, cases, rows = self._forces
+        forces = ResultTensor.from_rows(members, cases, rows, END_FORCE_COMPONENTS, self._force_units)
+        nodes, reaction_cases, reaction_rows = self._reactions
+        reactions = ResultTensor.from_rows(nodes, reaction_cases, reaction_rows, FORCE_COMPONENTS, self._reaction_units)
+        joints, displacement_cases, displacement_rows = self._displacements
+        displacements = ResultTensor.from_rows(joints, displacement_cases, displacement_rows, DISPLACEMENT_COMPONENTS, self._displacement_units)
+        return AnlResults(forces, reactions, SteelDesignTable(self._design), list(self.warnings), list(self.errors),
+                          self.input_line, self.finished, displacements)
+
+def parse_anl(source, chunk_size: int = 1 << 20) -> AnlResults:
+    """
+    Parse a STAAD .ANL output file chunk by chunk.
+
+    Args:
+        source: Path of the output file, or an open text file.
+        chunk_size (int): Characters read per chunk; memory use does not grow with the file beyond the results.
+
+    Example:
+        results = parse_anl('archive/rev_C/ICPR_E-E.ANL')
+        results.reactions.case(1)          # (supports, 6) for load case 1
+        results.design.failing()
+    """
+    if(isinstance(source, (str, os.PathLike))):
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_anl(f, chunk_size)
+    parser = AnlParser()
+    for chunk in iter(lambda: source.read(chunk_size), ''):
+        parser.feed(chunk)
+    return parser.close()
@@ -0,0 +1,249 @@
+import os
+from collections import defaultdict
+from base.staad_base.root import *
+from base.staad_base.geometry import *
+
+ASSIGNMENT_KINDS = ('profile', 'specification', 'material', 'support')
+
+class AssignmentLedger:
+    """What the planner has assigned in one model: (kind, id) -> value, plus the spec sets per member.
+
+    OpenSTAAD has no getter for specs and only a per-member one for materials, so the ledger is
+    the record those are diffed against. It is scoped to the STAAD file (see
+    get_assignment_ledger), forgets members / nodes that disappear from the model or
+    are created again by GeometryWriter, and is cleared when StdModelBuilder replaces
+    the model.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.specifications = defaultdict(set)
+
+    def forget_missing(self, member_ids=None, node_ids=None) -> None:
+        members = set(int(i) for i in member_ids) if member_ids is not None else None
+        nodes = set(int(i) for i in node_ids) if node_ids is not None else None
+        for kind, id in list(self.values):
+            keep = nodes if kind == 'support' else members
+            if(keep is not None and id not in keep):
+                del self.values[(kind, id)]
+        if(members is not None):
+            for id in [id for id in self.specifications if id not in members]:
+                del self.specifications[id]
+
+    def forget(self, member_ids=(), node_ids=()) -> None:
+        """Drop what was assigned to members / nodes that were created again."""
+        members = set(int(i) for i in member_ids)
+        nodes = set(int(i) for i in node_ids)
+        for kind, id in list(self.values):
+            if(id in (nodes if kind == 'support' else members)):
+                del self.values[(kind, id)]
+        for id in members:
+            self.specifications.pop(id, None)
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.specifications.clear()
+
+_ledgers = {}
+
+def get_assignment_ledger(file_name: str = None) -> AssignmentLedger:
+    """
+    Ledger of the open STAAD file, kept for the life of the Python session (e.g. a notebook kernel).
+    An unsaved model has no file to scope it to and gets a new, empty ledger every time.
+    """
+    file_name = file_name if file_name is not None else get_staad_file_name()
+    if(not file_name):
+        return AssignmentLedger()
+    key = os.path.normcase(os.path.abspath(file_name))
+    ledger = _ledgers.get(key)
+    if(ledger is None):
+        ledger = _ledgers[key] = AssignmentLedger()
+    return ledger
+
+def forget_assignments(member_ids=(), node_ids=()) -> None:
+    """Members / nodes were created (again): nothing any ledger recorded for these numbers holds anymore."""
+    for ledger in _ledgers.values():
+        ledger.forget(member_ids, node_ids)
+
+def clear_assignment_ledger(file_name: str = None) -> None:
+    """The model of file_name was replaced, e.g. rebuilt and opened again; None clears every ledger."""
+    if(file_name is None):
+        _ledgers.clear()
+    else:
+        _ledgers.pop(os.path.normcase(os.path.abspath(file_name)), None)
+
+class AssignmentPlanner:
+    """Desired member / node attributes, applied as one bulk call per distinct value.
+
+    Collect the target state with profile(), specification(), material() and support(),
+    then apply(). Before anything is sent the target is diffed against the model:
+    profiles against the snapshot's section ref numbers, supports against
+    GetSupportNodes, and specs / materials against the ledger. Members that already
+    carry the value are skipped, so re-running an unchanged generator cell costs a
+    handful of calls. The materials the ledger would skip are spot-checked with
+    GetBeamMaterialName, one member per material; a mismatch means the model was
+    rebuilt behind the ledger's back and clears it.
+
+    Args:
+        property, support: OpenSTAAD Property / Support objects.
+        snapshot (ModelSnapshot, optional): Current model, with profiles, e.g. SnapshotCache.get();
+            read with get_model_snapshot(geometry, property) when omitted.
+        geometry: OpenSTAAD Geometry, needed without a snapshot or to look up support points.
+        ledger (AssignmentLedger, optional): Defaults to the ledger of the open file.
+    """
+
+    def __init__(self, property, support=None, snapshot: ModelSnapshot = None, geometry=None, ledger: AssignmentLedger = None):
+        self.property = property
+        self.support_object = support
+        self.geometry = geometry
+        self.snapshot = snapshot
+        self.ledger = ledger
+        self.desired = {kind: {} for kind in ASSIGNMENT_KINDS if kind != 'specification'}
+        self.desired_specifications = defaultdict(set)
+        self._applied_profiles = {}
+        self._node_keys = None
+        self.stats = {'requested': 0, 'skipped': 0, 'assigned': 0, 'calls': 0}
+
+    def _snapshot(self) -> ModelSnapshot:
+        if(self.snapshot is None):
+            self.snapshot = get_model_snapshot(geometry=self.geometry, property=self.property)
+        return self.snapshot
+
+    def profile(self, beams, property_no: int) -> 'AssignmentPlanner':
+        for beam_no in beams:
+            self.desired['profile'][int(beam_no)] = int(property_no)
+        return self
+
+    def specification(self, beams, spec_no: int) -> 'AssignmentPlanner':
+        """Specs add up, e.g. a start and an end release on the same member."""
+        for beam_no in beams:
+            self.desired_specifications[int(beam_no)].add(int(spec_no))
+        return self
+
+    def release(self, beams, start_release_spec: int, end_release_spec: int) -> 'AssignmentPlanner':
+        beams = [*beams]
+        return self.specification(beams, start_release_spec).specification(beams, end_release_spec)
+
+    def material(self, beams, material_name: str) -> 'AssignmentPlanner':
+        for beam_no in beams:
+            self.desired['material'][int(beam_no)] = material_name
+        return self
+
+    def support(self, nodes_or_points, support_no: int) -> 'AssignmentPlanner':
+        """Nodes by number or Point3D; points are resolved on the snapshot coordinates, GetNodeNumber only for misses."""
+        for node in nodes_or_points:
+            node_no = self.node_at(node) if isinstance(node, Point3D) else int(node)
+            if(node_no):
+                self.desired['support'][node_no] = int(support_no)
+        return self
+
+    def node_at(self, point: Point3D):
+        nodes = self._snapshot().nodes
+        if(self._node_keys is None or self._node_keys[0] is not nodes):
+            keys = zip(nodes.x.tolist(), nodes.y.tolist(), nodes.z.tolist())
+            self._node_keys = (nodes, {key: int(node_no) for key, node_no in zip(keys, nodes.ids.tolist())})
+        point = round(point)
+        node_no = self._node_keys[1].get((point.x, point.y, point.z))
+        if(node_no is None and self.geometry is not None):
+            node_no = get_node_number(geometry=self.geometry, point=point)
+        return node_no
+
+    def _current_profiles(self) -> dict:
+        snapshot = self._snapshot()
+        current = {}
+        if(len(snapshot.profile_refs)):
+            codes = snapshot.profile_codes
+            refs = np.where(codes >= 0, snapshot.profile_refs[np.maximum(codes, 0)], 0)
+            current = dict(zip(snapshot.member_ids.tolist(), refs.tolist()))
+        # the snapshot predates what this planner already applied
+        current.update(self._applied_profiles)
+        return current
+
+    def _current_supports(self) -> set:
+        count = self.support_object.GetSupportCount() if self.support_object is not None else 0
+        if(not count):
+            return set()
+        safe_array_nodes = make_safe_array_long(count)
+        nodes = make_variant_vt_ref(safe_array_nodes, automation.VT_ARRAY | automation.VT_I4)
+        self.support_object.GetSupportNodes(nodes)
+        return set(int(node_no) for node_no in open_array(nodes[0]))
+
+    def _ledger_matches_model(self, ledger: AssignmentLedger) -> bool:
+        """One GetBeamMaterialName per material the ledger would let the plan skip."""
+        samples = {}
+        for id, value in self.desired['material'].items():
+            if(ledger.values.get(('material', id)) == value):
+                samples.setdefault(value, id)
+        for value, id in samples.items():
+            try:
+                name = get_beam_material_name(self.property, id)
+            except Exception:
+                # a STAAD without the getter: the ledger is all there is
+                return True
+            if(str(name).upper() != value.upper()):
+                return False
+        return True
+
+    def plan(self) -> dict:
+        """{kind: {value: [ids]}} still to be assigned after diffing against the model."""
+        ledger = self.ledger if self.ledger is not None else get_assignment_ledger()
+        self.ledger = ledger
+        snapshot = self._snapshot()
+        ledger.forget_missing(member_ids=snapshot.member_ids.tolist(), node_ids=snapshot.nodes.ids.tolist())
+        if(not self._ledger_matches_model(ledger)):
+            ledger.clear()
+
+        current = {'profile': self._current_profiles(),
+                   'material': {id: value for (kind, id), value in ledger.values.items() if kind == 'material'},
+                   'support': {}}
+        if(self.desired['support']):
+            supported = self._current_supports()
+            current['support'] = {id: value for (kind, id), value in ledger.values.items()
+                                  if kind == 'support' and id in supported}
+
+        plan = {kind: defaultdict(list) for kind in ASSIGNMENT_KINDS}
+        skipped = requested = 0
+        for kind, targets in self.desired.items():
+            for id, value in targets.items():
+                requested += 1
+                if(current[kind].get(id) == value):
+                    skipped += 1
+                else:
+                    plan[kind][value].append(id)
+        for beam_no, specs in self.desired_specifications.items():
+            for spec_no in specs:
+                requested += 1
+                if(spec_no in ledger.specifications.get(beam_no, ())):
+                    skipped += 1
+                else:
+                    plan['specification'][spec_no].append(beam_no)
+
+        self.stats['requested'] += requested
+        self.stats['skipped'] += skipped
+        return {kind: dict(groups) for kind, groups in plan.items()}
+
+    def apply(self) -> dict:
+        """Run plan() and send one bulk call per (kind, value); returns the plan that was applied."""
+        plan = self.plan()
+        assign = {
+            'profile': lambda value, ids: assign_in_bulk(lambda beams: assign_beam_property(self.property, beams, value), ids),
+            'specification': lambda value, ids: assign_in_bulk(lambda beams: assign_beam_specification(self.property, beams, value), ids),
+            'material': lambda value, ids: assign_in_bulk(lambda beams: assign_material_to_beam(self.property, value, beams), ids),
+            'support': lambda value, ids: assign_in_bulk(lambda nodes: self.support_object.AssignSupportToNode(nodes, value), ids),
+        }
+        for kind, groups in plan.items():
+            for value, ids in groups.items():
+                assign[kind](value, ids)
+                self.stats['calls'] += 1
+                self.stats['assigned'] += len(ids)
+                if(kind == 'specification'):
+                    for id in ids:
+                        self.ledger.specifications[id].add(value)
+                else:
+                    self.ledger.values.update(((kind, id), value) for id in ids)
+                    if(kind == 'profile'):
+                        self._applied_profiles.update((id, value) for id in ids)
+
+        self.desired = {kind: {} for kind in self.desired}
+        self.desired_specifications = defaultdict(set)
+        return plan
@@ -0,0 +1,135 @@
+import time
+import tracemalloc
+import contextlib
+from base.staad_base import com_array
+from base.staad_base.com_array import *
+from base.staad_base.helper import open_array
+
+def _measure(predicate, calls: int) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(calls):
+        predicate()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': seconds, 'peak_bytes': peak}
+
+@contextlib.contextmanager
+def _count_allocations():
+    """Counts make_safe_array / make_variant_vt_ref calls made inside the block into the yielded dict."""
+    counts = {'allocations': 0}
+    originals = {name: getattr(com_array, name) for name in ('make_safe_array', 'make_variant_vt_ref')}
+    def counting(function):
+        def wrapper(*args, **kwargs):
+            counts['allocations'] += 1
+            return function(*args, **kwargs)
+        return wrapper
+    # com_array resolves its own globals; this module holds a star-imported make_variant_vt_ref
+    namespaces = (vars(com_array), globals())
+    for name, function in originals.items():
+        for namespace in namespaces:
+            if(namespace.get(name) is function):
+                namespace[name] = counting(function)
+    try:
+        yield counts
+    finally:
+        for name, function in originals.items():
+            for namespace in namespaces:
+                if(name in namespace):
+                    namespace[name] = function
+
+def benchmark_safe_array_pool(calls: int = 10000, size: int = 6) -> dict:
+    """
+    Marshal a by-ref double array `calls` times, the way get_nodal_load_info does,
+    with fresh SAFEARRAY/VARIANT objects per call and with the SafeArrayPool.
+
+    Returns:
+        dict: timings, peak traced memory and SAFEARRAY + VARIANT allocations counted
+              for both paths, plus 'allocations_saved' per `calls` calls.
+    """
+    def unpooled():
+        safe_array = make_safe_array_double(size)
+        variant = make_variant_vt_ref(safe_array, automation.VT_ARRAY | automation.VT_R8)
+        return open_array(variant[0])
+
+    pool = SafeArrayPool()
+    def pooled():
+        safe_array, variant = pool.get(ctypes.c_double, size)
+        return safe_array_view(safe_array, ctypes.c_double)
+
+    result = {'calls': calls}
+    for name, predicate in (('unpooled', unpooled), ('pooled', pooled)):
+        with _count_allocations() as counts:
+            result[name] = _measure(predicate, calls)
+        result[name]['allocations'] = counts['allocations']
+    result['allocations_saved'] = result['unpooled']['allocations'] - result['pooled']['allocations']
+    return result
+
+def benchmark_node_snapshot(latency: float = 0.0005, portals: int = 50, columns: int = 3, tiers: int = 3) -> dict:
+    """
+    Read all node coordinates from a FakeOpenSTAAD frame with `latency` seconds per call,
+    once through GetAllNodesCoordinates and once through the per-node fallback.
+
+    Returns:
+        dict: node count, and calls/seconds for the 'bulk' and 'per_node' paths.
+    """
+    from base.staad_base.fake import FakeOpenSTAAD
+    from base.staad_base.geometry import get_node_snapshot
+
+    was_python = python_marshalling()
+    use_python_marshalling(True)
+    try:
+        fake = FakeOpenSTAAD(latency=latency).populate_frame(portals, columns, tiers)
+        result = {'latency': latency, 'nodes': len(fake.model.nodes)}
+        for name, bulk in (('bulk', True), ('per_node', False)):
+            fake.bulk_node_coordinates = bulk
+            fake.reset_calls()
+            start = time.perf_counter()
+            get_node_snapshot(fake.Geometry)
+            result[name] = {'calls': fake.call_count(), 'seconds': time.perf_counter() - start}
+        return result
+    finally:
+        use_python_marshalling(was_python)
+
+def benchmark_renumbering(portals: int = 60, columns: int = 3, tiers: int = 3, openSTAAD=None) -> dict:
+    """
+    Bandwidth, profile and analysis time before and after the RCM node renumbering.
+
+    Without openSTAAD a FakeOpenSTAAD frame is built the way the generator numbers it,
+    portals first and the bracket stubs of every column last, and only the estimated
+    factorisation work is compared. With the application object of a running STAAD the
+    open model is analysed, renumbered with RenumberNode and analysed again.
+
+    Returns:
+        dict: RenumberPlan.report(), RenumberNode calls, and 'analysis_seconds' (before, after) with openSTAAD.
+    """
+    from base.staad_base.fake import FakeOpenSTAAD
+    from base.staad_base.geometry import get_model_snapshot
+    from base.staad_base.renumber import plan_renumbering, renumber_nodes
+
+    was_python = python_marshalling()
+    use_python_marshalling(True)
+    try:
+        application = openSTAAD
+        if(application is None):
+            application = FakeOpenSTAAD().populate_frame(portals, columns, tiers)
+            model = application.model
+            for p in range(portals):
+                for c in range(columns):
+                    top = model.node_lookup[(c * 4.0, tiers * 3.0, p * 6.0)]
+                    model.add_beam(top, model.add_node(c * 4.0 - 1.5 if c == 0 else c * 4.0 + 1.5, tiers * 3.0, p * 6.0))
+
+        def analyse():
+            from base.staad_base.analysis import AnalysisRunner
+            return AnalysisRunner().run(application).elapsed if openSTAAD is not None else None
+
+        before = analyse()
+        plan = plan_renumbering(get_model_snapshot(application.Geometry))
+        result = {**plan.report(), 'renumber_calls': renumber_nodes(application.Geometry, plan)}
+        after = analyse()
+        if(openSTAAD is not None):
+            result['analysis_seconds'] = (before, after)
+        return result
+    finally:
+        use_python_marshalling(was_python)
@@ -0,0 +1,120 @@
+# OpenSTAAD members that are properties returning sub-objects, everything else is a method
+OPENSTAAD_SUB_OBJECTS = ('Geometry','Output','Property','Load','Design','Support','Table','View','Command')
+
+class LazyOpenSTAADObject:
+    """On-demand binding for an OpenSTAAD dispatch object.
+
+    The wrapped object is resolved on first use, and a method is flagged with
+    _FlagAsMethod the first time it is accessed. The bound callable is then stored
+    on the proxy, so later lookups are plain attribute reads.
+
+    Args:
+        resolve (callable): Returns the underlying comtypes dispatch object.
+        name (str): Name used in used_methods() reports, e.g. 'geometry'.
+        connection (StaadConnection, optional): When given, a call that fails because
+            STAAD went away reconnects through it and is retried once.
+    """
+
+    def __init__(self, resolve, name:str, connection=None):
+        self.__dict__['_resolve'] = resolve
+        self.__dict__['_name'] = name
+        self.__dict__['_connection'] = connection
+        self.__dict__['_target'] = None
+        self.__dict__['_used'] = []
+        self.__dict__['_children'] = {}
+
+    def _get_target(self):
+        target = self.__dict__['_target']
+        if(target is None):
+            target = self.__dict__['_target'] = self.__dict__['_resolve']()
+        return target
+
+    def __getattr__(self, attr):
+        target = self._get_target()
+        if(attr.startswith('_')):
+            return getattr(target, attr)
+
+        if(attr in OPENSTAAD_SUB_OBJECTS):
+            bound = self.__dict__['_children'].get(attr)
+            if(bound is None):
+                bound = LazyOpenSTAADObject(lambda: getattr(self._get_target(), attr), attr.lower(), self._connection)
+                self.__dict__['_children'][attr] = bound
+        else:
+            target._FlagAsMethod(attr)
+            bound = getattr(target, attr)
+            if(attr not in self.__dict__['_used']):
+                self.__dict__['_used'].append(attr)
+            if(self._connection is not None):
+                bound = self._retrying(attr, bound)
+
+        self.__dict__[attr] = bound
+        return bound
+
+    def _retrying(self, attr, method):
+        def call(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            except Exception as exc:
+                if(not self._connection.is_disconnect(exc)):
+                    raise
+                self._connection.reconnect()
+                return getattr(self, attr)(*args, **kwargs)
+        call.__name__ = attr
+        return call
+
+    def reset(self) -> None:
+        """Drop the resolved object and bound methods; children re-resolve through this proxy."""
+        for attr in [attr for attr in self.__dict__ if not attr.startswith('_')]:
+            del self.__dict__[attr]
+        self.__dict__['_target'] = None
+        for child in self.__dict__['_children'].values():
+            child.reset()
+
+    def __setattr__(self, attr, value):
+        setattr(self._get_target(), attr, value)
+
+    def used_methods(self) -> list[str]:
+        """Methods flagged so far, in first-use order."""
+        return list(self.__dict__['_used'])
+
+    def __repr__(self):
+        return f'LazyOpenSTAADObject({self._name}, {len(self._used)} methods bound)'
+
+def get_used_methods(*objects) -> dict[str,list[str]]:
+    """Methods each lazy object actually used this session, keyed by object name."""
+    return {obj._name: obj.used_methods() for obj in objects if isinstance(obj, LazyOpenSTAADObject)}
+
+class InterceptedObject:
+    """Routes every method call on an OpenSTAAD object through hook(name, method_name, method, args, kwargs).
+
+    Used by instrumentation that must see each COM call (profiling, recording);
+    sub-objects such as Geometry are wrapped with the same hook, other attributes
+    that are not callable are passed through untouched.
+    """
+
+    def __init__(self, target, name:str, hook):
+        self.__dict__['_target'] = target
+        self.__dict__['_name'] = name
+        self.__dict__['_hook'] = hook
+
+    def __getattr__(self, attr):
+        value = getattr(self._target, attr)
+        if(attr in OPENSTAAD_SUB_OBJECTS):
+            child = self.__dict__[attr] = InterceptedObject(value, attr.lower(), self._hook)
+            return child
+        if(attr.startswith('_') or isinstance(value, LazyOpenSTAADObject) or not callable(value)):
+            return value
+
+        hook = self._hook
+        name = self._name
+        def call(*args, **kwargs):
+            return hook(name, attr, value, args, kwargs)
+        call.__name__ = attr
+        self.__dict__[attr] = call
+        return call
+
+    def __setattr__(self, attr, value):
+        setattr(self._target, attr, value)
+
+    def __repr__(self):
+        return f'InterceptedObject({self._name}, {self._target!r})'
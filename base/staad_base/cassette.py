@@ -0,0 +1,197 @@
+import gzip
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from base.staad_base.root import *
+from base.staad_base.com_array import *
+
+CASSETTE_VERSION = 2
+
+# marker for by-ref arguments in a recorded call; their contents never take part in matching
+REF = '&'
+# tag of a bytes value (c_char outputs such as design codes), kept apart from str so replay writes bytes back
+BYTES = '__bytes__'
+
+class CassetteMiss(KeyError):
+    """A replayed call that was never recorded with these arguments."""
+
+def _jsonable(value):
+    if(isinstance(value, (tuple, list))):
+        return [_jsonable(v) for v in value]
+    if(isinstance(value, np.ndarray)):
+        return value.tolist()
+    if(isinstance(value, np.generic)):
+        return value.item()
+    if(isinstance(value, bytes)):
+        return {BYTES: value.decode('latin-1')}
+    if(value is None or isinstance(value, (bool, int, float, str))):
+        return value
+    return repr(value)
+
+def _restore(value):
+    """Inverse of _jsonable for what a replay hands back: tagged bytes become bytes again."""
+    if(isinstance(value, list)):
+        return [_restore(v) for v in value]
+    if(isinstance(value, dict) and BYTES in value):
+        return value[BYTES].encode('latin-1')
+    return value
+
+def _input(arg):
+    if(is_ref(arg)):
+        return REF
+    if(isinstance(arg, PythonSafeArray) or hasattr(arg, 'unpack')):
+        return _jsonable(array_values(arg))
+    return _jsonable(arg)
+
+def _inputs(args) -> list:
+    return [_input(arg) for arg in args]
+
+def _key(obj_name: str, method_name: str, inputs: list) -> str:
+    return json.dumps([obj_name, method_name, inputs], separators=(',', ':'))
+
+class CassetteRecorder:
+    """Writes every OpenSTAAD call of a live session to a gzip JSON-lines cassette.
+
+    Each line is [object, method, inputs, result, outputs]; by-ref arguments appear
+    as '&' in inputs and their values after the call as [index, value] pairs in outputs.
+
+    Example:
+        with CassetteRecorder('rack_42.cassette.gz').record():
+            convert_force_operation(get_openSTAAD()[1])
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.calls = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._connection = None
+        self._previous_factory = None
+
+    def _open(self):
+        if(self._file is None):
+            self._file = gzip.open(self.file_path, 'wt', encoding='utf-8')
+            self._file.write(json.dumps({'cassette': CASSETTE_VERSION, 'created': time.time()}) + '\n')
+        return self._file
+
+    def _hook(self, obj_name, method_name, method, args, kwargs):
+        result = method(*args, **kwargs)
+        outputs = [[i, _jsonable(read_ref(arg))] for i, arg in enumerate(args) if is_ref(arg)]
+        line = json.dumps([obj_name, method_name, _inputs(args), _jsonable(result), outputs], separators=(',', ':'))
+        with self._lock:
+            self._open().write(line + '\n')
+            self.calls += 1
+        return result
+
+    def instrument(self, openSTAAD=None, STAAD_objects: OpenSTAAD_objects = None):
+        """Wrap an application object and OpenSTAAD_objects for recording; returns (openSTAAD, STAAD_objects)."""
+        wrap = lambda target, name: InterceptedObject(target, name, self._hook) if target is not None else None
+        objects = None
+        if(STAAD_objects is not None):
+            objects = OpenSTAAD_objects(**{name: wrap(target, name) for name, target in vars(STAAD_objects).items()})
+        return wrap(openSTAAD, 'os'), objects
+
+    def start(self, connection: StaadConnection = None) -> None:
+        """Record everything that goes through the connection manager (get_openSTAAD, StaadWorker, ...)."""
+        connection = connection if connection is not None else get_connection()
+        inner = connection.factory if connection.factory is not None else connection.active_object
+        self._connection, self._previous_factory = connection, connection.factory
+        connection.use_factory(lambda: InterceptedObject(inner(), 'os', self._hook))
+
+    def stop(self) -> None:
+        if(self._connection is not None):
+            self._connection.use_factory(self._previous_factory)
+            self._connection = None
+        with self._lock:
+            if(self._file is not None):
+                self._file.close()
+                self._file = None
+
+    def record(self, connection: StaadConnection = None):
+        self.start(connection)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class CassetteReplayer:
+    """Serves recorded OpenSTAAD responses without STAAD.Pro, on any OS.
+
+    Calls are matched on (object, method, non by-ref arguments). Repeated calls with
+    the same arguments get the recorded responses in order, and the last one once
+    they run out, so replay is deterministic. By-ref outputs are written back into
+    the caller's PythonVariantRef / ctypes arguments.
+
+    Args:
+        file_path (str): Cassette written by CassetteRecorder.
+        strict (bool): Raise CassetteMiss for unrecorded calls; otherwise return None.
+    """
+
+    def __init__(self, file_path: str, strict: bool = True):
+        self.file_path = file_path
+        self.strict = strict
+        self.responses = defaultdict(deque)
+        self.stats = {'calls': 0, 'misses': 0}
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if(header.get('cassette') != CASSETTE_VERSION):
+                raise ValueError(f"Unsupported cassette version {header.get('cassette')} in {file_path}")
+            for line in f:
+                obj_name, method_name, inputs, result, outputs = json.loads(line)
+                self.responses[_key(obj_name, method_name, inputs)].append((result, outputs))
+
+    def call(self, obj_name: str, method_name: str, args):
+        self.stats['calls'] += 1
+        responses = self.responses.get(_key(obj_name, method_name, _inputs(args)))
+        if(not responses):
+            self.stats['misses'] += 1
+            if(self.strict):
+                raise CassetteMiss(f"{obj_name}.{method_name}{tuple(_inputs(args))} is not in {self.file_path}")
+            return None
+
+        result, outputs = responses.popleft() if len(responses) > 1 else responses[0]
+        for index, value in outputs:
+            value = _restore(value)
+            if(isinstance(value, list)):
+                write_array(args[index], value)
+            else:
+                write_value(args[index], value)
+        return _restore(result)
+
+    def root(self) -> 'ReplayObject':
+        return ReplayObject(self, 'os')
+
+class ReplayObject:
+    """Application or sub-object served by a CassetteReplayer."""
+
+    def __init__(self, replayer: CassetteReplayer, name: str):
+        self._replayer = replayer
+        self._name = name
+
+    def _FlagAsMethod(self, name):
+        pass
+
+    def __getattr__(self, attr):
+        if(attr.startswith('_')):
+            raise AttributeError(attr)
+        if(attr in OPENSTAAD_SUB_OBJECTS):
+            value = ReplayObject(self._replayer, attr.lower())
+        else:
+            replayer, name = self._replayer, self._name
+            def value(*args):
+                return replayer.call(name, attr, args)
+            value.__name__ = attr
+        self.__dict__[attr] = value
+        return value
+
+def use_cassette(file_path: str, strict: bool = True, connection: StaadConnection = None) -> CassetteReplayer:
+    """Route get_openSTAAD (and everything using the connection manager) to a recorded session."""
+    replayer = CassetteReplayer(file_path, strict)
+    use_python_marshalling(True)
+    root = replayer.root()
+    (connection if connection is not None else get_connection()).use_factory(lambda: root)
+    return replayer
@@ -1,7 +1,93 @@
 # https://learn.microsoft.com/en-us/windows/win32/wmisdk/numbers
 
-from comtypes import automation
+import threading
 import ctypes
+from types import SimpleNamespace
+import numpy as np
+
+try:
+    from comtypes import automation
+except ImportError:
+    # no comtypes (Linux CI, analysis servers): only the Python marshalling below is available
+    automation = SimpleNamespace(VT_I4=3, VT_R4=4, VT_R8=5, VT_BSTR=8, VT_BOOL=11,
+                                 VT_ARRAY=0x2000, VT_BYREF=0x4000, BSTR=ctypes.c_wchar_p)
+
+_marshalling = {'python': not hasattr(automation, 'VARIANT')}
+
+def use_python_marshalling(enabled:bool=True) -> None:
+    """
+    Build arrays and by-ref VARIANTs as PythonSafeArray / PythonVariantRef instead of comtypes objects.
+    Needed by in-process backends such as FakeOpenSTAAD; always on when comtypes is missing.
+    """
+    _marshalling['python'] = enabled or not hasattr(automation, 'VARIANT')
+
+def python_marshalling() -> bool:
+    return _marshalling['python']
+
+class PythonSafeArray:
+    """SAFEARRAY stand-in: a ctypes array of `ctype` that an in-process backend can read or replace."""
+
+    def __init__(self, ctype, values):
+        self.ctype = ctype
+        self.values = (ctype*len(values))(*values)
+
+    def create(self, values):
+        return PythonSafeArray(self.ctype, values)
+
+class PythonVariantRef:
+    """By-ref VARIANT stand-in; ref[0] / ref.value read the referenced array or scalar like comtypes does."""
+
+    def __init__(self, obj, var_type):
+        self.obj = obj
+        self.vt = var_type | automation.VT_BYREF
+
+    @property
+    def value(self):
+        if(isinstance(self.obj, PythonSafeArray)):
+            return tuple(self.obj.values)
+        return self.obj.value
+
+    def __getitem__(self, index):
+        return self.value
+
+def array_values(obj) -> list:
+    """Plain values of anything passed as an array argument: SAFEARRAY, PythonSafeArray, PythonVariantRef, sequence or scalar."""
+    if(isinstance(obj, PythonVariantRef)):
+        obj = obj.obj
+    if(isinstance(obj, PythonSafeArray)):
+        return list(obj.values)
+    if(hasattr(obj, 'unpack')):
+        return list(obj.unpack())
+    if(isinstance(obj, (list, tuple, np.ndarray))):
+        return list(obj)
+    return [obj]
+
+def write_array(ref:PythonVariantRef, values) -> None:
+    """Fill a by-ref array argument, resizing it the way a COM server may."""
+    ref.obj.values = (ref.obj.ctype*len(values))(*values)
+
+def write_value(ref, value) -> None:
+    """Fill a by-ref scalar: a ctypes pointer or a PythonVariantRef around a ctypes value / BSTR."""
+    if(isinstance(ref, PythonVariantRef)):
+        ref.obj.value = value
+    elif(hasattr(ref, 'contents')):
+        ref.contents.value = value
+
+def is_ref(arg) -> bool:
+    """True for by-ref arguments a call fills in: by-ref VARIANTs and ctypes pointers (SAFEARRAY inputs excluded)."""
+    if(isinstance(arg, PythonSafeArray) or hasattr(arg, 'unpack')):
+        return False
+    if(isinstance(arg, PythonVariantRef) or hasattr(arg, 'contents')):
+        return True
+    return bool(getattr(arg, 'vt', 0) & automation.VT_BYREF)
+
+def read_ref(ref):
+    """Value behind a by-ref argument after the call: a tuple for arrays, otherwise the scalar."""
+    if(isinstance(ref, PythonVariantRef)):
+        return ref.value
+    if(hasattr(ref, 'contents')):
+        return ref.contents.value
+    return ref[0]
 
 def get_ctype(type:ctypes,tuple:bool=True):
     variable = type()
@@ -23,20 +109,84 @@ def get_ctype_double(tuple:bool=True):
 def get_ctype_string(tuple:bool=True):
     return get_ctype(type=ctypes.c_char,tuple=tuple)
 
+def make_safe_array(ctype,size=1,values=None):
+    values = ([0]*size) if (values is None or len(values) == 0) else values
+    if(python_marshalling()):
+        return PythonSafeArray(ctype,values)
+    return automation._midlSAFEARRAY(ctype).create(values)
+
 def make_safe_array_int(size=1,values=None): 
-    return automation._midlSAFEARRAY(ctypes.c_int).create(([0]*size) if (not values) else values)
+    return make_safe_array(ctypes.c_int,size,values)
 
 def make_safe_array_long(size=1,values=None): 
-    return automation._midlSAFEARRAY(ctypes.c_long).create(([0]*size) if (not values) else values)
+    return make_safe_array(ctypes.c_long,size,values)
 
 def make_safe_array_float(size=1,values=None): 
-    return automation._midlSAFEARRAY(ctypes.c_float).create(([0]*size) if (not values) else values)
+    return make_safe_array(ctypes.c_float,size,values)
 
 def make_safe_array_double(size=1,values=None): 
-    return automation._midlSAFEARRAY(ctypes.c_double).create(([0]*size) if (not values) else values)
+    return make_safe_array(ctypes.c_double,size,values)
 
 def make_variant_vt_ref(obj, var_type):
+    if(python_marshalling()):
+        return PythonVariantRef(obj, var_type)
     var = automation.VARIANT()
     var._.c_void_p = ctypes.addressof(obj)
     var.vt = var_type | automation.VT_BYREF
     return var
+
+_VT_OF_CTYPE = {
+    ctypes.c_int: automation.VT_I4,
+    ctypes.c_long: automation.VT_I4,
+    ctypes.c_float: automation.VT_R4,
+    ctypes.c_double: automation.VT_R8,
+}
+
+class SafeArrayPool:
+    """Reusable by-ref SAFEARRAY/VARIANT pairs keyed by (ctype, length, slot).
+
+    Use a different slot when one call needs two buffers of the same shape
+    (e.g. forces and distances in GetMemberLoadInfo). Values read through
+    safe_array_view are only valid until the same buffer is used again.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.stats = {'allocations':0,'reuses':0}
+
+    def get(self,ctype,size:int=1,slot:int=0):
+        key = (ctype,size,slot,python_marshalling())
+        entry = self.buffers.get(key)
+        if(entry is None):
+            safe_array = make_safe_array(ctype,size)
+            entry = (safe_array,make_variant_vt_ref(safe_array, automation.VT_ARRAY | _VT_OF_CTYPE[ctype]))
+            self.buffers[key] = entry
+            self.stats['allocations'] += 1
+        else:
+            self.stats['reuses'] += 1
+        return entry
+
+    def clear(self):
+        self.buffers.clear()
+
+_pool_local = threading.local()
+
+def get_safe_array_pool() -> SafeArrayPool:
+    """Pool of the calling thread; COM buffers are never shared between apartments."""
+    pool = getattr(_pool_local,'pool',None)
+    if(pool is None):
+        pool = _pool_local.pool = SafeArrayPool()
+    return pool
+
+def pooled_safe_array(ctype,size:int=1,slot:int=0):
+    return get_safe_array_pool().get(ctype,size,slot)
+
+def safe_array_view(safe_array,ctype) -> np.ndarray:
+    """NumPy view on the SAFEARRAY data, no per-element copy; .copy() it to keep it past the next call."""
+    if(isinstance(safe_array, PythonSafeArray)):
+        return np.ctypeslib.as_array(safe_array.values) if len(safe_array.values) else np.zeros(0,dtype=ctype)
+    header = safe_array[0]
+    count = header.rgsabound[0].cElements
+    if(count == 0 or not header.pvData):
+        return np.zeros(0,dtype=ctype)
+    return np.ctypeslib.as_array((ctype*count).from_address(header.pvData))
@@ -0,0 +1,120 @@
+import time
+import threading
+from base.staad_base.binding import *
+
+try:
+    import comtypes
+    from comtypes import client, COMError
+except ImportError:
+    # without comtypes only a factory-backed connection (e.g. FakeOpenSTAAD) can be used
+    comtypes = client = None
+    COMError = OSError
+
+# HRESULTs raised when the STAAD.Pro process behind a proxy has gone away
+DISCONNECT_HRESULTS = {
+    -2147417848,  # RPC_E_DISCONNECTED
+    -2147023174,  # RPC_S_SERVER_UNAVAILABLE
+    -2147023170,  # RPC_S_CALL_FAILED
+    -2147220995,  # CO_E_OBJNOTCONNECTED
+}
+# HRESULTs of a method the running STAAD build does not implement
+UNSUPPORTED_HRESULTS = {
+    -2147352570,  # DISP_E_UNKNOWNNAME
+    -2147352573,  # DISP_E_MEMBERNOTFOUND
+    -2147467263,  # E_NOTIMPL
+}
+
+class StaadConnection:
+    """One COM apartment and one OpenSTAAD connection per thread, shared by every helper.
+
+    The apartment is initialised the first time a thread asks for the connection,
+    and the OpenSTAAD object is fetched with GetActiveObject only once per thread.
+    Calls that fail because STAAD.Pro restarted reconnect and are retried once.
+
+    Args:
+        prog_id (str): ProgID of the running application.
+        factory (callable, optional): Returns the OpenSTAAD object instead of GetActiveObject,
+            e.g. an in-process fake or a replayer.
+
+    Attributes:
+        metrics (dict): apartments, connects, reconnects, connect_seconds, last_connect_seconds.
+    """
+
+    def __init__(self, prog_id: str = "StaadPro.OpenSTAAD", factory=None):
+        self.prog_id = prog_id
+        self.factory = factory
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.metrics = {'apartments': 0, 'connects': 0, 'reconnects': 0,
+                        'connect_seconds': 0.0, 'last_connect_seconds': 0.0}
+
+    def _ensure_apartment(self) -> None:
+        if getattr(self._local, 'apartment', False) or comtypes is None:
+            return
+        self._local.owns_apartment = False
+        try:
+            comtypes.CoInitializeEx(comtypes.COINIT_APARTMENTTHREADED)
+            self._local.owns_apartment = True
+        except OSError:
+            # the thread already lives in another apartment (e.g. the main thread set up by comtypes)
+            pass
+        self._local.apartment = True
+        with self._lock:
+            self.metrics['apartments'] += 1
+
+    def active_object(self):
+        """The running application's OpenSTAAD object, fetched with GetActiveObject in this thread's apartment."""
+        self._ensure_apartment()
+        return client.GetActiveObject(self.prog_id)
+
+    def _connect(self):
+        start = time.perf_counter()
+        target = self.factory() if self.factory is not None else self.active_object()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.metrics['connects'] += 1
+            self.metrics['connect_seconds'] += elapsed
+            self.metrics['last_connect_seconds'] = elapsed
+        return target
+
+    def openSTAAD(self) -> LazyOpenSTAADObject:
+        """Application object of the calling thread; connects on first use."""
+        os = getattr(self._local, 'os', None)
+        if os is None:
+            os = self._local.os = LazyOpenSTAADObject(self._connect, 'os', connection=self)
+        elif self._local.generation != self._generation:
+            os.reset()
+        self._local.generation = self._generation
+        return os
+
+    def use_factory(self, factory) -> None:
+        """Switch every thread to objects from factory (None restores GetActiveObject) on their next call."""
+        self.factory = factory
+        with self._lock:
+            self._generation += 1
+        self.openSTAAD()
+
+    def reconnect(self) -> None:
+        with self._lock:
+            self.metrics['reconnects'] += 1
+        self.openSTAAD().reset()
+
+    def is_disconnect(self, exc: Exception) -> bool:
+        return isinstance(exc, COMError) and getattr(exc, 'hresult', None) in DISCONNECT_HRESULTS
+
+    def close(self) -> None:
+        """Release this thread's connection and leave its apartment."""
+        os = getattr(self._local, 'os', None)
+        if os is not None:
+            os.reset()
+            self._local.os = None
+        if getattr(self._local, 'owns_apartment', False):
+            comtypes.CoUninitialize()
+        self._local.apartment = False
+        self._local.owns_apartment = False
+
+staad_connection = StaadConnection()
+
+def get_connection() -> StaadConnection:
+    return staad_connection
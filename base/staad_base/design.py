@@ -1,8 +1,10 @@
+import numpy as np
 from base.staad_base.root import *
 from base.staad_base.geometry import *
 from base.staad_base.load import *
 from base.staad_base.com_array import *
 from base.staad_base.helper import *
+from base.staad_base.connection import COMError, UNSUPPORTED_HRESULTS
 
 def get_steel_design_result(output,beam_number:int):
     DesignCode,ptr1 = get_ctype_string()
@@ -14,8 +16,7 @@ def get_steel_design_result(output,beam_number:int):
     CriticalClause,ptr7 = get_ctype_string()
     DesignSection,ptr8 = get_ctype_string()
 
-    safe_array_list = make_safe_array_double(3)
-    DesignForces = make_variant_vt_ref(safe_array_list, automation.VT_ARRAY | automation.VT_R8)
+    safe_array_list,DesignForces = pooled_safe_array(ctypes.c_double,3)
 
     KLByR,ptr10 = get_ctype_double()
 
@@ -25,7 +26,7 @@ def get_steel_design_result(output,beam_number:int):
         'beam':beam_number,
         'critical_ratio':CriticalRatio.value,
         'allowable_ratio':AllowableRatio.value,
-        'design_forces':open_array(DesignForces.value),
+        'design_forces':safe_array_view(safe_array_list,ctypes.c_double).copy(),
         'klbyr':KLByR.value,
         'critical_ratio_failure':CriticalRatio.value>AllowableRatio.value,
     }
@@ -36,6 +37,23 @@ def get_member_steel_design_results(output,beam_numbers=[]):
         result[beam_no] = get_steel_design_result(output,beam_no)
     return result
 
+def get_multiple_steel_design_ratios(output,beam_numbers) -> np.ndarray:
+    """
+    Critical ratio of many members in one GetMultipleMemberSteelDesignRatio call; None when the running
+    STAAD lacks it. Any other failure of the call is raised, not turned into the per-member fallback.
+    """
+    beam_numbers = [int(beam_no) for beam_no in beam_numbers]
+    ratios = make_variant_vt_ref(make_safe_array_double(len(beam_numbers)), automation.VT_ARRAY | automation.VT_R8)
+    try:
+        output.GetMultipleMemberSteelDesignRatio(make_safe_array_long(len(beam_numbers),beam_numbers),ratios)
+    except AttributeError:
+        return None
+    except COMError as e:
+        if(getattr(e, 'hresult', None) in UNSUPPORTED_HRESULTS):
+            return None
+        raise
+    return np.asarray(read_ref(ratios),dtype=np.float64)
+
 def assign_design_command(design,breif_no=1,name=None,value=1,members:list=[]):
     return design.AssignDesignCommand(breif_no,name,value,make_safe_array_long(len(members),values=members))
 
@@ -0,0 +1,118 @@
+import numpy as np
+from base.staad_base.design import *
+from base.staad_base.analysis import on_analysis_complete, remove_analysis_listener, last_analysis_run, results_probe
+
+class DesignResultCache:
+    """
+    Steel design ratios of the current analysis, read from STAAD once per member.
+
+    Members missing from the cache are fetched with GetMultipleMemberSteelDesignRatio
+    in batches of batch_size (GetMemberSteelDesignResults per member on a STAAD without
+    it); every later query is an array lookup. The cache empties itself whenever an
+    AnalysisRun finishes and remembers the run id its values belong to. Every query
+    also compares results_probe() (model path, .ANL mtime and size) with the one taken
+    when the values were read, which catches analyses started from the STAAD window
+    and switching to another model.
+
+    Attributes:
+        run_id (int): Id of the analysis run the cached values come from, 0 before any run of the session.
+        members (np.ndarray): int32 cached member numbers.
+        ratios (np.ndarray): float64 critical ratio per cached member.
+        allowable (np.ndarray): float64 allowable ratio, NaN where the bulk call does not report it.
+
+    Example:
+        cache = get_design_cache(STAAD_objects.output)
+        ratios = cache.ratios_of(group.members)     # one STAAD call for the whole group
+        cache.ratio_dict(other_group.members)       # no STAAD call when already cached
+    """
+
+    def __init__(self, output, batch_size: int = 5000, file_name=get_staad_file_name):
+        self.output = output
+        self.batch_size = batch_size
+        self.file_name = file_name
+        self.bulk = True
+        self.stats = {'hits': 0, 'fetched': 0, 'bulk_calls': 0, 'single_calls': 0, 'invalidations': -1}
+        self.invalidate()
+        on_analysis_complete(self._on_analysis)
+
+    def _on_analysis(self, run) -> None:
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        run = last_analysis_run()
+        self.run_id = run.run_id if run is not None else 0
+        self.probe = results_probe(self.file_name)
+        self.members = np.zeros(0, dtype=np.int32)
+        self.ratios = np.zeros(0, dtype=np.float64)
+        self.allowable = np.zeros(0, dtype=np.float64)
+        self.index = {}
+        self.stats['invalidations'] += 1
+
+    def _fetch(self, members: list) -> tuple:
+        if(self.bulk):
+            ratios = get_multiple_steel_design_ratios(self.output, members)
+            if(ratios is not None and len(ratios) == len(members)):
+                self.stats['bulk_calls'] += 1
+                return ratios, np.full(len(members), np.nan)
+            self.bulk = False
+        results = [get_steel_design_result(self.output, member) for member in members]
+        self.stats['single_calls'] += len(members)
+        return (np.array([result['critical_ratio'] for result in results], dtype=np.float64),
+                np.array([result['allowable_ratio'] for result in results], dtype=np.float64))
+
+    def ensure(self, members) -> None:
+        """Read the members not cached yet."""
+        run = last_analysis_run()
+        if(run is not None and run.run_id != self.run_id):
+            # a run finished but its listeners have not been called yet
+            self.invalidate()
+        elif(results_probe(self.file_name) != self.probe):
+            # analysed outside the session or another model opened
+            self.invalidate()
+        members = [*members]
+        missing = [int(member) for member in dict.fromkeys(members) if int(member) not in self.index]
+        self.stats['hits'] += len(members) - len(missing)
+        if(not missing):
+            return
+        ratios, allowable = [self.ratios], [self.allowable]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            batch_ratios, batch_allowable = self._fetch(batch)
+            ratios.append(batch_ratios)
+            allowable.append(batch_allowable)
+        first_row = len(self.members)
+        self.members = np.concatenate((self.members, np.array(missing, dtype=np.int32)))
+        self.ratios = np.concatenate(ratios)
+        self.allowable = np.concatenate(allowable)
+        self.index.update((member, first_row + i) for i, member in enumerate(missing))
+        self.stats['fetched'] += len(missing)
+
+    def rows(self, members) -> np.ndarray:
+        members = [*members]
+        self.ensure(members)
+        return np.fromiter((self.index[int(member)] for member in members), dtype=np.int64, count=len(members))
+
+    def ratios_of(self, members) -> np.ndarray:
+        """Critical ratios in the order of members."""
+        rows = self.rows(members)
+        return self.ratios[rows]
+
+    def ratio_dict(self, members) -> dict:
+        """{member: critical ratio}, the shape member_group.results['result'] holds."""
+        members = [*members]
+        return dict(zip(members, self.ratios_of(members).tolist()))
+
+    def failing(self, members, limit: float = 1.0) -> np.ndarray:
+        members = np.asarray([*members], dtype=np.int32)
+        return members[self.ratios_of(members) >= limit]
+
+_caches = {}
+
+def get_design_cache(output) -> DesignResultCache:
+    """Cache of the given Output object, shared by every member_group reading through it."""
+    cache = _caches.get(id(output))
+    if(cache is None or cache.output is not output):
+        if(cache is not None):
+            remove_analysis_listener(cache._on_analysis)
+        cache = _caches[id(output)] = DesignResultCache(output)
+    return cache
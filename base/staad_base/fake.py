@@ -0,0 +1,545 @@
+import os
+import time
+import math
+from collections import Counter, defaultdict
+from base.staad_base.com_array import *
+from base.staad_base.connection import get_connection
+from base.staad_base.load_enum import LoadItemNo
+
+def _wait(seconds: float) -> None:
+    # time.sleep is too coarse below a couple of milliseconds, spin instead
+    if seconds >= 0.002:
+        time.sleep(seconds)
+    elif seconds > 0:
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+def _ids(obj) -> list[int]:
+    return [int(x) for x in array_values(obj)]
+
+class FakeModel:
+    """State shared by the fake OpenSTAAD surfaces; plain dicts, no COM."""
+
+    def __init__(self):
+        self.file_name = os.path.abspath('fake_model.std')
+        self.nodes = {}
+        self.node_lookup = {}
+        self.beams = {}
+        self.beam_properties = {}
+        self.beam_specs = defaultdict(list)
+        self.beam_materials = {}
+        self.properties = []
+        self.specs = []
+        self.supports = []
+        self.node_supports = {}
+        self.load_cases = {}
+        self.active_load = None
+        self.selected_beams = []
+        self.selected_nodes = []
+        self.design_commands = []
+        self.analysis_end = None
+        self.analysed = False
+
+    def add_node(self, x, y, z) -> int:
+        key = (round(x, 3), round(y, 3), round(z, 3))
+        node_no = self.node_lookup.get(key)
+        if node_no is None:
+            node_no = max(self.nodes, default=0) + 1
+            self.nodes[node_no] = key
+            self.node_lookup[key] = node_no
+        return node_no
+
+    def add_beam(self, node_a, node_b) -> int:
+        beam_no = max(self.beams, default=0) + 1
+        self.beams[beam_no] = (int(node_a), int(node_b))
+        return beam_no
+
+    def beam_length(self, beam_no) -> float:
+        a, b = self.beams[beam_no]
+        return math.dist(self.nodes[a], self.nodes[b])
+
+class _FakeSurface:
+    """Base of every fake OpenSTAAD object: public (capitalised) methods are counted and delayed by the configured latency."""
+
+    def __init__(self, fake, model: FakeModel):
+        self._fake = fake
+        self._model = model
+
+    def _FlagAsMethod(self, name):
+        pass
+
+    def __getattribute__(self, attr):
+        value = object.__getattribute__(self, attr)
+        if attr[:1].isupper() and callable(value):
+            return object.__getattribute__(self, '_fake')._timed(type(self).__name__, attr, value)
+        return value
+
+class FakeGeometry(_FakeSurface):
+    def GetNodeCount(self):
+        return len(self._model.nodes)
+
+    def GetNodeList(self, nodes):
+        write_array(nodes, list(self._model.nodes))
+
+    def GetNodeIncidence(self, node_no, x, y, z):
+        for ref, value in zip((x, y, z), self._model.nodes[int(node_no)]):
+            write_value(ref, value)
+
+    def GetAllNodesCoordinates(self, ids, x, y, z):
+        if not self._fake.bulk_node_coordinates:
+            raise AttributeError('GetAllNodesCoordinates')
+        coordinates = list(self._model.nodes.values())
+        write_array(ids, list(self._model.nodes))
+        for axis, ref in enumerate((x, y, z)):
+            write_array(ref, [c[axis] for c in coordinates])
+
+    def GetNodeNumber(self, x, y, z):
+        return self._model.node_lookup.get((round(x, 3), round(y, 3), round(z, 3)), 0)
+
+    def AddNode(self, x, y, z):
+        return self._model.add_node(x, y, z)
+
+    def AddBeam(self, node_a, node_b):
+        return self._model.add_beam(node_a, node_b)
+
+    def AddMultipleNodes(self, coordinates):
+        values = array_values(coordinates)
+        for i in range(0, len(values), 3):
+            self._model.add_node(*values[i:i + 3])
+        return True
+
+    def AddMultipleBeams(self, incidences):
+        values = _ids(incidences)
+        for i in range(0, len(values), 2):
+            self._model.add_beam(values[i], values[i + 1])
+        return True
+
+    def RenumberNode(self, old_node_no, new_node_no):
+        model = self._model
+        old_node_no, new_node_no = int(old_node_no), int(new_node_no)
+        if old_node_no not in model.nodes or new_node_no in model.nodes:
+            return False
+        key = model.nodes.pop(old_node_no)
+        model.nodes[new_node_no] = key
+        model.node_lookup[key] = new_node_no
+        for beam_no, (a, b) in model.beams.items():
+            if old_node_no in (a, b):
+                model.beams[beam_no] = (new_node_no if a == old_node_no else a, new_node_no if b == old_node_no else b)
+        if old_node_no in model.node_supports:
+            model.node_supports[new_node_no] = model.node_supports.pop(old_node_no)
+        for load_case in model.load_cases.values():
+            for item in load_case['items']:
+                if item['type'] == LoadItemNo.NodalLoad_Node:
+                    item['targets'] = [new_node_no if node_no == old_node_no else node_no for node_no in item['targets']]
+        return True
+
+    def GetMemberCount(self):
+        return len(self._model.beams)
+
+    def GetBeamList(self, beams):
+        write_array(beams, list(self._model.beams))
+
+    def GetMemberIncidence(self, beam_no, node_a, node_b):
+        a, b = self._model.beams[int(beam_no)]
+        write_value(node_a, a)
+        write_value(node_b, b)
+
+    def GetBeamLength(self, beam_no):
+        return self._model.beam_length(int(beam_no))
+
+    def GetNoOfBeamsConnectedAtNode(self, node_no):
+        return sum(1 for a, b in self._model.beams.values() if node_no in (a, b))
+
+    def SelectBeam(self, beam_no):
+        self._model.selected_beams.append(int(beam_no))
+        return True
+
+    def SelectNode(self, node_no):
+        self._model.selected_nodes.append(int(node_no))
+        return True
+
+    def ClearMemberSelection(self):
+        self._model.selected_beams = []
+
+    def GetNoOfSelectedBeams(self):
+        return len(self._model.selected_beams)
+
+    def GetSelectedBeams(self, beams, sort=1):
+        write_array(beams, sorted(self._model.selected_beams) if sort else self._model.selected_beams)
+
+    def GetNoOfSelectedNodes(self):
+        return len(self._model.selected_nodes)
+
+    def GetSelectedNodes(self, nodes, sort=1):
+        write_array(nodes, sorted(self._model.selected_nodes) if sort else self._model.selected_nodes)
+
+    def GetIntersectBeamsCount(self, beams=None, tolerance=0.001):
+        return 0
+
+    def IntersectBeams(self, method, beams, tolerance, new_beams):
+        write_array(new_beams, [])
+
+    def GetCountOfBreakableBeamsAtSpecificNodes(self, nodes):
+        return 0
+
+    def BreakBeamsAtSpecificNodes(self, nodes, existing_beams, new_beams):
+        write_array(existing_beams, [])
+        write_array(new_beams, [])
+
+class FakeProperty(_FakeSurface):
+    def _create(self, name, type_no=0, country=0, width=0.0, depth=0.0) -> int:
+        self._model.properties.append({'name': name, 'type': type_no, 'country': country, 'width': width, 'depth': depth})
+        return len(self._model.properties)
+
+    def GetSectionPropertyCount(self):
+        return len(self._model.properties)
+
+    def GetSectionPropertyName(self, property_no, name):
+        write_value(name, self._model.properties[int(property_no) - 1]['name'])
+
+    def GetSectionPropertyType(self, property_no):
+        return self._model.properties[int(property_no) - 1]['type']
+
+    def GetSectionPropertyCountry(self, property_no):
+        return self._model.properties[int(property_no) - 1]['country']
+
+    def GetSectionPropertyValues(self, property_no, width, depth, ax, ay, az, ix, iy, iz):
+        section = self._model.properties[int(property_no) - 1]
+        write_value(width, section['width'])
+        write_value(depth, section['depth'])
+        for value in (ax, ay, az, ix, iy, iz):
+            write_value(value, 0.0)
+
+    def GetBeamSectionPropertyRefNo(self, beam_no):
+        return self._model.beam_properties.get(int(beam_no), 0)
+
+    def GetBeamSectionDisplayName(self, beam_no):
+        ref_no = self._model.beam_properties.get(int(beam_no), 0)
+        return self._model.properties[ref_no - 1]['name'] if ref_no else ''
+
+    GetBeamSectionName = GetBeamSectionDisplayName
+
+    def CreateBeamPropertyFromTable(self, country, section_name, type_spec=0, add_spec_1=0, add_spec_2=0):
+        return self._create(section_name, 1, country)
+
+    def CreatePrismaticRectangleProperty(self, depth, width):
+        return self._create(f'Rect {depth:.2f}x{width:.2f}', 2, width=width, depth=depth)
+
+    def CreatePrismaticCircleProperty(self, diameter):
+        return self._create(f'Cir {diameter:.2f}', 2, width=diameter, depth=diameter)
+
+    def AssignBeamProperty(self, beams, property_no):
+        for beam_no in _ids(beams):
+            self._model.beam_properties[beam_no] = int(property_no)
+        return True
+
+    def CreateMemberReleaseSpec(self, location, releases):
+        self._model.specs.append(('release', int(location), tuple(array_values(releases))))
+        return len(self._model.specs)
+
+    def CreateMemberTrussSpec(self):
+        self._model.specs.append(('truss',))
+        return len(self._model.specs)
+
+    def CreateMemberOffsetSpec(self, location, local, x, y, z):
+        self._model.specs.append(('offset', int(location), int(local), x, y, z))
+        return len(self._model.specs)
+
+    def AssignMemberSpecToBeam(self, beams, spec_no):
+        for beam_no in _ids(beams):
+            self._model.beam_specs[beam_no].append(int(spec_no))
+        return True
+
+    def AssignMaterialToMember(self, material_name, beams):
+        for beam_no in _ids(beams):
+            self._model.beam_materials[beam_no] = material_name
+        return True
+
+    def GetBeamMaterialName(self, beam_no):
+        return self._model.beam_materials.get(int(beam_no), '')
+
+class FakeSupport(_FakeSurface):
+    def CreateSupportFixed(self):
+        self._model.supports.append('FIXED')
+        return len(self._model.supports)
+
+    def CreateSupportPinned(self):
+        self._model.supports.append('PINNED')
+        return len(self._model.supports)
+
+    def AssignSupportToNode(self, nodes, support_no):
+        for node_no in _ids(nodes):
+            self._model.node_supports[node_no] = int(support_no)
+        return True
+
+    def GetSupportCount(self):
+        return len(self._model.node_supports)
+
+    def GetSupportNodes(self, nodes):
+        write_array(nodes, list(self._model.node_supports))
+
+    def GetSupportType(self, node_no):
+        support_no = self._model.node_supports.get(int(node_no))
+        return 1 if support_no and self._model.supports[support_no - 1] == 'PINNED' else 2 if support_no else 0
+
+class FakeLoad(_FakeSurface):
+    """Load items are kept per case as {'type', 'targets', 'data'}; consecutive identical loads share one item, like a STAAD load line with a member list."""
+
+    def _items(self, case=None):
+        return self._model.load_cases[self._model.active_load if case is None else int(case)]['items']
+
+    def _add(self, item_type, target, data):
+        items = self._items()
+        if items and items[-1]['type'] == item_type and items[-1]['data'] == data:
+            items[-1]['targets'].append(int(target))
+        else:
+            items.append({'type': int(item_type), 'targets': [int(target)], 'data': data})
+        return True
+
+    def _of_type(self, load_type):
+        return [item for item in self._items() if item['type'] == int(load_type)]
+
+    def CreateNewPrimaryLoad(self, title=''):
+        case = max(self._model.load_cases, default=0) + 1
+        self._model.load_cases[case] = {'title': title, 'type': 0, 'items': []}
+        self._model.active_load = case
+        return case
+
+    def CreateNewPrimaryLoadEx2(self, title, load_type, case):
+        self._model.load_cases[int(case)] = {'title': title, 'type': int(load_type), 'items': []}
+        self._model.active_load = int(case)
+        return int(case)
+
+    def SetLoadActive(self, case):
+        if int(case) not in self._model.load_cases:
+            return False
+        self._model.active_load = int(case)
+        return True
+
+    def GetActiveLoad(self):
+        return self._model.active_load
+
+    def GetPrimaryLoadCaseCount(self):
+        return len(self._model.load_cases)
+
+    def GetPrimaryLoadCaseNumbers(self, cases):
+        write_array(cases, list(self._model.load_cases))
+
+    def GetLoadCaseTitle(self, case):
+        return self._model.load_cases[int(case)]['title']
+
+    def GetLoadItemsCount(self, case):
+        return len(self._items(case))
+
+    def GetLoadItemType(self, case, index):
+        return self._items(case)[int(index)]['type']
+
+    def GetLoadTypeCount(self, load_type):
+        return len(self._of_type(load_type))
+
+    def GetListSizeForLoadType(self, load_type, index):
+        return len(self._of_type(load_type)[int(index)]['targets'])
+
+    def GetAssignmentListForLoadType(self, load_type, index, targets):
+        write_array(targets, self._of_type(load_type)[int(index)]['targets'])
+
+    def GetLoadListCount(self):
+        return 0
+
+    def GetLoadCountInLoadList(self, index):
+        return 0
+
+    def GetLoadsInLoadList(self, index, loads):
+        write_array(loads, [])
+
+    def GetNodalLoadCount(self, node_no):
+        return sum(1 for item in self._of_type(LoadItemNo.NodalLoad_Node) if int(node_no) in item['targets'])
+
+    def GetNodalLoadInfo(self, index, forces):
+        write_array(forces, list(self._of_type(LoadItemNo.NodalLoad_Node)[int(index)]['data']))
+
+    def GetMemberLoadInfo(self, index, direction, forces, distances):
+        member_loads = [item for item in self._items() if 3200 <= item['type'] < 3300]
+        data = member_loads[int(index)]['data']
+        write_value(direction, data[0])
+        write_array(forces, [data[1], 0.0, 0.0])
+        write_array(distances, list(data[2:]) + [0.0] * (3 - len(data[2:])))
+
+    def AddNodalLoad(self, node_no, fx, fy, fz, mx, my, mz):
+        return self._add(LoadItemNo.NodalLoad_Node, node_no, (fx, fy, fz, mx, my, mz))
+
+    def AddMemberConcForce(self, beam_no, direction, force, d1=0, d2=0):
+        return self._add(LoadItemNo.ConcentratedForce, beam_no, (int(direction), force, d1, d2))
+
+    def AddMemberUniformForce(self, beam_no, direction, force, d1=0, d2=0, d3=0):
+        return self._add(LoadItemNo.UniformForce, beam_no, (int(direction), force, d1, d2, d3))
+
+    def AddSelfWeightInXYZ(self, direction, factor):
+        self._items().append({'type': int(LoadItemNo.SelfWeight), 'targets': [], 'data': (int(direction), factor)})
+        return True
+
+class FakeOutput(_FakeSurface):
+    """Synthetic results; deterministic in the member / node / case numbers so runs can be compared."""
+
+    def AreResultsAvailable(self):
+        return self._model.analysed
+
+    def _ratio(self, beam_no) -> float:
+        return 0.15 + 0.9 * ((int(beam_no) * 7919) % 1000) / 1000
+
+    def GetMemberSteelDesignResults(self, beam_no, code, status, ratio, allowable, case, section, clause, design_section, forces, klr):
+        beam_no = int(beam_no)
+        write_value(ratio, self._ratio(beam_no))
+        write_value(allowable, 1.0)
+        write_value(case, float(min(self._model.load_cases, default=1)))
+        write_array(forces, [10.0 * beam_no % 97, 3.0 * beam_no % 31, 5.0 * beam_no % 53])
+        write_value(klr, 40.0 + beam_no % 120)
+
+    def GetMultipleMemberSteelDesignRatio(self, beams, ratios):
+        write_array(ratios, [self._ratio(beam_no) for beam_no in _ids(beams)])
+
+    def GetMemberEndForces(self, beam_no, end, case, forces, local=0):
+        beam_no, end, case = int(beam_no), int(end), int(case)
+        sign = -1.0 if end else 1.0
+        write_array(forces, [sign * (((beam_no * 13 + case * 7 + dof * 3) % 100) - 50.0) for dof in range(6)])
+
+    def GetIntermediateMemberForcesAtDistance(self, beam_no, distance, case, forces):
+        # end forces blended along the member, with a parabolic bending moment on top
+        beam_no, case = int(beam_no), int(case)
+        start = [((beam_no * 13 + case * 7 + dof * 3) % 100) - 50.0 for dof in range(6)]
+        values = [(1 - 2 * distance) * value for value in start]
+        values[5] += 40.0 * distance * (1 - distance) * (1 + case % 3)
+        write_array(forces, values)
+
+    def GetSupportReactions(self, node_no, case, reactions):
+        node_no, case = int(node_no), int(case)
+        write_array(reactions, [((node_no * 31 + case * 17 + dof * 7) % 200) - 100.0 for dof in range(6)])
+
+    def _displacement(self, node_no, case) -> list:
+        # sway growing with height, sag varying per node
+        x, y, z = self._model.nodes[node_no]
+        return [0.0004 * y * (1 + case % 3), -0.001 * (((node_no * 13 + case * 7) % 20) + 1) / 4, 0.0002 * y, 0.0, 0.0, 0.0]
+
+    def GetNodeDisplacements(self, node_no, case, displacements):
+        write_array(displacements, self._displacement(int(node_no), int(case)))
+
+    def GetIntermediateMemberTransDisplacements(self, beam_no, distance, case, displacements):
+        beam_no, case = int(beam_no), int(case)
+        a, b = self._model.beams[beam_no]
+        sag = -0.002 * self._model.beam_length(beam_no) * (1 + case % 2)
+        chord = [(1 - distance) * u + distance * v for u, v in zip(self._displacement(a, case), self._displacement(b, case))]
+        write_array(displacements, [chord[0], chord[1] + sag, chord[2], 0.0, 0.0, 0.0])
+
+class FakeDesign(_FakeSurface):
+    def AssignDesignCommand(self, brief_no, name, value, members):
+        self._model.design_commands.append(('command', brief_no, name, value, _ids(members)))
+        return True
+
+    def AssignDesignParameter(self, brief_no, name, value, members):
+        self._model.design_commands.append(('parameter', brief_no, name, value, _ids(members)))
+        return True
+
+class FakeOpenSTAAD(_FakeSurface):
+    """In-memory stand-in for StaadPro.OpenSTAAD covering the calls made in base/staad_base.
+
+    Args:
+        latency (float): Seconds added to every OpenSTAAD call, to model the COM round trip.
+        method_latency (dict, optional): Per-method override, e.g. {'GetBeamSectionDisplayName': 0.002}.
+        analysis_seconds (float): How long IsAnalyzing() keeps returning True after AnalyzeEx.
+        bulk_node_coordinates (bool): Expose GetAllNodesCoordinates, like newer STAAD builds do.
+
+    Attributes:
+        calls (Counter): (surface, method) -> number of calls.
+    """
+
+    def __init__(self, latency: float = 0.0, method_latency: dict = None,
+                 analysis_seconds: float = 0.0, bulk_node_coordinates: bool = True):
+        model = FakeModel()
+        super().__init__(self, model)
+        self.latency = latency
+        self.method_latency = method_latency or {}
+        self.analysis_seconds = analysis_seconds
+        self.bulk_node_coordinates = bulk_node_coordinates
+        self.calls = Counter()
+        self.model = model
+        self.Geometry = FakeGeometry(self, model)
+        self.Property = FakeProperty(self, model)
+        self.Support = FakeSupport(self, model)
+        self.Load = FakeLoad(self, model)
+        self.Output = FakeOutput(self, model)
+        self.Design = FakeDesign(self, model)
+
+    def _timed(self, surface, method_name, method):
+        def call(*args, **kwargs):
+            self.calls[(surface, method_name)] += 1
+            _wait(self.method_latency.get(method_name, self.latency))
+            return method(*args, **kwargs)
+        return call
+
+    def reset_calls(self) -> None:
+        self.calls.clear()
+
+    def call_count(self) -> int:
+        return sum(self.calls.values())
+
+    def GetSTAADFile(self, file_name, full_path=True):
+        write_value(file_name, self._model.file_name if full_path else os.path.basename(self._model.file_name))
+
+    def OpenSTAADFile(self, file_name):
+        self._model.file_name = os.path.abspath(file_name)
+        return True
+
+    def CloseSTAADFile(self):
+        return True
+
+    def SaveModel(self, silent=1):
+        return True
+
+    def GetProcessId(self):
+        return os.getpid()
+
+    def SetSilentMode(self, silent):
+        return True
+
+    def AnalyzeEx(self, silent=1, hidden=0, wait=0):
+        self._model.analysis_end = time.perf_counter() + self.analysis_seconds
+        if(wait):
+            # STAAD returns only once the solver is done
+            time.sleep(self.analysis_seconds)
+        self._model.analysed = True
+        return 1
+
+    def IsAnalyzing(self):
+        return self._model.analysis_end is not None and time.perf_counter() < self._model.analysis_end
+
+    def GetAnalysisStatus(self):
+        if self.IsAnalyzing():
+            return 1
+        return 2 if self._model.analysed else 5
+
+    def populate_frame(self, portals: int = 10, columns: int = 3, tiers: int = 3,
+                       portal_spacing: float = 6.0, column_spacing: float = 4.0, tier_height: float = 3.0) -> 'FakeOpenSTAAD':
+        """Fill the model with a piperack-like frame straight away, without latency or call counting."""
+        model = self._model
+        for p in range(portals):
+            for c in range(columns):
+                for t in range(tiers):
+                    model.add_beam(model.add_node(c * column_spacing, t * tier_height, p * portal_spacing),
+                                   model.add_node(c * column_spacing, (t + 1) * tier_height, p * portal_spacing))
+            for t in range(1, tiers + 1):
+                for c in range(columns - 1):
+                    model.add_beam(model.add_node(c * column_spacing, t * tier_height, p * portal_spacing),
+                                   model.add_node((c + 1) * column_spacing, t * tier_height, p * portal_spacing))
+                if p:
+                    for c in range(columns):
+                        model.add_beam(model.add_node(c * column_spacing, t * tier_height, (p - 1) * portal_spacing),
+                                       model.add_node(c * column_spacing, t * tier_height, p * portal_spacing))
+        return self
+
+def use_fake_openSTAAD(fake: FakeOpenSTAAD = None, connection=None) -> FakeOpenSTAAD:
+    """Route get_openSTAAD (and everything using the connection manager) to a FakeOpenSTAAD."""
+    fake = fake if fake is not None else FakeOpenSTAAD()
+    use_python_marshalling(True)
+    (connection or get_connection()).use_factory(lambda: fake)
+    return fake
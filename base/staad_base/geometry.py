@@ -1,8 +1,10 @@
+import numpy as np
 from base.staad_base.com_array import *
 from base.geometry_base.point import *
 from base.structural_elements.beam import *
 from base.staad_base.property import *
 from base.staad_base.helper import *
+from base.staad_base.snapshot import *
 
 def get_node_count(geometry) -> int:
     nodeCount = geometry.GetNodeCount()
@@ -16,8 +18,8 @@ def get_selected_beam_count(geometry) -> int:
     nodeCount = geometry.GetNoOfSelectedBeams()
     return nodeCount
 
-def get_node_nos(geometry) -> list:
-    beamCount = get_node_count(geometry=geometry)
+def get_node_nos(geometry,nodeCount:int=None) -> list:
+    beamCount = get_node_count(geometry=geometry) if nodeCount is None else nodeCount
     safe_array_beam_list = make_safe_array_long(beamCount)
     nodes = make_variant_vt_ref(safe_array_beam_list, automation.VT_ARRAY | automation.VT_I4) # signed 32 bit integer
     geometry.GetNodeList(nodes)
@@ -34,13 +36,55 @@ def get_node_incidence(geometry,nodeNo) -> float:
     geometry.GetNodeIncidence(int(nodeNo),xptr,yptr,zptr)
     return Point3D(round(x.value,point_precision),round(y.value,point_precision),round(z.value,point_precision))
 
-def get_node_incidences(geometry) -> dict:
-    result = {}
-    node_nos = get_node_nos(geometry=geometry)
-    for nodeNo in node_nos:
-        node_incidence = get_node_incidence(geometry=geometry,nodeNo=nodeNo)
-        result[nodeNo] = node_incidence
-    return result
+# Geometry objects whose STAAD does not expose GetAllNodesCoordinates, by id
+_no_bulk_coordinates = {}
+
+def get_all_node_coordinates(geometry,nodeCount:int) -> tuple:
+    """(ids, x, y, z) from one GetAllNodesCoordinates call, None when the running STAAD does not have it."""
+    if(_no_bulk_coordinates.get(id(geometry)) is geometry):
+        return None
+    safe_array_ids = make_safe_array_long(nodeCount)
+    safe_array_x = make_safe_array_double(nodeCount)
+    safe_array_y = make_safe_array_double(nodeCount)
+    safe_array_z = make_safe_array_double(nodeCount)
+    ids = make_variant_vt_ref(safe_array_ids, automation.VT_ARRAY | automation.VT_I4)
+    x = make_variant_vt_ref(safe_array_x, automation.VT_ARRAY | automation.VT_R8)
+    y = make_variant_vt_ref(safe_array_y, automation.VT_ARRAY | automation.VT_R8)
+    z = make_variant_vt_ref(safe_array_z, automation.VT_ARRAY | automation.VT_R8)
+    try:
+        geometry.GetAllNodesCoordinates(ids,x,y,z)
+    except Exception:
+        # older releases: remember it, so later snapshots go straight to the per-node path
+        _no_bulk_coordinates[id(geometry)] = geometry
+        return None
+    return open_array(ids[0]),open_array(x[0]),open_array(y[0]),open_array(z[0])
+
+def get_node_snapshot(geometry) -> NodeSnapshot:
+    """
+    Read every node coordinate into a NodeSnapshot.
+
+    Uses the single GetAllNodesCoordinates call when the running STAAD exposes it,
+    otherwise GetNodeList plus one GetNodeIncidence per node.
+    """
+    nodeCount = get_node_count(geometry=geometry)
+    bulk = get_all_node_coordinates(geometry=geometry,nodeCount=nodeCount) if nodeCount else None
+    if(bulk is not None and len(bulk[0]) == nodeCount):
+        return NodeSnapshot(*bulk)
+
+    node_nos = get_node_nos(geometry=geometry,nodeCount=nodeCount)
+    x = np.empty(len(node_nos))
+    y = np.empty(len(node_nos))
+    z = np.empty(len(node_nos))
+    xv,xptr = get_ctype_double()
+    yv,yptr = get_ctype_double()
+    zv,zptr = get_ctype_double()
+    for row,nodeNo in enumerate(node_nos):
+        geometry.GetNodeIncidence(int(nodeNo),xptr,yptr,zptr)
+        x[row],y[row],z[row] = xv.value,yv.value,zv.value
+    return NodeSnapshot(node_nos,x,y,z)
+
+def get_node_incidences(geometry) -> NodePointView:
+    return get_node_snapshot(geometry=geometry).as_points()
 
 def get_beam_count(geometry) -> int:
     beamCount = geometry.GetMemberCount()
@@ -110,20 +154,84 @@ def get_selected_node_nos(geometry,sort:int=1,tuple:bool = False) -> list:
             result.append(node[1])
     return result
 
-def get_beam_objects(geometry,property=None,nodes=None) -> dict[int,Beam3D]:
+def get_member_incidence_arrays(geometry,nodes:NodeSnapshot,beam_nos=None) -> tuple:
+    """Member numbers with start/end rows into nodes; the ctypes out-parameters are reused across members."""
+    beam_nos = get_beam_nos(geometry=geometry) if beam_nos is None else beam_nos
+    start_rows = np.empty(len(beam_nos),dtype=np.int32)
+    end_rows = np.empty(len(beam_nos),dtype=np.int32)
+    nodeA,nodeAptr = get_ctype_long()
+    nodeB,nodeBptr = get_ctype_long()
+    for row,beamNo in enumerate(beam_nos):
+        geometry.GetMemberIncidence(int(beamNo),nodeAptr,nodeBptr)
+        start_rows[row] = nodes.index[nodeA.value]
+        end_rows[row] = nodes.index[nodeB.value]
+    return beam_nos,start_rows,end_rows
+
+def get_member_profile_arrays(property,beam_nos,known_refs:dict=None,known_names:dict=None) -> tuple:
+    """
+    Profile code per member plus the string and reference-number tables.
+
+    Reads GetBeamSectionPropertyRefNo per member and GetBeamSectionDisplayName
+    only once per distinct property, instead of once per member. OpenSTAAD has no
+    call returning the refs of many members, so members in known_refs ({member: ref},
+    e.g. from an earlier snapshot) and refs in known_names ({ref: name}) are not read again.
+    """
+    known_refs = known_refs or {}
+    known_names = known_names or {}
+    profile_codes = np.empty(len(beam_nos),dtype=np.int32)
+    profile_table = []
+    profile_refs = []
+    code_of_ref = {}
+    for row,beamNo in enumerate(beam_nos):
+        ref_no = known_refs.get(int(beamNo))
+        if(ref_no is None):
+            ref_no = get_property_id(property=property,beam_no=int(beamNo))
+        if(ref_no not in code_of_ref):
+            code_of_ref[ref_no] = len(profile_table)
+            name = known_names.get(ref_no)
+            profile_table.append(name if name is not None else get_beam_property_name(property=property,beam_no=int(beamNo)))
+            profile_refs.append(ref_no)
+        profile_codes[row] = code_of_ref[ref_no]
+    return profile_codes,profile_table,profile_refs
+
+def get_known_profiles(snapshot:ModelSnapshot,beam_nos=None,start_rows=None,end_rows=None,nodes:NodeSnapshot=None) -> tuple:
+    """
+    ({member: ref}, {ref: name}) of an earlier snapshot, for get_member_profile_arrays.
+
+    With the new incidences given, only members still joining the same two nodes are
+    taken over; a member number that was created again keeps nothing.
+    """
+    if(snapshot is None or not len(snapshot.profile_refs)):
+        return {},{}
+    codes = snapshot.profile_codes
+    refs = np.where(codes >= 0,snapshot.profile_refs[np.maximum(codes,0)],0)
+    known_refs = dict(zip(snapshot.member_ids.tolist(),refs.tolist()))
+    known_names = dict(zip(snapshot.profile_refs.tolist(),snapshot.profile_table))
+    if(beam_nos is not None):
+        old_start = snapshot.nodes.ids[snapshot.start_rows]
+        old_end = snapshot.nodes.ids[snapshot.end_rows]
+        old = dict(zip(snapshot.member_ids.tolist(),zip(old_start.tolist(),old_end.tolist())))
+        new = zip(np.asarray(beam_nos).tolist(),nodes.ids[start_rows].tolist(),nodes.ids[end_rows].tolist())
+        known_refs = {member: known_refs[member] for member,start,end in new if old.get(member) == (start,end)}
+    return known_refs,known_names
+
+def get_model_snapshot(geometry,property=None,nodes=None,previous:ModelSnapshot=None) -> ModelSnapshot:
+    """previous: an earlier snapshot of the same model whose profiles still hold, so unchanged members are not read again."""
     if(nodes is None):
-        nodes = get_node_incidences(geometry=geometry)
+        nodes = get_node_snapshot(geometry=geometry)
+    elif(not isinstance(nodes,NodeSnapshot)):
+        nodes = NodeSnapshot.from_points(nodes)
 
-    result = {}
-    beam_nos = get_beam_nos(geometry=geometry)
-    for beamNo in beam_nos:
-        beam_incidence = get_beam_incidence(geometry=geometry,beamNo=beamNo)
-        profile = ''
-        if(property):
-            profile = get_beam_property_name(property=property,beam_no=beamNo)
+    beam_nos,start_rows,end_rows = get_member_incidence_arrays(geometry=geometry,nodes=nodes)
+    snapshot = ModelSnapshot(nodes,beam_nos,start_rows,end_rows)
+    if(property):
+        known_refs,known_names = get_known_profiles(previous,beam_nos,start_rows,end_rows,nodes)
+        snapshot.set_profiles(*get_member_profile_arrays(property=property,beam_nos=beam_nos,
+                                                         known_refs=known_refs,known_names=known_names))
+    return snapshot
 
-        result[beamNo] = Beam3D(id=beamNo,start=nodes[beam_incidence[0]],end=nodes[beam_incidence[1]],profile=profile)
-    return result
+def get_beam_objects(geometry,property=None,nodes=None) -> BeamObjectView:
+    return get_model_snapshot(geometry=geometry,property=property,nodes=nodes).as_beams()
 
 def add_node(geometry,point:Point3D) -> int:
     if(point is not None):
@@ -146,6 +254,18 @@ def add_beam(geometry,beam:Beam3D):
         return geometry.AddBeam(add_node(geometry=geometry,point=beam_start),add_node(geometry=geometry,point=beam_end))
     return None
 
+@try_catch_wrapper
+def add_multiple_nodes(geometry,coordinates) -> bool:
+    """AddMultipleNodes with a flat [x1,y1,z1,x2,...] array; None when the running STAAD lacks it."""
+    geometry.AddMultipleNodes(make_safe_array_double(len(coordinates),list(coordinates)))
+    return True
+
+@try_catch_wrapper
+def add_multiple_beams(geometry,incidences) -> bool:
+    """AddMultipleBeams with a flat [start1,end1,start2,...] node array; None when the running STAAD lacks it."""
+    geometry.AddMultipleBeams(make_safe_array_long(len(incidences),list(incidences)))
+    return True
+
 def get_node_number(geometry,point:Point3D):
     if geometry and point:
         point.__round__()
@@ -174,6 +294,9 @@ def break_beams(geometry,nodes):
     geometry.BreakBeamsAtSpecificNodes(make_safe_array_long(values=nodes),beams_1,beams_2)
     return {'existing_beams':open_array(beams_1),'new_beams':open_array(beams_2)}
 
-add_beams_fn = lambda geometry : lambda beams : list(map(lambda beam: add_beam(geometry=geometry, beam=beam), [*beams]))
+def add_beams_fn(geometry):
+    # deduplicated, batched creation; imported here as geometry_writer builds on this module
+    from base.staad_base.geometry_writer import get_geometry_writer
+    return lambda beams : get_geometry_writer(geometry).write(beams)
 select_beams_fn = lambda geometry : lambda beams : list(map(lambda beam: select_beam(geometry=geometry, beamNo=beam), [*beams]))
 select_nodes_fn = lambda geometry : lambda nodes : list(map(lambda node: select_node(geometry=geometry, nodeNo=node), [*nodes]))
\ No newline at end of file
@@ -0,0 +1,155 @@
+from base.staad_base.geometry import *
+from base.staad_base.assignment import forget_assignments
+
+class GeometryWriter:
+    """Collects the members of a build and creates them in as few OpenSTAAD calls as possible.
+
+    Nodes are deduplicated on coordinates quantised to point_precision, against each
+    other and against the nodes already in the model, then created with one
+    AddMultipleNodes call and the members with one AddMultipleBeams call. Builds
+    running on a STAAD without the bulk calls fall back to AddNode / AddBeam, still
+    once per distinct node instead of twice per member.
+
+    add_beams returns the id list straight away and fills it in place on flush(),
+    so it can be collected like the lists add_beams_fn returns:
+
+        with GeometryWriter(geometry) as writer:
+            portal_beam_ids = writer.add_beams(portal.beams)
+            long_beam_ids = writer.add_beams(longitudinal_beams)
+        assign_profile(portal_beam_ids, ...)
+
+    write(beams) adds and flushes in one go and is what add_beams_fn now uses, on the
+    writer get_geometry_writer keeps per Geometry object: the model's nodes are read
+    once into the writer's index, which then follows the nodes it creates. Each flush
+    only probes GetNodeCount and reads the nodes again when the count shows the model
+    was changed outside the writer.
+    """
+
+    def __init__(self, geometry, precision: int = point_precision, bulk: bool = True):
+        self.geometry = geometry
+        self.scale = 10 ** precision
+        self.bulk = bulk
+        self._nodes = {}
+        self._node_count = None
+        self._pending = []
+        self.stats = {'flushes': 0, 'nodes_added': 0, 'nodes_reused': 0, 'beams_added': 0, 'node_reads': 0}
+
+    def _key(self, point: Point3D) -> tuple:
+        return (round(point.x * self.scale), round(point.y * self.scale), round(point.z * self.scale))
+
+    def add_beam(self, beam: Beam3D) -> list:
+        return self.add_beams([beam])
+
+    def add_beams(self, beams) -> list:
+        """Queue members; the returned list holds their numbers after flush() (None for beams without both ends)."""
+        beams = [*beams]
+        ids = [None] * len(beams)
+        for i, beam in enumerate(beams):
+            if(beam is not None and beam.start is not None and beam.end is not None):
+                self._pending.append((ids, i, round(beam.start), round(beam.end)))
+        return ids
+
+    def write(self, beams) -> list:
+        ids = self.add_beams(beams)
+        self.flush()
+        return ids
+
+    def node_id(self, point: Point3D):
+        """Node number at point, from the writer's index (e.g. for support nodes) without GetNodeNumber."""
+        return self._nodes.get(self._key(round(point)))
+
+    def _load_existing(self) -> None:
+        nodes = get_node_snapshot(self.geometry)
+        self._nodes = {self._key(Point3D(x, y, z)): int(node_no)
+                       for node_no, x, y, z in zip(nodes.ids.tolist(), nodes.x.tolist(), nodes.y.tolist(), nodes.z.tolist())}
+        self._node_count = len(nodes)
+        self.stats['node_reads'] += 1
+
+    def _sync_nodes(self) -> None:
+        """Read the model's nodes on the first flush and whenever the node count moved outside the writer."""
+        if(self._node_count is None or get_node_count(geometry=self.geometry) != self._node_count):
+            self._load_existing()
+
+    def invalidate(self) -> None:
+        """Forget the node index, e.g. after nodes were moved in STAAD; the next flush reads them again."""
+        self._node_count = None
+
+    def _bulk_ids(self, add, count_fn, list_method: str, values, count, before: int = None) -> list:
+        before = count_fn(geometry=self.geometry) if before is None else before
+        added = add(self.geometry, values)
+        after = count_fn(geometry=self.geometry)
+        if(added and after == before + count):
+            # the count is known, so the list is read without the count call get_node_nos / get_beam_nos make
+            numbers = make_variant_vt_ref(make_safe_array_long(after), automation.VT_ARRAY | automation.VT_I4)
+            getattr(self.geometry, list_method)(numbers)
+            return [int(no) for no in read_ref(numbers)[-count:]]
+        if(after != before):
+            raise RuntimeError(f"{add.__name__} created {after - before} of {count} items, the model needs checking")
+        self.bulk = False
+        return None
+
+    def _add_nodes(self, points: list) -> list:
+        ids = None
+        if(self.bulk and len(points) > 1):
+            # _sync_nodes has just counted the nodes
+            ids = self._bulk_ids(add_multiple_nodes, get_node_count, 'GetNodeList',
+                                 [c for point in points for c in (point.x, point.y, point.z)], len(points), self._node_count)
+        if(ids is None):
+            ids = [self.geometry.AddNode(point.x, point.y, point.z) for point in points]
+        return ids
+
+    def _add_members(self, incidences: list) -> list:
+        ids = None
+        if(self.bulk and len(incidences) > 1):
+            ids = self._bulk_ids(add_multiple_beams, get_beam_count, 'GetBeamList',
+                                 [node_no for pair in incidences for node_no in pair], len(incidences))
+        if(ids is None):
+            ids = [self.geometry.AddBeam(a, b) for a, b in incidences]
+        return ids
+
+    def flush(self) -> None:
+        """Create every queued node and member and fill the id lists handed out by add_beams."""
+        if(not self._pending):
+            return
+        self._sync_nodes()
+
+        new_nodes = {}
+        for _, _, start, end in self._pending:
+            for point in (start, end):
+                key = self._key(point)
+                if(key in self._nodes or key in new_nodes):
+                    self.stats['nodes_reused'] += 1
+                else:
+                    new_nodes[key] = point
+
+        if(new_nodes):
+            self._nodes.update(zip(new_nodes, self._add_nodes(list(new_nodes.values()))))
+            self._node_count += len(new_nodes)
+
+        incidences = [(self._nodes[self._key(start)], self._nodes[self._key(end)]) for _, _, start, end in self._pending]
+        beam_nos = self._add_members(incidences)
+        for (ids, i, _, _), beam_no in zip(self._pending, beam_nos):
+            ids[i] = beam_no
+        # numbers STAAD handed out again carry nothing of what was assigned to them before
+        forget_assignments(member_ids=beam_nos, node_ids=list(self._nodes[key] for key in new_nodes))
+
+        self.stats['flushes'] += 1
+        self.stats['nodes_added'] += len(new_nodes)
+        self.stats['beams_added'] += len(self._pending)
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if(exc_type is None):
+            self.flush()
+
+_writers = {}
+
+def get_geometry_writer(geometry) -> GeometryWriter:
+    """Writer of the given Geometry object, shared by every add_beams of the session so its node index is read once."""
+    writer = _writers.get(id(geometry))
+    if(writer is None or writer.geometry is not geometry):
+        writer = _writers[id(geometry)] = GeometryWriter(geometry)
+    return writer
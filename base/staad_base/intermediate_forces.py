@@ -0,0 +1,174 @@
+import ctypes
+import numpy as np
+from base.staad_base.com_array import *
+from base.staad_base.result_tensor import *
+from base.staad_base.root import get_staad_file_name
+from base.staad_base.analysis import on_analysis_complete, remove_analysis_listener, last_analysis_run, results_probe
+
+def station_fractions(stations: int) -> np.ndarray:
+    """Evenly spaced stations from the start (0) to the end (1) of a member."""
+    if(stations < 2):
+        raise ValueError(f"At least 2 stations are needed, got {stations}")
+    return np.linspace(0.0, 1.0, stations)
+
+def sample_intermediate_forces(output, members, cases, fractions, batch_size: int = 256, on_progress=None) -> np.ndarray:
+    """
+    (members × stations × cases × 6) local forces, FORCE_COMPONENTS order, with
+    GetIntermediateMemberForcesAtDistance at every fraction of the member length.
+
+    Members are read batch_size at a time into one pooled buffer; on_progress(members_done)
+    is called after every batch.
+    """
+    members = [int(member) for member in members]
+    cases = [int(case) for case in cases]
+    fractions = [float(fraction) for fraction in fractions]
+    values = np.empty((len(members), len(fractions), len(cases), len(FORCE_COMPONENTS)))
+    safe_array, forces = pooled_safe_array(ctypes.c_double, 6)
+    for start in range(0, len(members), batch_size):
+        for row, member in enumerate(members[start:start + batch_size], start):
+            for station, fraction in enumerate(fractions):
+                for column, case in enumerate(cases):
+                    output.GetIntermediateMemberForcesAtDistance(member, fraction, case, forces)
+                    values[row, station, column] = safe_array_view(safe_array, ctypes.c_double)
+        if(on_progress is not None):
+            on_progress(min(start + batch_size, len(members)))
+    return values
+
+class IntermediateForceCache:
+    """
+    Internal forces at stations along members, read from STAAD once per analysis run.
+
+    Forces are sampled only for the members asked for (e.g. the tier beams carrying
+    flare loads), at the same stations for every member, and kept in one
+    (members × stations × cases × 6) array that grows by member row and by case
+    column; only the (member, case) pairs not read yet are fetched, in batches, so a
+    diagram per case followed by an envelope over all cases reads nothing twice. Like
+    DesignResultCache it empties itself when an AnalysisRun finishes or results_probe()
+    changes, so repeated renders of a report do not query STAAD again.
+
+    Attributes:
+        fractions (np.ndarray): Station positions as fractions of the member length.
+        run_id (int): Id of the analysis run the cached values come from, 0 before any run of the session.
+        members, cases (np.ndarray): int32 ids along the first and third axes of values.
+        values (np.ndarray): (members, stations, cases, 6) forces read so far, NaN where not read.
+        stats (dict): Members fetched and served from the cache, STAAD calls made, invalidations.
+
+    Example:
+        cache = get_intermediate_force_cache(STAAD_objects.output, stations=21)
+        x, mz = cache.diagram(member, case, 'MZ', length=get_beam_length(geometry, member))
+        maxima, minima = cache.envelope(flare_beams, cases, 'MZ')
+    """
+
+    def __init__(self, output, stations: int = 11, batch_size: int = 256, file_name=get_staad_file_name):
+        self.output = output
+        self.file_name = file_name
+        self.fractions = station_fractions(stations)
+        self.batch_size = batch_size
+        self.stats = {'hits': 0, 'fetched': 0, 'calls': 0, 'invalidations': -1}
+        self.invalidate()
+        on_analysis_complete(self._on_analysis)
+
+    def _on_analysis(self, run) -> None:
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        run = last_analysis_run()
+        self.run_id = run.run_id if run is not None else 0
+        self.probe = results_probe(self.file_name)
+        self.members = np.zeros(0, dtype=np.int32)
+        self.cases = np.zeros(0, dtype=np.int32)
+        self.values = np.zeros((0, len(self.fractions), 0, len(FORCE_COMPONENTS)))
+        # (members, cases) True where the forces have been read
+        self.filled = np.zeros((0, 0), dtype=bool)
+        self.index = {}
+        self.case_index = {}
+        self.stats['invalidations'] += 1
+
+    def _grow(self, members: list, cases: list) -> None:
+        """Rows / columns (NaN, not filled) for members and cases not in the array yet."""
+        new_members = [member for member in dict.fromkeys(members) if member not in self.index]
+        new_cases = [case for case in dict.fromkeys(cases) if case not in self.case_index]
+        if(new_members):
+            self.index.update((member, len(self.members) + i) for i, member in enumerate(new_members))
+            self.members = np.concatenate((self.members, np.array(new_members, dtype=np.int32)))
+            self.values = np.concatenate((self.values, np.full((len(new_members), *self.values.shape[1:]), np.nan)))
+            self.filled = np.concatenate((self.filled, np.zeros((len(new_members), self.filled.shape[1]), dtype=bool)))
+        if(new_cases):
+            self.case_index.update((case, len(self.cases) + i) for i, case in enumerate(new_cases))
+            self.cases = np.concatenate((self.cases, np.array(new_cases, dtype=np.int32)))
+            shape = self.values.shape
+            self.values = np.concatenate((self.values, np.full((shape[0], shape[1], len(new_cases), shape[3]), np.nan)), axis=2)
+            self.filled = np.concatenate((self.filled, np.zeros((len(self.members), len(new_cases)), dtype=bool)), axis=1)
+
+    def forces(self, members, cases) -> np.ndarray:
+        """(members × stations × cases × 6) in the order of members and cases."""
+        run = last_analysis_run()
+        if(run is not None and run.run_id != self.run_id):
+            # a run finished but its listeners have not been called yet
+            self.invalidate()
+        elif(results_probe(self.file_name) != self.probe):
+            # analysed outside the session or another model opened
+            self.invalidate()
+        members = [member.id if hasattr(member, 'id') else int(member) for member in members]
+        cases = [int(case) for case in cases]
+        self._grow(members, cases)
+        rows = np.fromiter((self.index[member] for member in members), dtype=np.int64, count=len(members))
+        columns = np.fromiter((self.case_index[case] for case in cases), dtype=np.int64, count=len(cases))
+
+        unique_rows = np.unique(rows)
+        fetched = set()
+        for column, case in zip(np.unique(columns).tolist(), self.cases[np.unique(columns)].tolist()):
+            missing = unique_rows[~self.filled[unique_rows, column]]
+            if(not len(missing)):
+                continue
+            self.values[missing, :, column:column + 1] = sample_intermediate_forces(
+                self.output, self.members[missing].tolist(), [case], self.fractions, self.batch_size)
+            self.filled[missing, column] = True
+            fetched.update(missing.tolist())
+            self.stats['calls'] += len(missing) * len(self.fractions)
+        self.stats['fetched'] += len(fetched)
+        self.stats['hits'] += len(members) - len(fetched)
+        return self.values[rows][:, :, columns]
+
+    def diagram(self, member, case, component: str = 'MZ', length: float = 1.0) -> tuple:
+        """(distances, values) of one force component along a member for one case, ready to plot."""
+        values = self.forces([member], [case])[0, :, 0, FORCE_COMPONENTS.index(component)]
+        return self.fractions * length, values
+
+    def diagrams(self, members, cases, component: str = 'MZ') -> np.ndarray:
+        """(members × cases × stations) of one component, for plotting several lines at once."""
+        return np.transpose(self.forces(members, cases)[..., FORCE_COMPONENTS.index(component)], (0, 2, 1))
+
+    def envelope(self, members, cases, component: str = None) -> tuple:
+        """
+        (maxima, minima) over the cases at every station: (members × stations × 6),
+        or (members × stations) for a single component.
+        """
+        values = self.forces(members, cases)
+        if(component is not None):
+            values = values[..., FORCE_COMPONENTS.index(component)]
+        return values.max(axis=2), values.min(axis=2)
+
+    def extremes(self, members, cases, component: str = 'MZ') -> list[dict]:
+        """Per member the value of component largest in magnitude along it, with its station and case."""
+        members = [member.id if hasattr(member, 'id') else int(member) for member in members]
+        cases = [int(case) for case in cases]
+        values = self.forces(members, cases)[..., FORCE_COMPONENTS.index(component)]
+        if(not values.size):
+            return []
+        stations, columns = np.unravel_index(np.abs(values).reshape(len(values), -1).argmax(axis=1), values.shape[1:])
+        return [{'member': member, 'fraction': float(self.fractions[station]), 'case': cases[column],
+                 'value': float(values[row, station, column])}
+                for row, (member, station, column) in enumerate(zip(members, stations.tolist(), columns.tolist()))]
+
+_caches = {}
+
+def get_intermediate_force_cache(output, stations: int = 11) -> IntermediateForceCache:
+    """Cache of the given Output object for a number of stations, shared by every report reading through it."""
+    key = (id(output), stations)
+    cache = _caches.get(key)
+    if(cache is None or cache.output is not output):
+        if(cache is not None):
+            remove_analysis_listener(cache._on_analysis)
+        cache = _caches[key] = IntermediateForceCache(output, stations)
+    return cache
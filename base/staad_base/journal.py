@@ -0,0 +1,459 @@
+from base.geometry_base.point import Point3D
+from base.geometry_base.rectangle import Rectangle
+from base.geometry_base.circle import Circle
+from base.structural_elements.beam import Beam3D
+from base.load.nodal_load import NodalLoad
+from base.load.uniform_load import UniformLoad
+from base.staad_base.load_enum import *
+from base.staad_base.helper import point_precision
+from base.staad_base.property import *
+from base.staad_base.load import set_load_case_active, add_member_uniform_force, add_member_conc_force, add_node_conc_force
+from base.staad_base.geometry import get_node_number
+from base.staad_base.geometry_writer import get_geometry_writer
+from base.staad_base.std_writer import StdModelBuilder, member_load_text, nodal_load_text, _release_end
+
+# steel table of CreateBeamPropertyFromTable country codes in a MEMBER PROPERTY header
+COUNTRY_TABLES = {10: 'INDIAN', 35: 'TATASTRUCTURA'}
+RELEASE_DOFS = ('FX', 'FY', 'FZ', 'MX', 'MY', 'MZ')
+# LOADTYPE words that are not the LoadType member name
+LOADTYPE_WORDS = {LoadType.RoofLive: 'Roof Live', LoadType.SeismicH: 'Seismic-H', LoadType.SeismicV: 'Seismic-V',
+                  LoadType.NoneType: 'None'}
+
+def _point_key(point: Point3D) -> tuple:
+    point = round(point, point_precision)
+    return (point.x, point.y, point.z)
+
+def _profile_key(profile) -> tuple:
+    return concrete_key(profile) if isinstance(profile, (Rectangle, Circle)) else steel_key(profile)
+
+class ComTarget:
+    """Applies journal operations to a STAAD model through OpenSTAAD (OpenSTAAD_objects of get_openSTAAD)."""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.registry = get_property_registry(objects.property)
+        # one writer for every add_beams op, so the node index is read once per replay
+        self.writer = get_geometry_writer(objects.geometry)
+        self.release_specs = {}
+        self.support_specs = {}
+
+    def add_beams(self, points) -> list:
+        return self.writer.write([Beam3D(start, end) for start, end in points])
+
+    def profile(self, ids, profile, country) -> None:
+        ref_no = self.registry.concrete(profile) if isinstance(profile, (Rectangle, Circle)) else self.registry.steel(profile, country)
+        assign_profile(self.objects.property)(ids, ref_no)
+
+    def release(self, ids, release: str) -> None:
+        """Like StdModelBuilder.release: a release without START / END is one spec on each end."""
+        end = _release_end(release)
+        words = release.upper().split()
+        dofs = {dof.lower(): int(dof in (words[1:] if end else words)) for dof in RELEASE_DOFS}
+        ids = [*ids]
+        for location in ((0 if end == 'START' else 1,) if end else (0, 1)):
+            spec_no = self.release_specs.get((release, location))
+            if(spec_no is None):
+                spec_no = self.release_specs[(release, location)] = self.objects.property.CreateMemberReleaseSpec(location,
+                                                                                                                  set_DOFReleaseArray(**dofs))
+            assign_specification(self.objects.property)(ids, spec_no)
+
+    def material(self, ids, name: str) -> None:
+        assign_material(self.objects.property)(name)(ids)
+
+    def support(self, points, kind: str) -> list:
+        spec_no = self.support_specs.get(kind)
+        if(spec_no is None):
+            create = self.objects.support.CreateSupportPinned if kind == 'PINNED' else self.objects.support.CreateSupportFixed
+            spec_no = self.support_specs[kind] = create()
+        nodes = [get_node_number(self.objects.geometry, Point3D(*_point_key(point))) for point in points]
+        assign_in_bulk(lambda node_nos: self.objects.support.AssignSupportToNode(node_nos, spec_no), nodes)
+        return nodes
+
+    def load_case(self, case: int, title: str, load_type: LoadType) -> None:
+        self.objects.load.CreateNewPrimaryLoadEx2(title, int(load_type), int(case))
+
+    def selfweight(self, case: int, direction, factor: float) -> None:
+        set_load_case_active(self.objects.load, case)
+        self.objects.load.AddSelfWeightInXYZ(direction, factor)
+
+    def member_load(self, ids, load_object, case: int) -> None:
+        set_load_case_active(self.objects.load, case)
+        add = add_member_uniform_force if isinstance(load_object, UniformLoad) else add_member_conc_force
+        for id in ids:
+            add(self.objects.load, id, load_object)
+
+    def nodal_load(self, points, load_object, case: int) -> None:
+        set_load_case_active(self.objects.load, case)
+        for point in points:
+            add_node_conc_force(self.objects.load, get_node_number(self.objects.geometry, Point3D(*_point_key(point))), load_object)
+
+class StdTarget:
+    """Applies journal operations to a StdModelBuilder, i.e. as .std text."""
+
+    def __init__(self, builder: StdModelBuilder = None):
+        self.builder = builder if builder is not None else StdModelBuilder()
+
+    def add_beams(self, points) -> list:
+        return self.builder.add_beams([Beam3D(start, end) for start, end in points])
+
+    def profile(self, ids, profile, country) -> None:
+        if(isinstance(profile, (Rectangle, Circle))):
+            self.builder.profile(ids, profile)
+        else:
+            self.builder.profile(ids, f"TABLE ST {profile}", COUNTRY_TABLES.get(country, 'AMERICAN'))
+
+    def release(self, ids, release: str) -> None:
+        self.builder.release(ids, release)
+
+    def material(self, ids, name: str) -> None:
+        self.builder.material(ids, name)
+
+    def support(self, points, kind: str) -> list:
+        return self.builder.support([Point3D(*_point_key(point)) for point in points], kind)
+
+    def load_case(self, case: int, title: str, load_type: LoadType) -> None:
+        self.builder.load_case(case, title, LOADTYPE_WORDS.get(load_type, load_type.name))
+
+    def selfweight(self, case: int, direction, factor: float) -> None:
+        self.builder.selfweight(case, direction, factor)
+
+    def member_load(self, ids, load_object, case: int) -> None:
+        self.builder.member_load(ids, load_object, case)
+
+    def nodal_load(self, points, load_object, case: int) -> None:
+        self.builder.nodal_load([Point3D(*_point_key(point)) for point in points], load_object, case)
+
+class JournalOp:
+    """One recorded model mutation. Member ids are the ones of the model the journal was recorded on;
+    apply() maps them through id_map (recorded -> replayed member number) before calling the target."""
+
+    kind = None
+
+    def apply(self, target, id_map: dict) -> None:
+        raise NotImplementedError
+
+    def _ids(self, ids, id_map: dict) -> list:
+        return [id_map.get(id, id) for id in ids]
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={len(value)} ids" if key in ('ids', 'points') else f"{key}={value!r}"
+                           for key, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+class AddBeams(JournalOp):
+    kind = 'beams'
+
+    def __init__(self, points, ids=None):
+        self.points = [(round(start, point_precision), round(end, point_precision)) for start, end in points]
+        self.ids = list(ids) if ids is not None else []
+
+    def apply(self, target, id_map: dict) -> list:
+        ids = target.add_beams(self.points)
+        id_map.update((old, new) for old, new in zip(self.ids, ids) if old is not None)
+        return ids
+
+class AssignProfile(JournalOp):
+    """profile is a table section name ('ISMB300') or a prismatic Rectangle / Circle."""
+    kind = 'profile'
+
+    def __init__(self, ids, profile, country: int = None):
+        self.ids = [int(id) for id in ids if id is not None]
+        self.profile = profile
+        self.country = (35 if ('SHS' in profile or 'RHS' in profile) else 10) if country is None and isinstance(profile, str) else country
+
+    def key(self) -> tuple:
+        return (_profile_key(self.profile), self.country)
+
+    def apply(self, target, id_map: dict) -> None:
+        target.profile(self._ids(self.ids, id_map), self.profile, self.country)
+
+class AssignRelease(JournalOp):
+    """release like 'START MY MZ' / 'END MY MZ', as in a STAAD MEMBER RELEASE line."""
+    kind = 'release'
+
+    def __init__(self, ids, release: str = 'START MY MZ'):
+        self.ids = [int(id) for id in ids if id is not None]
+        self.release = ' '.join(release.upper().split())
+
+    def key(self) -> str:
+        return self.release
+
+    def apply(self, target, id_map: dict) -> None:
+        target.release(self._ids(self.ids, id_map), self.release)
+
+class AssignMaterial(JournalOp):
+    kind = 'material'
+
+    def __init__(self, ids, name: str = 'STEEL'):
+        self.ids = [int(id) for id in ids if id is not None]
+        self.name = name
+
+    def key(self) -> str:
+        return self.name
+
+    def apply(self, target, id_map: dict) -> None:
+        target.material(self._ids(self.ids, id_map), self.name)
+
+class AssignSupport(JournalOp):
+    """Supports by point, as node numbers differ between the recorded and the replayed model."""
+    kind = 'support'
+
+    def __init__(self, points, support: str = 'FIXED'):
+        self.points = [round(point, point_precision) for point in points if point is not None]
+        self.support = support.upper()
+
+    def apply(self, target, id_map: dict) -> list:
+        return target.support(self.points, self.support)
+
+class CreateLoadCase(JournalOp):
+    kind = 'load_case'
+
+    def __init__(self, case: int, title: str = '', load_type: LoadType = LoadType.NoneType):
+        self.case = int(case)
+        self.title = title or (LoadCase(self.case).name if self.case in LoadCase._value2member_map_ else f"LOAD CASE {self.case}")
+        self.load_type = LoadType(int(load_type))
+
+    def apply(self, target, id_map: dict) -> None:
+        target.load_case(self.case, self.title, self.load_type)
+
+class AddSelfweight(JournalOp):
+    kind = 'selfweight'
+
+    def __init__(self, case: int, direction=MemberDirection.Y, factor: float = -1):
+        self.case = int(case)
+        self.direction = direction
+        self.factor = factor
+
+    def apply(self, target, id_map: dict) -> None:
+        target.selfweight(self.case, self.direction, self.factor)
+
+class AddMemberLoad(JournalOp):
+    """A UniformLoad or ConcentratedLoad on members; loads add up, so compaction only merges, never drops."""
+    kind = 'member_load'
+
+    def __init__(self, ids, load_object, case: int = None):
+        self.ids = [beam.id if isinstance(beam, Beam3D) else int(beam) for beam in ids]
+        self.load_object = load_object
+        self.case = int(case if case is not None else load_object.load_case)
+
+    def key(self) -> tuple:
+        return (self.case, type(self.load_object).__name__, member_load_text(self.load_object))
+
+    def apply(self, target, id_map: dict) -> None:
+        target.member_load(self._ids(self.ids, id_map), self.load_object, self.case)
+
+class AddNodalLoad(JournalOp):
+    kind = 'nodal_load'
+
+    def __init__(self, points, load_object: NodalLoad, case: int = None):
+        self.points = [round(point, point_precision) for point in points if point is not None]
+        self.load_object = load_object
+        self.case = int(case if case is not None else load_object.load_case)
+
+    def key(self) -> tuple:
+        return (self.case, nodal_load_text(self.load_object))
+
+    def apply(self, target, id_map: dict) -> None:
+        target.nodal_load(self.points, self.load_object, self.case)
+
+def compact_ops(ops) -> list:
+    """
+    The shortest op list that builds the same model.
+
+    Profiles and materials: the last assignment of a member wins, and the members that
+    end up with the same one share a single op, placed where that value was last assigned.
+    Releases and supports are deduplicated, a repeated load case keeps its last title at
+    its first position, and consecutive identical loads of a case merge into one op.
+    """
+    ops = list(ops)
+    slots = [[op] for op in ops]
+
+    for kind in ('profile', 'material'):
+        final = {}
+        last_op_of_key = {}
+        for position, op in enumerate(ops):
+            if(op.kind == kind):
+                for id in op.ids:
+                    final[id] = op.key()
+                last_op_of_key[op.key()] = position
+        members_of_key = {}
+        for id, key in final.items():
+            members_of_key.setdefault(key, []).append(id)
+        for position, op in enumerate(ops):
+            if(op.kind == kind):
+                slots[position] = []
+        for key, ids in members_of_key.items():
+            source = ops[last_op_of_key[key]]
+            merged = AssignProfile(ids, source.profile, source.country) if kind == 'profile' else AssignMaterial(ids, source.name)
+            slots[last_op_of_key[key]] = [merged]
+
+    seen_releases = set()
+    support_of_point = {}
+    last_support = {}
+    first_case = {}
+    for position, op in enumerate(ops):
+        if(op.kind == 'release'):
+            ids = [id for id in dict.fromkeys(op.ids) if (id, op.release) not in seen_releases]
+            seen_releases.update((id, op.release) for id in ids)
+            slots[position] = [AssignRelease(ids, op.release)] if ids else []
+        elif(op.kind == 'support'):
+            for point in op.points:
+                support_of_point[_point_key(point)] = (point, op.support)
+                last_support[op.support] = position
+            slots[position] = []
+        elif(op.kind == 'load_case'):
+            if(op.case in first_case):
+                slots[first_case[op.case]] = [CreateLoadCase(op.case, op.title, op.load_type)]
+                slots[position] = []
+            else:
+                first_case[op.case] = position
+
+    points_of_support = {}
+    for point, support in support_of_point.values():
+        points_of_support.setdefault(support, []).append(point)
+    for support, points in points_of_support.items():
+        slots[last_support[support]] = [AssignSupport(points, support)]
+
+    result = []
+    for slot in slots:
+        for op in slot:
+            previous = result[-1] if result else None
+            if(previous is not None and op.kind in ('member_load', 'nodal_load') and previous.kind == op.kind and previous.key() == op.key()):
+                merged = AddMemberLoad(previous.ids + op.ids, op.load_object, op.case) if op.kind == 'member_load' \
+                    else AddNodalLoad(previous.points + op.points, op.load_object, op.case)
+                result[-1] = merged
+            else:
+                result.append(op)
+    return result
+
+class Journal:
+    """
+    Records every model mutation of a generator as a typed operation.
+
+    The recording methods mirror the notebook helpers (add_beams, assign_profile,
+    set_start_end_release, add_*_forces_to_members ...). With STAAD objects the
+    operation is applied to the open model as it is recorded; without, the model
+    is numbered locally through a StdModelBuilder, so a generator can also run
+    offline. The log can then be compacted and replayed into a fresh model over
+    COM (replay) or as one .std file (write_std), and checkpoints allow a partial
+    rollback: truncate to a checkpoint and rebuild from there.
+
+    Example:
+        journal = Journal(STAAD_objects)
+        ids = journal.add_beams(portal.beams)
+        journal.assign_profile(ids, 'ISMB300')
+        journal.start_end_release(ids)
+        journal.checkpoint('portals')
+        ...
+        journal.rollback('portals')              # forget what came after
+        journal.write_std('rebuild.std')         # or journal.replay(fresh_objects)
+    """
+
+    def __init__(self, objects=None):
+        self.target = ComTarget(objects) if objects is not None else StdTarget()
+        self.ops = []
+        self.checkpoints = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        return iter(self.ops)
+
+    def record(self, op: JournalOp):
+        """Apply op to the journal's model and log it; returns what the target returned (ids for beams / supports)."""
+        result = op.apply(self.target, {})
+        if(op.kind == 'beams'):
+            op.ids = list(result)
+        self.ops.append(op)
+        return result
+
+    def add_beams(self, beams) -> list:
+        beams = [beam for beam in beams]
+        ids = [None] * len(beams)
+        valid = [i for i, beam in enumerate(beams) if beam is not None and beam.start is not None and beam.end is not None]
+        created = self.record(AddBeams([(beams[i].start, beams[i].end) for i in valid]))
+        for i, id in zip(valid, created):
+            ids[i] = id
+        return ids
+
+    def assign_profile(self, ids, profile, country: int = None) -> None:
+        self.record(AssignProfile(ids, profile, country))
+
+    def release(self, ids, release: str = 'START MY MZ') -> None:
+        self.record(AssignRelease(ids, release))
+
+    def start_end_release(self, ids) -> None:
+        ids = [*ids]
+        self.release(ids, 'START MY MZ')
+        self.release(ids, 'END MY MZ')
+
+    def assign_material(self, ids, name: str = 'STEEL') -> None:
+        self.record(AssignMaterial(ids, name))
+
+    def support(self, points, support: str = 'FIXED') -> list:
+        return self.record(AssignSupport(points, support))
+
+    def load_case(self, case: int, title: str = '', load_type: LoadType = LoadType.NoneType) -> None:
+        self.record(CreateLoadCase(case, title, load_type))
+
+    def selfweight(self, case: int, direction=MemberDirection.Y, factor: float = -1) -> None:
+        self.record(AddSelfweight(case, direction, factor))
+
+    def member_load(self, beams, load_object, case: int = None) -> None:
+        self.record(AddMemberLoad(beams, load_object, case))
+
+    def nodal_load(self, points, load_object: NodalLoad, case: int = None) -> None:
+        self.record(AddNodalLoad(points, load_object, case))
+
+    def checkpoint(self, name: str) -> int:
+        self.checkpoints[name] = len(self.ops)
+        return self.checkpoints[name]
+
+    def until(self, name: str) -> list:
+        """Ops recorded before checkpoint name."""
+        return self.ops[:self.checkpoints[name]]
+
+    def rollback(self, name: str) -> list:
+        """Drop the ops recorded after checkpoint name (and the later checkpoints); returns the dropped ops.
+        The open model still has them: replay the journal into a fresh model to get the rolled-back state."""
+        position = self.checkpoints[name]
+        dropped = self.ops[position:]
+        self.ops = self.ops[:position]
+        self.checkpoints = {key: value for key, value in self.checkpoints.items() if value <= position}
+        return dropped
+
+    def compact(self) -> list:
+        """Compacted copy of the log, see compact_ops; the journal itself is left as recorded."""
+        return compact_ops(self.ops)
+
+    def replay(self, objects, compact: bool = True, until: str = None) -> dict:
+        """
+        Rebuild the journal into the model open behind objects (usually a new, empty file).
+
+        Returns:
+            dict: recorded member number -> member number in the rebuilt model.
+        """
+        return self.replay_into(ComTarget(objects), compact, until)
+
+    def replay_into(self, target, compact: bool = True, until: str = None) -> dict:
+        ops = self.until(until) if until is not None else self.ops
+        id_map = {}
+        for op in (compact_ops(ops) if compact else ops):
+            op.apply(target, id_map)
+        return id_map
+
+    def to_builder(self, compact: bool = True, until: str = None) -> StdModelBuilder:
+        target = StdTarget()
+        self.replay_into(target, compact, until)
+        return target.builder
+
+    def write_std(self, target, compact: bool = True, until: str = None, **kwargs):
+        """Write the (compacted) journal as a .std file; kwargs go to StdModelBuilder.write."""
+        return self.to_builder(compact, until).write(target, **kwargs)
+
+    def summary(self) -> dict:
+        counts = {}
+        for op in self.ops:
+            counts[op.kind] = counts.get(op.kind, 0) + 1
+        return counts
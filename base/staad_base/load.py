@@ -92,29 +92,23 @@ def get_nodal_load_info(load,load_case,load_index_no:int) -> list:
     if(load_case):
         set_load_case_active(load,load_case)
 
-    safe_array_load_list = make_safe_array_double(6)
-    forces = make_variant_vt_ref(safe_array_load_list, automation.VT_ARRAY | automation.VT_R8)
+    safe_array_forces,forces = pooled_safe_array(ctypes.c_double,6)
     load.GetNodalLoadInfo(load_index_no,forces)
-    forces = forces[0]
-    return {'forces':list(map(convert_kn_to_mt,open_array(forces)))}
+    return {'forces':convert_kn_to_mt(safe_array_view(safe_array_forces,ctypes.c_double))}
 
 def get_member_load_info(load,load_case,load_index_no:int) -> list:
     if(load_case):
         set_load_case_active(load,load_case)
 
     direction,direction_ptr = get_ctype_long()
-    safe_array_load_list_1 = make_safe_array_double(3)
-    safe_array_load_list_2 = make_safe_array_double(3)
-
-    forces = make_variant_vt_ref(safe_array_load_list_1, automation.VT_ARRAY | automation.VT_R8)
-    distances = make_variant_vt_ref(safe_array_load_list_2, automation.VT_ARRAY | automation.VT_R8)
+    safe_array_forces,forces = pooled_safe_array(ctypes.c_double,3,slot=0)
+    safe_array_distances,distances = pooled_safe_array(ctypes.c_double,3,slot=1)
 
     load.GetMemberLoadInfo(load_index_no,direction_ptr,forces,distances)
 
-    forces = forces[0]
-    distances = distances[0]
-
-    return {'direction':direction.value,'forces':list(map(convert_kn_to_mt,open_array(forces))),'distances':open_array(distances)}
+    return {'direction':direction.value,
+            'forces':convert_kn_to_mt(safe_array_view(safe_array_forces,ctypes.c_double)),
+            'distances':safe_array_view(safe_array_distances,ctypes.c_double).copy()}
 
 def add_node_conc_force(load,nodeNo:int, load_object : NodalLoad):
     return load.AddNodalLoad(nodeNo, load_object.FX, load_object.FY, load_object.FZ, load_object.MX, load_object.MY, load_object.MZ)
@@ -0,0 +1,222 @@
+import os
+import time
+import ctypes
+import numpy as np
+from base.staad_base.com_array import *
+from base.staad_base.result_tensor import *
+from base.staad_base.root import get_staad_file_name
+from base.staad_base.analysis import last_analysis_run, anl_path
+
+def member_forces_path(std_path: str) -> str:
+    """Array file kept next to the model: 'rack.std' -> 'rack.forces.npy'."""
+    return os.path.splitext(std_path)[0] + '.forces.npy'
+
+def _index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + '.index.npz'
+
+class MemberForceStore:
+    """
+    Member end forces of every member and load case as one (members × cases × 12)
+    array in a memory-mapped .npy file, components in END_FORCE_COMPONENTS order.
+
+    The ids, cases and the rows filled so far live in a small .index.npz beside it,
+    so an interrupted extraction resumes where it stopped. Opening a store maps the
+    file without reading it; slicing a group or a case only touches those rows.
+
+    Attributes:
+        members, cases (np.ndarray): int32 ids along the first two axes.
+        values (np.memmap): (members, cases, 12) forces, NaN until extracted.
+        filled (np.ndarray): bool per member row, True once its forces are in the file.
+        units (str), source (str): Units of the values and 'com' / 'anl'.
+        run_id (int): Analysis run of the session the forces come from, 0 when not known.
+        created (float): time.time() the extraction started.
+    """
+
+    def __init__(self, path: str, members, cases, values, filled, units: str = None, source: str = None,
+                 run_id: int = 0, created: float = None):
+        self.path = path
+        self.members = np.asarray(members, dtype=np.int32)
+        self.cases = np.asarray(cases, dtype=np.int32)
+        self.values = values
+        self.filled = np.asarray(filled, dtype=bool)
+        self.units = units
+        self.source = source
+        self.run_id = run_id
+        self.created = created if created is not None else time.time()
+        self._tensor = None
+
+    @staticmethod
+    def create(path: str, members, cases, units: str = None, source: str = None, dtype=np.float64) -> 'MemberForceStore':
+        run = last_analysis_run()
+        members = np.asarray(members, dtype=np.int32)
+        cases = np.asarray(cases, dtype=np.int32)
+        values = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(len(members), len(cases), len(END_FORCE_COMPONENTS)))
+        values[:] = np.nan
+        store = MemberForceStore(path, members, cases, values, np.zeros(len(members), dtype=bool), units, source,
+                                 run.run_id if run is not None else 0)
+        store.save_index()
+        return store
+
+    @staticmethod
+    def open(path: str, mode: str = 'r') -> 'MemberForceStore':
+        """Map a store written earlier; mode 'r+' to continue filling it."""
+        with np.load(_index_path(path), allow_pickle=False) as index:
+            meta = {key: index[key].item() if index[key].ndim == 0 else index[key] for key in index.files}
+        return MemberForceStore(path, meta['members'], meta['cases'], np.lib.format.open_memmap(path, mode=mode), meta['filled'],
+                                meta['units'] or None, meta['source'] or None, int(meta['run_id']), float(meta['created']))
+
+    def save_index(self) -> None:
+        np.savez(_index_path(self.path), members=self.members, cases=self.cases, filled=self.filled,
+                 units=self.units or '', source=self.source or '', run_id=self.run_id, created=self.created)
+
+    def flush(self) -> None:
+        if(hasattr(self.values, 'flush')):
+            self.values.flush()
+        self.save_index()
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.filled.all())
+
+    def is_current(self, std_path: str = None) -> bool:
+        """False when the model was analysed again after the forces were extracted."""
+        run = last_analysis_run()
+        if(run is not None and self.run_id and run.run_id != self.run_id):
+            return False
+        output = anl_path(std_path) if std_path else None
+        return not (output and os.path.exists(output) and os.path.getmtime(output) > self.created)
+
+    def tensor(self) -> ResultTensor:
+        """ResultTensor over the mapped file, no copy."""
+        if(self._tensor is None):
+            self._tensor = ResultTensor(self.members, self.cases, self.values, END_FORCE_COMPONENTS, self.units)
+        return self._tensor
+
+    def subset(self, members=None, cases=None) -> ResultTensor:
+        """Forces of a member group and / or some cases, read from the file into memory."""
+        tensor = self.tensor()
+        if(members is not None):
+            members = [member.id if hasattr(member, 'id') else int(member) for member in members]
+            rows = np.sort(np.fromiter((tensor.index[member] for member in members), dtype=np.int64, count=len(members)))
+        else:
+            rows = slice(None)
+        columns = [tensor.case_index[int(case)] for case in cases] if cases is not None else slice(None)
+        values = np.asarray(self.values[rows])[:, columns]
+        return ResultTensor(self.members[rows], self.cases[columns], values, END_FORCE_COMPONENTS, self.units)
+
+    def case(self, case) -> np.ndarray:
+        """(members, 12) of one load case."""
+        return np.asarray(self.values[:, self.tensor().case_index[int(case)]])
+
+    def envelope(self, members=None, chunk_size: int = 1024) -> tuple:
+        """(max, min) over the cases, each (members, 12), read chunk by chunk."""
+        tensor = self.tensor()
+        rows = np.arange(len(self.members)) if members is None else np.sort([tensor.index[int(member)] for member in members])
+        maxima = np.empty((len(rows), len(END_FORCE_COMPONENTS)))
+        minima = np.empty((len(rows), len(END_FORCE_COMPONENTS)))
+        for start in range(0, len(rows), chunk_size):
+            block = np.asarray(self.values[rows[start:start + chunk_size]])
+            maxima[start:start + chunk_size] = np.nanmax(block, axis=1)
+            minima[start:start + chunk_size] = np.nanmin(block, axis=1)
+        return maxima, minima
+
+    def close(self) -> None:
+        self.flush()
+        self._tensor = None
+        self.values = None
+
+def _std_path(path: str):
+    """Model a store at the default location belongs to: 'rack.forces.npy' -> 'rack.std'."""
+    return path[:-len('.forces.npy')] + '.std' if path.endswith('.forces.npy') else None
+
+def _open_for_resume(path: str, members, cases):
+    if(not (os.path.exists(path) and os.path.exists(_index_path(path)))):
+        return None
+    try:
+        store = MemberForceStore.open(path, mode='r+')
+    except (OSError, ValueError, KeyError):
+        return None
+    run = last_analysis_run()
+    same_run = store.run_id == (run.run_id if run is not None else 0)
+    if(same_run and store.is_current(_std_path(path)) and np.array_equal(store.members, members) and np.array_equal(store.cases, cases)):
+        return store
+    # other members / cases or forces of an earlier analysis: start over
+    store.values = None
+    return None
+
+def extract_member_forces(output, members, cases, path: str, chunk_size: int = 256, local: int = 0,
+                          resume: bool = True, on_progress=None, dtype=np.float64) -> MemberForceStore:
+    """
+    Read the end forces of members × cases with GetMemberEndForces into a store at path.
+
+    Members are read chunk_size at a time into a (chunk, cases, 12) buffer that is then
+    written to the mapped file and flushed, so memory stays bounded by the chunk and not
+    the model (20k members × 300 cases is 576 MB on disk, a few MB in memory). With
+    resume, a store left by an interrupted run with the same members and cases is
+    continued from its first unfilled chunk, as long as it belongs to the current
+    analysis (same run id and no newer .ANL); otherwise it is extracted afresh.
+
+    Args:
+        local (int): 0 for local member axes, 1 for global, as GetMemberEndForces takes it.
+        on_progress (callable, optional): on_progress(store, members_done) after every chunk.
+    """
+    members = np.asarray([*members], dtype=np.int32)
+    cases = np.asarray([*cases], dtype=np.int32)
+    store = _open_for_resume(path, members, cases) if resume else None
+    if(store is None):
+        store = MemberForceStore.create(path, members, cases, 'KN METER', 'com', dtype)
+
+    safe_array, forces = pooled_safe_array(ctypes.c_double, 6)
+    case_list = cases.tolist()
+    for start in range(0, len(members), chunk_size):
+        stop = min(start + chunk_size, len(members))
+        if(store.filled[start:stop].all()):
+            continue
+        block = np.empty((stop - start, len(cases), len(END_FORCE_COMPONENTS)))
+        for row, member in enumerate(members[start:stop].tolist()):
+            for column, case in enumerate(case_list):
+                output.GetMemberEndForces(member, 0, case, forces, local)
+                block[row, column, :6] = safe_array_view(safe_array, ctypes.c_double)
+                output.GetMemberEndForces(member, 1, case, forces, local)
+                block[row, column, 6:] = safe_array_view(safe_array, ctypes.c_double)
+        store.values[start:stop] = block
+        store.filled[start:stop] = True
+        store.flush()
+        if(on_progress is not None):
+            on_progress(store, stop)
+    return store
+
+def extract_model_member_forces(objects, path: str = None, members=None, cases=None, **kwargs) -> MemberForceStore:
+    """extract_member_forces for the open model: all members, all primary cases, stored next to the .std."""
+    from base.staad_base.geometry import get_beam_nos
+    from base.staad_base.load import get_load_nos
+    members = get_beam_nos(objects.geometry) if members is None else members
+    cases = get_load_nos(objects.load) if cases is None else cases
+    path = path if path is not None else member_forces_path(get_staad_file_name())
+    return extract_member_forces(objects.output, members, cases, path, **kwargs)
+
+def member_forces_from_anl(source, path: str = None, chunk_size: int = 4096, dtype=np.float64) -> MemberForceStore:
+    """
+    Store the member end forces of an .ANL output file (parse_anl), e.g. of an archived run.
+
+    Args:
+        source: Path of the .ANL file or AnlResults already parsed.
+        path (str, optional): Store location, next to the .ANL by default.
+    """
+    from base.staad_base.anl_parser import parse_anl
+    if(isinstance(source, (str, os.PathLike))):
+        path = path if path is not None else member_forces_path(os.fspath(source))
+        source = parse_anl(source)
+    forces = source.member_forces
+    store = MemberForceStore.create(path, forces.ids, forces.cases, forces.units, 'anl', dtype)
+    for start in range(0, len(forces.ids), chunk_size):
+        store.values[start:start + chunk_size] = forces.values[start:start + chunk_size]
+    store.filled[:] = True
+    store.flush()
+    return store
+
+def load_member_forces(path: str) -> MemberForceStore:
+    """Open a stored extraction read-only; a model path ('rack.std') finds its 'rack.forces.npy'."""
+    if(not path.endswith('.npy')):
+        path = member_forces_path(path)
+    return MemberForceStore.open(path)
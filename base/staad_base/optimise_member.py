@@ -4,6 +4,7 @@ from typing import Dict, List, Any
 from base.staad_base.property import *
 from base.staad_base.root import *
 from base.staad_base.design import *
+from base.staad_base.design_cache import get_design_cache
 
 def calculate_average(ratios: Dict[str, float]) -> float:
     """
@@ -79,7 +80,7 @@ def get_failed_members(ratios: Dict[str, float], threshold: float = 1.0) -> List
     return [(member,ratio) for member, ratio in ratios.items() if ratio >= threshold]
 
 class member_group:
-    def __init__(self,Staad_objects:OpenSTAAD_objects, id=None, members=None,exclude_members=None, profiles=None, preference=None,allowable_ratio=0.8):
+    def __init__(self,Staad_objects:OpenSTAAD_objects, id=None, members=None,exclude_members=None, profiles=None, preference=None,allowable_ratio=0.8,snapshot=None):
         self.id = id
         self.geometry = Staad_objects.geometry
         self.property = Staad_objects.property
@@ -98,7 +99,13 @@ class member_group:
         self.profiles = unique_list(profiles) if profiles is not None else []
 
         # Get property_id for each member and find the one with highest occurrences
-        if self.members:
+        if self.members and snapshot is not None and len(snapshot.profile_table):
+            # members no longer in the model are left out instead of failing the whole group
+            codes = snapshot.profile_codes[snapshot.rows([member for member in self.members if member in snapshot])]
+            most_common = Counter(codes.tolist()).most_common(1)[0][0] if len(codes) else -1
+            self.preference = int(snapshot.profile_refs[most_common]) if most_common >= 0 else None
+            self.profile_name = snapshot.profile_table[most_common] if most_common >= 0 else ''
+        elif self.members:
             property_ids = [get_property_id(self.property, member) for member in self.members]
             most_common = Counter(property_ids).most_common(1)
             self.preference = most_common[0][0] if most_common else get_property_id(self.property, self.members[0])
@@ -110,6 +117,7 @@ class member_group:
             self.profile_name = None
 
         self.allowable_ratio = allowable_ratio
+        self.snapshot = snapshot
         self.results = {}
 
         # print(f'Created member group "{self.id}" , property {self.preference} with {len(self.members)} members -> {self.members}')
@@ -131,12 +139,8 @@ class member_group:
         """
         Process steel design results with statistics
         """
-        result = {}
-        design_result = get_member_steel_design_results(self.output, self.members)
-        
-        for member in self.members:
-            if member in design_result:
-                result[member] = design_result[member]['critical_ratio']  # Fixed key access
+        # cached per analysis run, shared with every other group
+        result = get_design_cache(self.output).ratio_dict(self.members)
         
         # Calculate statistics
         avg = calculate_average(result)
@@ -166,12 +170,8 @@ class member_group:
         """
         Process steel design results with statistics
         """
-        result = {}
-        design_result = get_member_steel_design_results(self.output, self.members)
-        
-        for member in self.members:
-            if member in design_result:
-                result[member] = design_result[member]['critical_ratio']  # Fixed key access
+        # cached per analysis run, shared with every other group
+        result = get_design_cache(self.output).ratio_dict(self.members)
         
         # Calculate statistics
         avg = calculate_average(result)
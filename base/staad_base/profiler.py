@@ -0,0 +1,152 @@
+import os
+import io
+import csv
+import sys
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from base.staad_base.root import *
+
+# upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0, 3.0, float('inf'))
+
+_staad_base_dir = os.path.dirname(os.path.abspath(__file__))
+_base_dir = os.path.dirname(_staad_base_dir)
+
+def _call_site() -> str:
+    """First frame outside base/ (a notebook cell or script), as 'file:line function'."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        file_name = os.path.abspath(frame.f_code.co_filename)
+        if not file_name.startswith(_base_dir):
+            return f"{os.path.basename(file_name)}:{frame.f_lineno} {frame.f_code.co_name}"
+        if fallback is None and not file_name.startswith(_staad_base_dir):
+            fallback = f"{os.path.basename(file_name)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or 'unknown'
+
+class ComCallProfiler:
+    """Counts and times every OpenSTAAD call made through instrumented objects.
+
+    Records are grouped by stage (see stage()), object and method, each with a call
+    count, total/min/max latency, a latency histogram over LATENCY_BUCKETS and the
+    Python call sites that issued the calls.
+
+    Example:
+        profiler = ComCallProfiler()
+        openSTAAD, STAAD_objects = profiler.instrument(openSTAAD, STAAD_objects)
+        with profiler.stage('optimiser'):
+            ...
+        profiler.to_csv('com_profile.csv')
+    """
+
+    def __init__(self, call_sites: bool = True):
+        self.call_sites = call_sites
+        self.current_stage = 'default'
+        self.records = {}
+        self.stage_seconds = Counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        previous = self.current_stage
+        self.current_stage = name
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+            self.current_stage = previous
+
+    def instrument(self, openSTAAD=None, STAAD_objects: OpenSTAAD_objects = None):
+        """Wrap the application object and every OpenSTAAD_objects member; returns (openSTAAD, STAAD_objects)."""
+        wrap = lambda target, name: InterceptedObject(target, name, self._hook) if target is not None else None
+        objects = None
+        if STAAD_objects is not None:
+            objects = OpenSTAAD_objects(**{name: wrap(target, name) for name, target in vars(STAAD_objects).items()})
+        return wrap(openSTAAD, 'os'), objects
+
+    def _hook(self, obj_name, method_name, method, args, kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.record(obj_name, method_name, time.perf_counter() - start,
+                        _call_site() if self.call_sites else None)
+
+    def record(self, obj_name: str, method_name: str, seconds: float, call_site: str = None) -> None:
+        key = (self.current_stage, obj_name, method_name)
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = {'count': 0, 'seconds': 0.0, 'min': seconds, 'max': seconds,
+                                          'histogram': [0] * len(LATENCY_BUCKETS), 'call_sites': Counter()}
+        record['count'] += 1
+        record['seconds'] += seconds
+        record['min'] = min(record['min'], seconds)
+        record['max'] = max(record['max'], seconds)
+        record['histogram'][next(i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound)] += 1
+        if call_site:
+            record['call_sites'][call_site] += 1
+
+    def reset(self) -> None:
+        self.records.clear()
+        self.stage_seconds.clear()
+
+    def report(self) -> list[dict]:
+        """One row per (stage, object, method), slowest first.
+
+        'share' is the fraction of the stage wall time when the stage was timed
+        with stage(), otherwise the fraction of all COM time recorded in that stage.
+        """
+        com_seconds = Counter()
+        for (stage, _, _), record in self.records.items():
+            com_seconds[stage] += record['seconds']
+
+        rows = []
+        for (stage, obj_name, method_name), record in self.records.items():
+            stage_total = self.stage_seconds.get(stage) or com_seconds[stage]
+            rows.append({
+                'stage': stage,
+                'object': obj_name,
+                'method': method_name,
+                'count': record['count'],
+                'seconds': record['seconds'],
+                'mean_ms': 1000 * record['seconds'] / record['count'],
+                'min_ms': 1000 * record['min'],
+                'max_ms': 1000 * record['max'],
+                'share': record['seconds'] / stage_total if stage_total else 0.0,
+                'histogram': dict(zip([str(bound) for bound in LATENCY_BUCKETS], record['histogram'])),
+                'top_call_sites': record['call_sites'].most_common(3),
+            })
+        rows.sort(key=lambda row: (row['stage'], -row['seconds']))
+        return rows
+
+    def to_json(self, file_path: str = None) -> str:
+        text = json.dumps({'stages': dict(self.stage_seconds), 'calls': self.report()}, indent=2)
+        if file_path:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    def to_csv(self, file_path: str = None) -> str:
+        columns = ['stage', 'object', 'method', 'count', 'seconds', 'mean_ms', 'min_ms', 'max_ms', 'share', 'top_call_site']
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for row in self.report():
+            writer.writerow({**row, 'top_call_site': row['top_call_sites'][0][0] if row['top_call_sites'] else ''})
+        text = buffer.getvalue()
+        if file_path:
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+        return text
+
+    def to_markdown(self, limit: int = 20) -> str:
+        markdown = "| Stage | Method | Calls | Total (s) | Mean (ms) | Share | Top call site |\n"
+        markdown += "|-------|--------|-------|-----------|-----------|-------|---------------|\n"
+        for row in self.report()[:limit] if limit else self.report():
+            site = row['top_call_sites'][0][0] if row['top_call_sites'] else ''
+            markdown += (f"| {row['stage']} | {row['object']}.{row['method']} | {row['count']} | "
+                         f"{row['seconds']:.3f} | {row['mean_ms']:.3f} | {row['share']:.1%} | {site} |\n")
+        return markdown
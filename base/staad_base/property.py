@@ -2,6 +2,7 @@ from base.geometry_base.rectangle import *
 from base.geometry_base.circle import *
 from base.staad_base.com_array import *
 from base.helper.wrapper import *
+from base.staad_base.property_registry import *
 
 def get_section_property_count(property) -> int:
     return property.GetSectionPropertyCount()
@@ -24,34 +25,41 @@ def assign_beam_specification(property,beam_no,spec_no) -> bool:
 def set_DOFReleaseArray(fx=0,fy=0,fz=0,mx=0,my=1,mz=1) -> int:
     return make_safe_array_int(6).create([fx,fy,fz,mx,my,mz])
 
+def assign_in_bulk(assign,ids) -> list:
+    """
+    Call assign once with every id in a SAFEARRAY, as the OpenSTAAD Assign* methods accept member / node lists.
+    Falls back to one call per id when the running STAAD rejects the array; returns one result per id either way.
+    """
+    ids = [int(id) for id in ids]
+    if(len(ids) == 0):
+        return []
+    try:
+        return [assign(make_safe_array_long(len(ids),ids))]*len(ids)
+    except Exception:
+        return [assign(id) for id in ids]
+
 def get_start_end_release_function (property,start_release_spec,end_release_spec):
     def set_start_end_release(beam_ids) -> list[tuple[bool,bool]]:
-        result = []
-        for beam_id in beam_ids:
-            result.append((assign_beam_specification(property,beam_id,start_release_spec),\
-                            assign_beam_specification(property,beam_id,end_release_spec)))
-        return result
+        beam_ids = [*beam_ids]
+        return list(zip(assign_in_bulk(lambda beams: assign_beam_specification(property,beams,start_release_spec),beam_ids),
+                        assign_in_bulk(lambda beams: assign_beam_specification(property,beams,end_release_spec),beam_ids)))
     return set_start_end_release
 
-@memoize_steel_profile_creation
 def create_steel_beam_property(property,Country, SectionName, TypeSpec, AddSpec_1, AddSpec_2):
-    return property.CreateBeamPropertyFromTable(Country,SectionName,TypeSpec,AddSpec_1,AddSpec_2)
+    return get_property_registry(property).steel(SectionName,Country,TypeSpec,AddSpec_1,AddSpec_2)
 
-@memoize_concrete_profile_creation
 def create_concrete_beam_property(property,geometry):
-    if(isinstance(geometry,Rectangle)):
-        return property.CreatePrismaticRectangleProperty(geometry.length,geometry.width)
-    elif(isinstance(geometry,Circle)):
-        return property.CreatePrismaticCircleProperty(geometry.radius)
-    else:
-        return None
+    return get_property_registry(property).concrete(geometry)
     
+def get_beam_material_name(property,beam_no) -> str:
+    return property.GetBeamMaterialName(beam_no)
+
 def assign_material_to_beam(property,material_name,beam_no):
     return property.AssignMaterialToMember(material_name,beam_no)
 
-assign_specification = lambda property : lambda beams,spec_no : list(map(lambda beam: assign_beam_specification(property=property, beam_no=beam,spec_no=spec_no), [*beams]))
-assign_profile = lambda property : lambda beams,property_no : list(map(lambda beam: assign_beam_property(property=property, beam_no=beam,property_no=property_no), [*beams]))
-assign_material = lambda property : lambda material_name : lambda beams : list(map(lambda beam: assign_material_to_beam(property=property, beam_no=beam,material_name=material_name), [*beams]))
+assign_specification = lambda property : lambda beams,spec_no : assign_in_bulk(lambda beam_nos: assign_beam_specification(property=property, beam_no=beam_nos,spec_no=spec_no), beams)
+assign_profile = lambda property : lambda beams,property_no : assign_in_bulk(lambda beam_nos: assign_beam_property(property=property, beam_no=beam_nos,property_no=property_no), beams)
+assign_material = lambda property : lambda material_name : lambda beams : assign_in_bulk(lambda beam_nos: assign_material_to_beam(property=property, beam_no=beam_nos,material_name=material_name), beams)
 
 simple_create_concrete_beam_property_fn = lambda property : lambda profile : create_concrete_beam_property(property,profile)
 simple_create_steel_beam_property_fn = lambda property: (
@@ -0,0 +1,170 @@
+import time
+from base.geometry_base.rectangle import *
+from base.geometry_base.circle import *
+from base.staad_base.com_array import *
+from base.staad_base.root import get_staad_file_name
+
+def steel_key(profile: str) -> tuple:
+    return ('steel', ' '.join(str(profile).upper().split()))
+
+def concrete_key(shape) -> tuple:
+    if(isinstance(shape, Rectangle)):
+        return ('rect', round(shape.length, 4), round(shape.width, 4))
+    elif(isinstance(shape, Circle)):
+        return ('circle', round(shape.radius, 4))
+    return None
+
+def _key_of_name(name: str) -> tuple:
+    """
+    Index key of a section name read back from STAAD; prismatic names look like 'Rect 1.20x0.80' / 'Cir 0.60'.
+    The names carry only 2 decimals, so PropertyRegistry replaces prismatic keys with the section's own dimensions.
+    """
+    words = name.split()
+    try:
+        if(len(words) == 2 and words[0].lower() == 'rect' and 'x' in words[1].lower()):
+            depth, width = words[1].lower().split('x')
+            return ('rect', round(float(depth), 4), round(float(width), 4))
+        if(len(words) == 2 and words[0].lower() == 'cir'):
+            return ('circle', round(float(words[1]), 4))
+    except ValueError:
+        pass
+    return steel_key(name)
+
+class PropertyRegistry:
+    """Section properties of the open model, indexed by profile name or concrete shape.
+
+    The property table is read once, and later only the entries added since. Lookups
+    answer from the index; missing sections are created and indexed. The open file is
+    checked on every lookup and the registry starts over when another file is open, so
+    ref numbers never leak between models; the table size is re-read at most every
+    probe_interval seconds to pick up sections added outside the registry.
+
+    Prismatic sections are keyed by their dimensions from GetSectionPropertyValues, as
+    their names are rounded to 2 decimals; where the call is unavailable the name is used
+    and a section whose dimensions have more decimals is created again rather than
+    matched to a near one.
+
+    Example:
+        registry = get_property_registry(property)
+        refs = registry.ensure_steel(['ISMB300', 'SHS 100x100x6'])
+        ref = registry.concrete(Rectangle(1.2, 0.8))
+    """
+
+    def __init__(self, property, file_name=get_staad_file_name, probe_interval: float = 2.0):
+        self.property = property
+        self.file_name = file_name
+        self.probe_interval = probe_interval
+        self.index = {}
+        self.entries = []
+        self.loaded_file = None
+        self.last_probe = None
+        # False once GetSectionPropertyValues failed, then prismatic keys come from the names
+        self.dimensions = True
+        self.stats = {'hits': 0, 'created': 0, 'reloads': 0, 'read': 0}
+
+    def invalidate(self) -> None:
+        self.index.clear()
+        self.entries = []
+        self.loaded_file = None
+        self.last_probe = None
+
+    def _read_entries(self, first: int, last: int) -> None:
+        sectionName = automation.BSTR()
+        sectionNameRef = make_variant_vt_ref(sectionName, automation.VT_BSTR)
+        for ref_no in range(first, last + 1):
+            self.property.GetSectionPropertyName(ref_no, sectionNameRef)
+            self._index(sectionName.value, ref_no)
+            self.stats['read'] += 1
+
+    def _index(self, name: str, ref_no: int) -> None:
+        self.entries.append({'id': ref_no, 'name': name})
+        key = _key_of_name(name)
+        if(key[0] != 'steel'):
+            key = self._prismatic_key(ref_no, key)
+        # first definition wins, like STAAD resolves duplicates in its own table
+        self.index.setdefault(key, ref_no)
+
+    def _prismatic_key(self, ref_no: int, key: tuple) -> tuple:
+        """Key of a prismatic section from its stored depth and width instead of its 2-decimal name."""
+        if(not self.dimensions):
+            return key
+        width,widthptr = get_ctype_double()
+        depth,depthptr = get_ctype_double()
+        pointers = [get_ctype_double()[1] for _ in range(6)]
+        try:
+            self.property.GetSectionPropertyValues(ref_no, widthptr, depthptr, *pointers)
+        except Exception:
+            self.dimensions = False
+            return key
+        if(key[0] == 'rect'):
+            return ('rect', round(depth.value, 4), round(width.value, 4))
+        return ('circle', round(depth.value, 4))
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-check the open file and pick up sections added since the last read."""
+        file_name = self.file_name() if self.file_name else None
+        now = time.perf_counter()
+        if(not force and file_name == self.loaded_file and self.last_probe is not None
+           and now - self.last_probe < self.probe_interval):
+            return
+        self.last_probe = now
+
+        count = self.property.GetSectionPropertyCount()
+        if(file_name != self.loaded_file or count < len(self.entries)):
+            self.index.clear()
+            self.entries = []
+            self.loaded_file = file_name
+            self.stats['reloads'] += 1
+        if(count > len(self.entries)):
+            self._read_entries(len(self.entries) + 1, count)
+
+    def _lookup(self, key: tuple, create, refresh: bool = True):
+        if(refresh):
+            self.refresh()
+        ref_no = self.index.get(key)
+        if(ref_no is not None):
+            self.stats['hits'] += 1
+            return ref_no
+        ref_no = create()
+        if(ref_no):
+            self.index[key] = ref_no
+            self.entries.append({'id': ref_no, 'name': key})
+            self.stats['created'] += 1
+        return ref_no
+
+    def steel(self, profile: str, country: int = None, type_spec: int = 0, add_spec_1: float = 0, add_spec_2: float = 0,
+              refresh: bool = True) -> int:
+        """Ref number of a table section, created from the country table when the model does not have it yet."""
+        country = (35 if ('SHS' in profile or 'RHS' in profile) else 10) if country is None else country
+        return self._lookup(steel_key(profile),
+                            lambda: self.property.CreateBeamPropertyFromTable(country, profile, type_spec, add_spec_1, add_spec_2),
+                            refresh)
+
+    def concrete(self, shape) -> int:
+        key = concrete_key(shape)
+        if(key is None):
+            return None
+        if(isinstance(shape, Rectangle)):
+            create = lambda: self.property.CreatePrismaticRectangleProperty(shape.length, shape.width)
+        else:
+            create = lambda: self.property.CreatePrismaticCircleProperty(shape.radius)
+        return self._lookup(key, create)
+
+    def ensure_steel(self, profiles, country: int = None) -> dict[str,int]:
+        """{profile: ref} for many profiles after one table check; only the missing ones are created."""
+        self.refresh()
+        return {profile: self.steel(profile, country, refresh=False) for profile in dict.fromkeys(profiles)}
+
+    def ref_no(self, profile: str):
+        """Ref number if the model already has the profile, without creating it."""
+        self.refresh()
+        return self.index.get(steel_key(profile))
+
+_registries = {}
+
+def get_property_registry(property) -> PropertyRegistry:
+    """Registry of the given Property object; it follows whichever file that object has open."""
+    registry = _registries.get(id(property))
+    if(registry is None or registry.property is not property):
+        registry = _registries[id(property)] = PropertyRegistry(property)
+    return registry
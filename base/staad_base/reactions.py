@@ -0,0 +1,207 @@
+import io
+import csv
+import string
+import ctypes
+import numpy as np
+from base.staad_base.com_array import *
+from base.staad_base.result_tensor import *
+
+# units the foundation loads are designed in; OpenSTAAD reports kN and kN m
+FOUNDATION_UNITS = 'MTON METE'
+API_UNITS = 'KN METE'
+
+def get_support_nodes(support) -> list[int]:
+    count = support.GetSupportCount()
+    nodes = make_variant_vt_ref(make_safe_array_long(count), automation.VT_ARRAY | automation.VT_I4)
+    support.GetSupportNodes(nodes)
+    return [int(node_no) for node_no in read_ref(nodes)]
+
+def extract_support_reactions(output, nodes, cases) -> ResultTensor:
+    """
+    (supports × cases × 6) global reactions, FORCE_COMPONENTS order, one GetSupportReactions
+    per node and case into a single pooled buffer (no SAFEARRAY / VARIANT per call).
+    """
+    nodes = sorted(int(node_no) for node_no in nodes)
+    cases = sorted(int(case) for case in cases)
+    values = np.empty((len(nodes), len(cases), len(FORCE_COMPONENTS)))
+    safe_array, reactions = pooled_safe_array(ctypes.c_double, 6)
+    for row, node_no in enumerate(nodes):
+        for column, case in enumerate(cases):
+            output.GetSupportReactions(node_no, case, reactions)
+            values[row, column] = safe_array_view(safe_array, ctypes.c_double)
+    return ResultTensor(nodes, cases, values, FORCE_COMPONENTS, API_UNITS)
+
+def extract_anl_reactions(path: str, nodes=None, cases=None, units: str = API_UNITS) -> ResultTensor:
+    """
+    Support reactions of every node and case printed in an .ANL output file, read in one pass
+    with parse_anl instead of one COM call per node and case, and converted to units.
+    nodes / cases narrow the result to those present in the file.
+    """
+    from base.staad_base.anl_parser import parse_anl
+    reactions = parse_anl(path).reactions
+    nodes = [int(node_no) for node_no in nodes if int(node_no) in reactions.index] if nodes is not None else None
+    cases = [int(case) for case in cases if int(case) in reactions.case_index] if cases is not None else None
+    if(nodes is not None or cases is not None):
+        reactions = reactions.subset(nodes, cases)
+    return convert_reaction_units(reactions, units)
+
+def extract_model_reactions(objects, cases=None, anl: bool = False) -> ResultTensor:
+    """
+    extract_support_reactions for every support node and primary load case of the open model.
+
+    With anl=True the reactions come from the model's .ANL file instead (extract_anl_reactions),
+    so they are those of the last analysis written to disk, in API_UNITS.
+    """
+    from base.staad_base.load import get_load_nos
+    cases = get_load_nos(objects.load) if cases is None else cases
+    nodes = get_support_nodes(objects.support)
+    if(anl):
+        from base.staad_base.root import get_staad_file_name
+        from base.staad_base.analysis import anl_path
+        return extract_anl_reactions(anl_path(get_staad_file_name()), nodes, cases)
+    return extract_support_reactions(objects.output, nodes, cases)
+
+def convert_reaction_units(reactions: ResultTensor, units: str) -> ResultTensor:
+    """Reactions in other '<force> <length>' units, e.g. 'MTON METE'; moments scale with both factors."""
+    if(reactions.units == units):
+        return reactions
+    source = (reactions.units or '').upper().split()
+    target = units.upper().split()
+    if(len(source) != 2 or len(target) != 2 or not all(word in FORCE_FACTORS for word in (source[0], target[0]))
+       or not all(word in LENGTH_FACTORS for word in (source[1], target[1]))):
+        raise ValueError(f"Cannot convert reactions from {reactions.units!r} to {units!r}")
+    force = FORCE_FACTORS[source[0]] / FORCE_FACTORS[target[0]]
+    length = LENGTH_FACTORS[source[1]] / LENGTH_FACTORS[target[1]]
+    scale = np.array([force if name.startswith('F') else force * length for name in reactions.components])
+    return ResultTensor(reactions.ids, reactions.cases, reactions.values * scale, reactions.components, units)
+
+def to_foundation_units(reactions: ResultTensor) -> ResultTensor:
+    """Reactions in MT and MT m, from any units convert_reaction_units knows; raises on others."""
+    return convert_reaction_units(reactions, FOUNDATION_UNITS)
+
+class ReactionEnvelope:
+    """
+    Maxima and minima per support and component over the load cases, with the cases they come from.
+
+    Attributes:
+        nodes (np.ndarray): int32 support nodes.
+        maxima, minima (np.ndarray): (nodes, 6) extreme values.
+        max_cases, min_cases (np.ndarray): (nodes, 6) int32 governing load case of each extreme.
+        units (str): Units of the values.
+    """
+
+    def __init__(self, reactions: ResultTensor):
+        self.reactions = reactions
+        self.nodes = reactions.ids
+        values = np.where(np.isnan(reactions.values), -np.inf, reactions.values)
+        max_columns = np.argmax(values, axis=1)
+        values = np.where(np.isnan(reactions.values), np.inf, reactions.values)
+        min_columns = np.argmin(values, axis=1)
+        rows = np.arange(len(self.nodes))[:, None]
+        components = np.arange(len(reactions.components))[None, :]
+        self.maxima = reactions.values[rows, max_columns, components] if len(reactions.cases) else np.full((len(self.nodes), 6), np.nan)
+        self.minima = reactions.values[rows, min_columns, components] if len(reactions.cases) else np.full((len(self.nodes), 6), np.nan)
+        self.max_cases = reactions.cases[max_columns] if len(reactions.cases) else np.zeros((len(self.nodes), 6), dtype=np.int32)
+        self.min_cases = reactions.cases[min_columns] if len(reactions.cases) else np.zeros((len(self.nodes), 6), dtype=np.int32)
+        self.units = reactions.units
+
+    def concurrent(self, node_no, component: str = 'FY', extreme: str = 'max') -> tuple:
+        """(case, all 6 reactions of that case) where component of node_no is at its max / min."""
+        row = self.reactions.index[int(node_no)]
+        column = self.reactions.components.index(component)
+        case = int((self.max_cases if extreme == 'max' else self.min_cases)[row, column])
+        return case, self.reactions.get(node_no, case)
+
+def pedestal_grid(piperack, points, tolerance: float = 0.5) -> dict:
+    """
+    Grid of each support point on the piperack layout: portal number 1.. along
+    portal_distances (z) and column letter A.. along column_distances (x), both measured
+    from base_point_of_first_portal as generate_structural_components places them; with
+    a base point of (100, 0, 50) a support at (108, -1, 56) is portal 2, column B.
+
+    Args:
+        points (dict[int, Point3D]): Support node -> coordinates.
+        tolerance (float): Largest distance from a grid line that still counts as on it.
+
+    Returns:
+        dict: node -> (portal_no, column_letter), None for supports off the grid.
+    """
+    portal_zs = np.asarray(piperack.portal_distances, dtype=np.float64)
+    column_xs = np.asarray(piperack.column_distances, dtype=np.float64)
+    base = getattr(piperack, 'base_point_of_first_portal', None)
+    base_x, base_z = (base.x, base.z) if base is not None else (0.0, 0.0)
+    grid = {}
+    for node_no, point in points.items():
+        x, z = point.x - base_x, point.z - base_z
+        portal = int(np.argmin(np.abs(portal_zs - z))) if len(portal_zs) else -1
+        column = int(np.argmin(np.abs(column_xs - x))) if len(column_xs) else -1
+        on_grid = portal >= 0 and column >= 0 and abs(portal_zs[portal] - z) <= tolerance and abs(column_xs[column] - x) <= tolerance
+        grid[node_no] = (portal + 1, _column_letter(column)) if on_grid else None
+    return grid
+
+def _column_letter(index: int) -> str:
+    letters = string.ascii_uppercase
+    return letters[index] if index < len(letters) else letters[index // len(letters) - 1] + letters[index % len(letters)]
+
+class FoundationSchedule:
+    """
+    Foundation load schedule: one row per pedestal, ordered by portal and column line.
+
+    Example:
+        reactions = to_foundation_units(extract_model_reactions(STAAD_objects))   # or anl=True, one file read
+        schedule = FoundationSchedule(ReactionEnvelope(reactions), nodes, PR)
+        schedule.to_csv('foundation_loads.csv')
+        display(Markdown(schedule.to_markdown()))
+    """
+
+    def __init__(self, envelope: ReactionEnvelope, points, piperack=None):
+        self.envelope = envelope
+        self.units = envelope.units
+        grid = pedestal_grid(piperack, {int(node_no): points[int(node_no)] for node_no in envelope.nodes}) if piperack is not None else {}
+        self.rows = []
+        for row, node_no in enumerate(envelope.nodes.tolist()):
+            cell = grid.get(node_no)
+            point = points[node_no]
+            entry = {'grid': f"{cell[0]}{cell[1]}" if cell else '', 'portal': cell[0] if cell else None,
+                     'column': cell[1] if cell else '', 'node': node_no, 'x': point.x, 'z': point.z}
+            for column, name in enumerate(envelope.reactions.components):
+                entry[f"{name}_max"] = float(envelope.maxima[row, column])
+                entry[f"{name}_max_case"] = int(envelope.max_cases[row, column])
+                entry[f"{name}_min"] = float(envelope.minima[row, column])
+                entry[f"{name}_min_case"] = int(envelope.min_cases[row, column])
+            self.rows.append(entry)
+        self.rows.sort(key=lambda entry: (entry['portal'] is None, entry['portal'] or 0, len(entry['column']), entry['column'], entry['node']))
+
+    def portals(self) -> dict:
+        """{portal_no: rows}, pedestals off the grid under None."""
+        result = {}
+        for entry in self.rows:
+            result.setdefault(entry['portal'], []).append(entry)
+        return result
+
+    def columns(self) -> list[str]:
+        names = ['grid', 'node', 'x', 'z']
+        for name in self.envelope.reactions.components:
+            names += [f"{name}_max", f"{name}_max_case", f"{name}_min", f"{name}_min_case"]
+        return names
+
+    def to_csv(self, file_path: str = None) -> str:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.columns(), extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(self.rows)
+        text = buffer.getvalue()
+        if file_path:
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+        return text
+
+    def to_markdown(self, components=('FY', 'FX', 'FZ', 'MX', 'MZ')) -> str:
+        markdown = f"#### Foundation Loads ({self.units})\n"
+        markdown += "| Grid | Node | " + " | ".join(f"{name} max (LC) | {name} min (LC)" for name in components) + " |\n"
+        markdown += "|------|------|" + "|".join("----------|----------" for _ in components) + "|\n"
+        for entry in self.rows:
+            cells = [f"{entry[f'{name}_max']:.2f} ({entry[f'{name}_max_case']}) | {entry[f'{name}_min']:.2f} ({entry[f'{name}_min_case']})"
+                     for name in components]
+            markdown += f"| {entry['grid']} | {entry['node']} | " + " | ".join(cells) + " |\n"
+        return markdown
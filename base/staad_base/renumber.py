@@ -0,0 +1,224 @@
+import numpy as np
+from base.staad_base.helper import try_catch_wrapper
+from base.staad_base.snapshot import *
+
+# degrees of freedom per node of a space frame, for the solver cost estimate
+NODE_DOFS = 6
+# renumber only when the estimated factorisation work drops below this fraction
+MIN_GAIN = 0.95
+
+def node_adjacency(count: int, start_rows, end_rows) -> tuple:
+    """CSR (indptr, indices) of the node graph; rows are node rows, neighbours ascending and unique."""
+    start_rows = np.asarray(start_rows, dtype=np.int64)
+    end_rows = np.asarray(end_rows, dtype=np.int64)
+    a = np.concatenate((start_rows, end_rows))
+    b = np.concatenate((end_rows, start_rows))
+    keep = a != b
+    a, b = a[keep], b[keep]
+    order = np.lexsort((b, a))
+    a, b = a[order], b[order]
+    if(len(a)):
+        unique = np.concatenate(([True], (a[1:] != a[:-1]) | (b[1:] != b[:-1])))
+        a, b = a[unique], b[unique]
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(a, minlength=count), out=indptr[1:])
+    return indptr, b
+
+def _levels(neighbours: list, root: int, visited: np.ndarray) -> list:
+    """BFS level structure of root's component, ignoring nodes already numbered."""
+    seen = {root}
+    levels = [[root]]
+    while True:
+        level = []
+        for node in levels[-1]:
+            for neighbour in neighbours[node]:
+                if(neighbour not in seen and not visited[neighbour]):
+                    seen.add(neighbour)
+                    level.append(neighbour)
+        if(not level):
+            return levels
+        levels.append(level)
+
+def _peripheral_node(neighbours: list, degree: np.ndarray, seed: int, visited: np.ndarray) -> int:
+    """George-Liu: walk to the lowest-degree node of the last BFS level while the eccentricity grows."""
+    root = seed
+    depth = len(_levels(neighbours, root, visited))
+    while True:
+        last = _levels(neighbours, root, visited)[-1]
+        candidate = min(last, key=lambda node: degree[node])
+        candidate_depth = len(_levels(neighbours, candidate, visited))
+        if(candidate_depth <= depth):
+            return root
+        root, depth = candidate, candidate_depth
+
+def reverse_cuthill_mckee(indptr, indices) -> np.ndarray:
+    """
+    Node rows in reverse Cuthill-McKee order.
+
+    Each connected component is numbered breadth first from a pseudo-peripheral node,
+    neighbours by increasing degree, and the whole sequence is reversed, which keeps
+    the bandwidth of Cuthill-McKee and lowers the profile.
+    """
+    count = len(indptr) - 1
+    degree = np.diff(indptr)
+    # neighbour lists pre-sorted by degree, so the BFS never sorts
+    owners = np.repeat(np.arange(count), degree)
+    by_degree = indices[np.lexsort((indices, degree[indices], owners))] if len(indices) else indices
+    neighbours = [by_degree[indptr[row]:indptr[row + 1]].tolist() for row in range(count)]
+
+    visited = np.zeros(count, dtype=bool)
+    order = []
+    for seed in np.argsort(degree, kind='stable').tolist():
+        if(visited[seed]):
+            continue
+        root = _peripheral_node(neighbours, degree, seed, visited)
+        visited[root] = True
+        queue = [root]
+        head = 0
+        while head < len(queue):
+            for neighbour in neighbours[queue[head]]:
+                if(not visited[neighbour]):
+                    visited[neighbour] = True
+                    queue.append(neighbour)
+            head += 1
+        order.extend(queue)
+    return np.array(order[::-1], dtype=np.int64)
+
+def bandwidth_profile(ranks, start_rows, end_rows) -> tuple:
+    """
+    (bandwidth, profile, factor_ops) of the node numbering given as rank per node row.
+
+    bandwidth is the largest node-number difference over the members, profile the sum of
+    the row heights of the envelope, and factor_ops the multiply-adds a skyline solver
+    spends factorising the (nodes × NODE_DOFS) stiffness matrix.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    a = ranks[np.asarray(start_rows, dtype=np.int64)]
+    b = ranks[np.asarray(end_rows, dtype=np.int64)]
+    if(len(a) == 0):
+        return 0, 0, 0.0
+    low, high = np.minimum(a, b), np.maximum(a, b)
+    first = np.arange(len(ranks), dtype=np.int64)
+    np.minimum.at(first, high, low)
+    heights = np.arange(len(ranks), dtype=np.int64) - first
+    dof_heights = (heights + 1) * NODE_DOFS
+    return int((high - low).max()), int(heights.sum()), float(np.sum(dof_heights.astype(np.float64) ** 2) * NODE_DOFS / 2)
+
+class RenumberPlan:
+    """
+    Node renumbering of a model with its bandwidth and profile before and after.
+
+    The new numbers are the model's own node numbers handed out again in RCM order,
+    so no number outside the existing set is used and the member numbers stay as they are.
+
+    Attributes:
+        node_map (dict[int,int]): old node number -> new node number, for the nodes that change;
+            empty when RCM would not cut the estimated factorisation work by more than 1 - MIN_GAIN.
+        bandwidth_before, bandwidth_after (int): Largest node-number difference over the members.
+        profile_before, profile_after (int): Envelope size of the node stiffness matrix.
+        factor_ops_before, factor_ops_after (float): Estimated skyline factorisation work.
+    """
+
+    def __init__(self, node_ids, order, start_rows, end_rows):
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        numbers = np.sort(node_ids)
+        ranks_before = np.argsort(np.argsort(node_ids, kind='stable'), kind='stable')
+        ranks_after = np.empty(len(node_ids), dtype=np.int64)
+        ranks_after[order] = np.arange(len(node_ids))
+        self.nodes = len(node_ids)
+        self.members = len(start_rows)
+        self.node_map = {int(old): int(new) for old, new in zip(node_ids.tolist(), numbers[ranks_after].tolist()) if old != new}
+        self.bandwidth_before, self.profile_before, self.factor_ops_before = bandwidth_profile(ranks_before, start_rows, end_rows)
+        self.bandwidth_after, self.profile_after, self.factor_ops_after = bandwidth_profile(ranks_after, start_rows, end_rows)
+        if(self.factor_ops_after > self.factor_ops_before * MIN_GAIN):
+            # the model is numbered well already, renumbering it would only churn the node numbers
+            self.node_map = {}
+            self.bandwidth_after, self.profile_after, self.factor_ops_after = self.bandwidth_before, self.profile_before, self.factor_ops_before
+
+    @property
+    def speedup(self) -> float:
+        """Estimated factorisation speed-up of the renumbered model."""
+        return self.factor_ops_before / self.factor_ops_after if self.factor_ops_after else 1.0
+
+    def new_number(self, node_no) -> int:
+        return self.node_map.get(int(node_no), int(node_no))
+
+    def report(self) -> dict:
+        return {'nodes': self.nodes, 'members': self.members, 'renumbered': len(self.node_map),
+                'bandwidth': (self.bandwidth_before, self.bandwidth_after),
+                'profile': (self.profile_before, self.profile_after),
+                'estimated_speedup': round(self.speedup, 2)}
+
+    def __str__(self):
+        return (f"{self.nodes} nodes, {len(self.node_map)} renumbered: bandwidth {self.bandwidth_before} -> {self.bandwidth_after}, "
+                f"profile {self.profile_before} -> {self.profile_after}, estimated factorisation {self.speedup:.1f}x faster")
+
+def plan_node_renumbering(node_ids, start_rows, end_rows) -> RenumberPlan:
+    """Plan for nodes node_ids and members given as (start, end) rows into node_ids."""
+    indptr, indices = node_adjacency(len(node_ids), start_rows, end_rows)
+    return RenumberPlan(node_ids, reverse_cuthill_mckee(indptr, indices), start_rows, end_rows)
+
+def plan_renumbering(snapshot: ModelSnapshot) -> RenumberPlan:
+    """Plan for a model read with get_model_snapshot / SnapshotCache or parsed with std_parser."""
+    return plan_node_renumbering(snapshot.nodes.ids, snapshot.start_rows, snapshot.end_rows)
+
+def renumber_builder(builder) -> RenumberPlan:
+    """
+    Renumber the nodes of a StdModelBuilder in place before it is written.
+
+    Member numbers do not change, so ids already handed out by add_beams stay valid;
+    supports and joint loads recorded by node number follow their nodes.
+    """
+    node_ids = list(builder.nodes.values())
+    row_of = {node_no: row for row, node_no in enumerate(node_ids)}
+    start_rows = [row_of[a] for a, _ in builder.members]
+    end_rows = [row_of[b] for _, b in builder.members]
+    plan = plan_node_renumbering(node_ids, start_rows, end_rows)
+    if(not plan.node_map):
+        return plan
+
+    new = plan.new_number
+    builder.nodes = dict(sorted(((key, new(node_no)) for key, node_no in builder.nodes.items()), key=lambda item: item[1]))
+    builder.members = [(new(a), new(b)) for a, b in builder.members]
+    for support, nodes in builder.support_nodes.items():
+        builder.support_nodes[support] = [new(node_no) for node_no in nodes]
+    for load in builder.load_cases.values():
+        for text, nodes in load['joint_loads'].items():
+            load['joint_loads'][text] = [new(node_no) for node_no in nodes]
+    return plan
+
+@try_catch_wrapper
+def renumber_node(geometry, old_node_no: int, new_node_no: int):
+    return geometry.RenumberNode(int(old_node_no), int(new_node_no))
+
+def renumber_nodes(geometry, plan: RenumberPlan) -> int:
+    """
+    Apply plan to the open model with RenumberNode, the node counterpart of RenumberBeam.
+
+    STAAD refuses a number that is still in use, so every cycle of the permutation
+    parks its last node on a free number first: len(node_map) + cycles calls in all.
+
+    Returns:
+        int: RenumberNode calls made; None when the running STAAD does not offer it.
+    """
+    if(not plan.node_map):
+        return 0
+    spare = max(max(plan.node_map), max(plan.node_map.values())) + 1
+    done = set()
+    calls = 0
+    for start in plan.node_map:
+        if(start in done):
+            continue
+        # cycle[i] becomes cycle[i + 1], the last one becomes start
+        cycle = [start]
+        while plan.node_map[cycle[-1]] != start:
+            cycle.append(plan.node_map[cycle[-1]])
+        done.update(cycle)
+
+        if(renumber_node(geometry, cycle[-1], spare) is None):
+            return None if calls == 0 else calls
+        for node_no in reversed(cycle[:-1]):
+            renumber_node(geometry, node_no, plan.node_map[node_no])
+        renumber_node(geometry, spare, plan.node_map[cycle[-1]])
+        calls += len(cycle) + 1
+    return calls
@@ -0,0 +1,71 @@
+import numpy as np
+
+# component order of GetMemberEndForces / GetSupportReactions
+FORCE_COMPONENTS = ('FX', 'FY', 'FZ', 'MX', 'MY', 'MZ')
+END_FORCE_COMPONENTS = tuple(f"{name}{end}" for end in (1, 2) for name in FORCE_COMPONENTS)
+# component order of GetNodeDisplacements: translations, then rotations
+DISPLACEMENT_COMPONENTS = ('X', 'Y', 'Z', 'RX', 'RY', 'RZ')
+
+# unit words of STAAD output headers in kN and metres
+FORCE_FACTORS = {'KN': 1.0, 'KNS': 1.0, 'MTON': 9.80665, 'MTONS': 9.80665, 'NEWTON': 0.001, 'NEWTONS': 0.001, 'N': 0.001,
+                 'KG': 0.00980665, 'KGS': 0.00980665, 'KIP': 4.4482216, 'KIPS': 4.4482216, 'POUND': 0.0044482216, 'LB': 0.0044482216}
+LENGTH_FACTORS = {'METE': 1.0, 'METER': 1.0, 'M': 1.0, 'CM': 0.01, 'MM': 0.001, 'INCH': 0.0254, 'IN': 0.0254, 'FEET': 0.3048, 'FT': 0.3048}
+
+class ResultTensor:
+    """Results of many items (members, supports) for many load cases as one (ids × cases × components) array.
+
+    Attributes:
+        ids (np.ndarray): int32 member / node numbers, one per first-axis row, ascending.
+        cases (np.ndarray): int32 load case numbers, one per second-axis column, ascending.
+        values (np.ndarray): float64 (ids, cases, components); NaN where nothing was read.
+        components (tuple[str]): Names of the last axis, e.g. END_FORCE_COMPONENTS.
+        units (str): Units the values are in, as reported by the source.
+    """
+
+    def __init__(self, ids, cases, values, components, units: str = None):
+        self.ids = np.ascontiguousarray(ids, dtype=np.int32)
+        self.cases = np.ascontiguousarray(cases, dtype=np.int32)
+        self.values = values
+        self.components = tuple(components)
+        self.units = units
+        self.index = {int(id): row for row, id in enumerate(self.ids.tolist())}
+        self.case_index = {int(case): column for column, case in enumerate(self.cases.tolist())}
+
+    @staticmethod
+    def from_rows(ids, cases, rows, components, units: str = None) -> 'ResultTensor':
+        """Scatter per-(id, case) rows into a tensor; repeated (id, case) pairs keep the last row."""
+        ids = np.asarray(ids, dtype=np.int32)
+        cases = np.asarray(cases, dtype=np.int32)
+        unique_ids, id_rows = np.unique(ids, return_inverse=True)
+        unique_cases, case_columns = np.unique(cases, return_inverse=True)
+        values = np.full((len(unique_ids), len(unique_cases), len(components)), np.nan)
+        if(len(ids)):
+            values[id_rows, case_columns] = np.asarray(rows, dtype=np.float64).reshape(len(ids), len(components))
+        return ResultTensor(unique_ids, unique_cases, values, components, units)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id):
+        return int(id) in self.index
+
+    def get(self, id, case) -> np.ndarray:
+        return self.values[self.index[int(id)], self.case_index[int(case)]]
+
+    def of(self, id) -> np.ndarray:
+        """(cases, components) of one member / node."""
+        return self.values[self.index[int(id)]]
+
+    def case(self, case) -> np.ndarray:
+        """(ids, components) of one load case."""
+        return self.values[:, self.case_index[int(case)]]
+
+    def component(self, name: str) -> np.ndarray:
+        """(ids, cases) of one component, e.g. 'FY' or 'MZ2'."""
+        return self.values[:, :, self.components.index(name)]
+
+    def subset(self, ids=None, cases=None) -> 'ResultTensor':
+        rows = [self.index[int(id)] for id in ids] if ids is not None else slice(None)
+        columns = [self.case_index[int(case)] for case in cases] if cases is not None else slice(None)
+        values = self.values[rows][:, columns]
+        return ResultTensor(self.ids[rows], self.cases[columns], values, self.components, self.units)
@@ -0,0 +1,318 @@
+import ctypes
+import numpy as np
+from base.staad_base.com_array import *
+from base.staad_base.result_tensor import *
+from base.staad_base.snapshot import *
+from base.piperack.piperack import PiperackMembers
+from base.staad_base.optimise_member import calculate_average, calculate_deviation, get_failed_members
+
+# length unit OpenSTAAD reports displacements in; LENGTH_FACTORS converts the units an .ANL may print them in
+API_LENGTH_UNITS = 'METE'
+
+# span / limit for beams, storey height / limit for columns
+SERVICEABILITY_LIMITS = {
+    PiperackMembers.TierBeams: 325,
+    PiperackMembers.LongitudinalBeams: 325,
+    PiperackMembers.IntermediateTransverseBeams: 325,
+    PiperackMembers.IntermediateLongitudinalBeams: 325,
+    PiperackMembers.Columns: 200,
+}
+
+# categories a beam span of the key category ends on
+SPAN_SUPPORTS = {
+    PiperackMembers.TierBeams: (PiperackMembers.Columns,),
+    PiperackMembers.LongitudinalBeams: (PiperackMembers.Columns, PiperackMembers.TierBeams),
+    PiperackMembers.IntermediateTransverseBeams: (PiperackMembers.LongitudinalBeams, PiperackMembers.TierBeams),
+    PiperackMembers.IntermediateLongitudinalBeams: (PiperackMembers.TierBeams, PiperackMembers.IntermediateTransverseBeams),
+}
+
+def extract_node_displacements(output, nodes, cases) -> ResultTensor:
+    """
+    (nodes × cases × 6) global joint displacements, DISPLACEMENT_COMPONENTS order, one
+    GetNodeDisplacements per node and case into a single pooled buffer.
+    """
+    nodes = sorted(int(node_no) for node_no in nodes)
+    cases = sorted(int(case) for case in cases)
+    values = np.empty((len(nodes), len(cases), len(DISPLACEMENT_COMPONENTS)))
+    safe_array, displacements = pooled_safe_array(ctypes.c_double, 6)
+    for row, node_no in enumerate(nodes):
+        for column, case in enumerate(cases):
+            output.GetNodeDisplacements(node_no, case, displacements)
+            values[row, column] = safe_array_view(safe_array, ctypes.c_double)
+    return ResultTensor(nodes, cases, values, DISPLACEMENT_COMPONENTS, API_LENGTH_UNITS)
+
+def extract_midspan_displacements(output, members, cases) -> ResultTensor:
+    """
+    (members × cases × 3) global displacements at mid-length with GetIntermediateMemberTransDisplacements,
+    so a span of one member still has a point between its ends.
+    """
+    members = sorted(int(member) for member in members)
+    cases = sorted(int(case) for case in cases)
+    values = np.empty((len(members), len(cases), 3))
+    safe_array, displacements = pooled_safe_array(ctypes.c_double, 6)
+    for row, member in enumerate(members):
+        for column, case in enumerate(cases):
+            output.GetIntermediateMemberTransDisplacements(member, 0.5, case, displacements)
+            values[row, column] = safe_array_view(safe_array, ctypes.c_double)[:3]
+    return ResultTensor(members, cases, values, DISPLACEMENT_COMPONENTS[:3], API_LENGTH_UNITS)
+
+def to_metres(displacements: ResultTensor) -> ResultTensor:
+    """Translations in metres, rotations as they are; e.g. the CM table of an .ANL."""
+    factor = LENGTH_FACTORS.get((displacements.units or API_LENGTH_UNITS).split()[0].upper())
+    if(factor is None):
+        raise ValueError(f"Unknown displacement units {displacements.units!r}")
+    if(factor == 1.0):
+        return displacements
+    values = np.array(displacements.values, dtype=np.float64)
+    values[..., :3] *= factor
+    return ResultTensor(displacements.ids, displacements.cases, values, displacements.components, API_LENGTH_UNITS)
+
+def piperack_member_groups(structure) -> dict:
+    """{PiperackMembers: member numbers} of the categories the checks cover, from Piperack.get_structure()."""
+    def numbers(beams):
+        return [beam.id for beam in beams if beam.id >= 0]
+    return {
+        PiperackMembers.TierBeams: list(structure.portal_beams),
+        PiperackMembers.Columns: numbers(structure.main_columns),
+        PiperackMembers.LongitudinalBeams: numbers(structure.long_beams),
+        PiperackMembers.IntermediateTransverseBeams: list(structure.intermediate_transverse_beams),
+        PiperackMembers.IntermediateLongitudinalBeams: numbers(structure.int_long_beams),
+    }
+
+def member_lines(snapshot: ModelSnapshot, members, break_nodes=(), tolerance: float = 1e-3) -> list:
+    """
+    Chains of collinear members, e.g. the members of one tier beam between two columns.
+
+    A chain runs on through a node where exactly two of members meet in line and stops
+    at its free ends and at break_nodes (where a supporting member frames in).
+
+    Returns:
+        list: (members, node rows) per chain, both in order along the chain.
+    """
+    rows = [snapshot.index[int(member)] for member in members]
+    break_rows = {snapshot.nodes.index[int(node_no)] for node_no in break_nodes if int(node_no) in snapshot.nodes.index}
+    at_node = {}
+    for row in rows:
+        at_node.setdefault(int(snapshot.start_rows[row]), []).append(row)
+        at_node.setdefault(int(snapshot.end_rows[row]), []).append(row)
+
+    def through(node, row):
+        """The member continuing row in line through node, None where the chain stops."""
+        if(node in break_rows or len(at_node[node]) != 2):
+            return None
+        other = at_node[node][0] if at_node[node][1] == row else at_node[node][1]
+        in_line = abs(abs(float(np.dot(snapshot.directions[row], snapshot.directions[other]))) - 1.0) <= tolerance
+        return other if in_line else None
+
+    def far_node(row, node):
+        return int(snapshot.end_rows[row]) if int(snapshot.start_rows[row]) == node else int(snapshot.start_rows[row])
+
+    lines, done = [], set()
+    for row in rows:
+        if(row in done):
+            continue
+        # walk back to the first member of the chain, then forward to its last
+        first, node = row, int(snapshot.start_rows[row])
+        while True:
+            previous = through(node, first)
+            if(previous is None or previous == row):
+                break
+            first, node = previous, far_node(previous, node)
+        chain, nodes = [], [node]
+        current = first
+        while current is not None and current not in done:
+            done.add(current)
+            chain.append(current)
+            node = far_node(current, node)
+            nodes.append(node)
+            current = through(node, current)
+        lines.append(([int(snapshot.member_ids[row]) for row in chain], nodes))
+    return lines
+
+class ServiceabilityCheck:
+    """
+    Deflection of beam spans and inter-tier drift of columns against span / limit,
+    all load cases at once.
+
+    Beam spans are the member chains of a category between the members it sits on
+    (SPAN_SUPPORTS). The deflection at each node inside a span, and at each member
+    midpoint of a span without such a node, is its displacement off the chord through
+    the displaced span ends, without the part along the span; the largest over the
+    span and the cases against span / limit is the ratio of every member of the span.
+    Midpoints missing from midspan are read with extract_midspan_displacements from
+    output; without output a span with no point inside raises ValueError rather than
+    passing with no deflection. Column lines are cut at the tier beam levels, and the drift of each storey
+    is the horizontal displacement of its top relative to its bottom against
+    height / limit.
+
+    The results dict has the shape of member_group.results, so
+    generate_model_results_html(check) reports it like the strength check.
+
+    Attributes:
+        rows (list[dict]): One entry per span / storey: category, members, length, delta,
+            span_ratio (length / delta), limit, case and ratio.
+        results (dict): failed, failed_members [(member, ratio)] worst first, average, deviation,
+            result {member: ratio}.
+
+    Example:
+        displacements = extract_node_displacements(STAAD_objects.output, snapshot.nodes.ids, get_load_nos(load))
+        check = ServiceabilityCheck(snapshot, displacements, piperack_member_groups(structure), output=STAAD_objects.output)
+        display(HTML(generate_model_results_html(check)))
+    """
+
+    def __init__(self, snapshot: ModelSnapshot, displacements: ResultTensor, groups: dict, limits: dict = None,
+                 midspan: ResultTensor = None, allowable_ratio: float = 1.0, output=None):
+        self.snapshot = snapshot
+        self.displacements = to_metres(displacements)
+        self.output = output
+        self.groups = {PiperackMembers(category): [int(member) for member in members] for category, members in groups.items()}
+        self.limits = {**SERVICEABILITY_LIMITS, **(limits or {})}
+        self.allowable_ratio = allowable_ratio
+        self.cases = self.displacements.cases
+        self.midspan = None
+        if(midspan is not None):
+            self._add_midspan(midspan)
+        # node rows of the snapshot -> rows of the displacement tensor
+        self._node_rows = np.array([self.displacements.index.get(int(node_no), -1) for node_no in snapshot.nodes.ids], dtype=np.int64)
+        self.rows = []
+        for category, members in self.groups.items():
+            if(category not in self.limits or not members):
+                continue
+            if(category == PiperackMembers.Columns):
+                self._check_drift(members)
+            else:
+                self._check_deflection(category, members)
+        self.results = self._results()
+
+    def _nodes_of(self, categories) -> set:
+        snapshot = self.snapshot
+        nodes = set()
+        for category in categories:
+            rows = [snapshot.index[member] for member in self.groups.get(category, ()) if member in snapshot.index]
+            nodes.update(snapshot.nodes.ids[snapshot.start_rows[rows]].tolist())
+            nodes.update(snapshot.nodes.ids[snapshot.end_rows[rows]].tolist())
+        return nodes
+
+    def _translations(self, node_rows) -> np.ndarray:
+        """(nodes, cases, 3) translations of snapshot node rows."""
+        rows = self._node_rows[np.asarray(node_rows, dtype=np.int64)]
+        if((rows < 0).any()):
+            missing = self.snapshot.nodes.ids[np.asarray(node_rows)[rows < 0]].tolist()
+            raise KeyError(f"No displacements for nodes {missing[:10]}")
+        return self.displacements.values[rows, :, :3]
+
+    def _add_midspan(self, midspan: ResultTensor) -> None:
+        """Keep midspan displacements in the case order of the check, merged with those read before."""
+        midspan = to_metres(midspan).subset(cases=self.cases.tolist())
+        if(self.midspan is not None):
+            ids = np.concatenate((self.midspan.ids, midspan.ids))
+            values = np.concatenate((self.midspan.values, midspan.values))
+            order = np.argsort(ids, kind='stable')
+            midspan = ResultTensor(ids[order], self.cases, values[order], midspan.components, API_LENGTH_UNITS)
+        self.midspan = midspan
+
+    def _ensure_midspan(self, lines) -> None:
+        """Midspan displacements of the members of spans without a node inside."""
+        covered = self.midspan.index if self.midspan is not None else {}
+        missing = [member for line_members, nodes in lines if len(nodes) < 3 for member in line_members if member not in covered]
+        if(not missing):
+            return
+        if(self.output is None):
+            raise ValueError(f"{len(missing)} members are spans with no point between their ends (e.g. member {missing[0]}); "
+                             f"pass output or midspan displacements")
+        self._add_midspan(extract_midspan_displacements(self.output, missing, self.cases))
+
+    def _check_deflection(self, category, members) -> None:
+        snapshot = self.snapshot
+        lines = member_lines(snapshot, members, self._nodes_of(SPAN_SUPPORTS.get(category, ())))
+        self._ensure_midspan(lines)
+        xyz = snapshot.nodes.coordinates()
+        # every point inside a span as (span, fraction along the span, translations)
+        spans, fractions, points = [], [], []
+        lengths = np.empty(len(lines))
+        chords = np.empty((len(lines), 3))
+        ends = np.empty((len(lines), 2), dtype=np.int64)
+        for span, (line_members, nodes) in enumerate(lines):
+            distances = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(xyz[nodes], axis=0), axis=1))))
+            lengths[span] = distances[-1]
+            chords[span] = (xyz[nodes[-1]] - xyz[nodes[0]]) / distances[-1] if distances[-1] > 0 else 0.0
+            ends[span] = nodes[0], nodes[-1]
+            spans += [span] * (len(nodes) - 2)
+            fractions += (distances[1:-1] / distances[-1]).tolist() if distances[-1] > 0 else [0.0] * (len(nodes) - 2)
+            points += nodes[1:-1]
+            if(self.midspan is not None and len(nodes) < 3):
+                for i, member in enumerate(line_members):
+                    if(member in self.midspan.index):
+                        spans.append(span)
+                        fractions.append((distances[i] + distances[i + 1]) / 2 / distances[-1] if distances[-1] > 0 else 0.0)
+                        points.append(-1 - self.midspan.index[member])
+
+        spans = np.asarray(spans, dtype=np.int64)
+        fractions = np.asarray(fractions, dtype=np.float64)[:, None, None]
+        points = np.asarray(points, dtype=np.int64)
+        values = np.empty((len(points), len(self.cases), 3))
+        on_nodes = points >= 0
+        values[on_nodes] = self._translations(points[on_nodes])
+        if(not on_nodes.all()):
+            values[~on_nodes] = self.midspan.values[-1 - points[~on_nodes]]
+
+        starts = self._translations(ends[spans, 0]) if len(spans) else values
+        stops = self._translations(ends[spans, 1]) if len(spans) else values
+        relative = values - (starts * (1.0 - fractions) + stops * fractions)
+        # without the axial shortening along the chord
+        axis = chords[spans][:, None, :]
+        relative -= np.sum(relative * axis, axis=2, keepdims=True) * axis
+        deltas = np.linalg.norm(relative, axis=2)
+
+        samples = np.bincount(spans, minlength=len(lines))
+        if(len(lines) and samples.min() == 0):
+            raise ValueError(f"No point to measure the deflection of the span of members {lines[int(np.argmin(samples))][0]} at")
+        worst = np.zeros((len(lines), len(self.cases)))
+        np.maximum.at(worst, spans, deltas)
+        self._add_rows(category, lines, lengths, worst)
+
+    def _check_drift(self, members) -> None:
+        snapshot = self.snapshot
+        y = snapshot.nodes.y
+        # cut the column lines at every tier level and at the ends of the columns
+        lines = member_lines(snapshot, members, self._nodes_of((PiperackMembers.TierBeams,)))
+        if(not lines):
+            return
+        bottoms = np.array([nodes[0] if y[nodes[0]] <= y[nodes[-1]] else nodes[-1] for _, nodes in lines], dtype=np.int64)
+        tops = np.array([nodes[-1] if y[nodes[0]] <= y[nodes[-1]] else nodes[0] for _, nodes in lines], dtype=np.int64)
+        heights = y[tops] - y[bottoms]
+        sway = self._translations(tops) - self._translations(bottoms)
+        drifts = np.hypot(sway[:, :, 0], sway[:, :, 2])
+        self._add_rows(PiperackMembers.Columns, lines, heights, drifts)
+
+    def _add_rows(self, category, lines, lengths, deltas) -> None:
+        """deltas (spans, cases) against lengths / limit; one row per span."""
+        if(not len(lines)):
+            return
+        limit = self.limits[category]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(lengths[:, None] > 0, deltas * limit / lengths[:, None], 0.0)
+        columns = np.argmax(ratios, axis=1) if len(self.cases) else np.zeros(len(lines), dtype=np.int64)
+        worst = ratios[np.arange(len(lines)), columns] if len(self.cases) else np.zeros(len(lines))
+        delta = deltas[np.arange(len(lines)), columns] if len(self.cases) else np.zeros(len(lines))
+        for span, (line_members, _) in enumerate(lines):
+            self.rows.append({'category': category.name, 'members': line_members, 'length': float(lengths[span]),
+                              'delta': float(delta[span]), 'span_ratio': float(lengths[span] / delta[span]) if delta[span] > 0 else float('inf'),
+                              'limit': limit, 'case': int(self.cases[columns[span]]) if len(self.cases) else None,
+                              'ratio': float(worst[span])})
+
+    def _results(self) -> dict:
+        result = {}
+        for row in self.rows:
+            for member in row['members']:
+                result[member] = max(result.get(member, 0.0), row['ratio'])
+        failed_members = sorted(get_failed_members(result, threshold=self.allowable_ratio), key=lambda item: item[1], reverse=True)
+        return {'failed_members': failed_members, 'failed': len(failed_members),
+                'average': calculate_average(result), 'deviation': calculate_deviation(result),
+                'result': result}
+
+    def failing(self, category=None) -> list[dict]:
+        """Spans / storeys over the allowable ratio, worst first."""
+        name = PiperackMembers(category).name if category is not None else None
+        rows = [row for row in self.rows if row['ratio'] >= self.allowable_ratio and (name is None or row['category'] == name)]
+        return sorted(rows, key=lambda row: row['ratio'], reverse=True)
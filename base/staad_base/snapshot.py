@@ -0,0 +1,197 @@
+from collections.abc import Mapping
+import numpy as np
+from base.geometry_base.point import Point3D
+from base.structural_elements.beam import Beam3D
+from base.staad_base.helper import point_precision
+
+class NodeSnapshot:
+    """Columnar copy of the model nodes.
+
+    Attributes:
+        ids (np.ndarray): int32 node numbers, in STAAD node-list order.
+        x, y, z (np.ndarray): float64 coordinates rounded to point_precision.
+        index (dict[int,int]): node number -> row in the arrays above.
+    """
+
+    def __init__(self, ids, x, y, z):
+        self.ids = np.ascontiguousarray(ids, dtype=np.int32)
+        self.x = np.round(np.ascontiguousarray(x, dtype=np.float64), point_precision)
+        self.y = np.round(np.ascontiguousarray(y, dtype=np.float64), point_precision)
+        self.z = np.round(np.ascontiguousarray(z, dtype=np.float64), point_precision)
+        self.index = {int(node_no): row for row, node_no in enumerate(self.ids)}
+
+    @staticmethod
+    def from_points(points) -> 'NodeSnapshot':
+        """Build a snapshot from an existing {node_no: Point3D} mapping."""
+        if isinstance(points, NodePointView):
+            return points.snapshot
+        ids = list(points.keys())
+        return NodeSnapshot(ids,
+                            [points[i].x for i in ids],
+                            [points[i].y for i in ids],
+                            [points[i].z for i in ids])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, node_no):
+        return int(node_no) in self.index
+
+    def row(self, node_no) -> int:
+        return self.index[int(node_no)]
+
+    def rows(self, node_nos) -> np.ndarray:
+        """Rows of several node numbers, as an int32 array."""
+        return np.fromiter((self.index[int(node_no)] for node_no in node_nos), dtype=np.int32, count=len(node_nos))
+
+    def coordinates(self) -> np.ndarray:
+        """(n,3) array of x, y, z."""
+        return np.column_stack((self.x, self.y, self.z))
+
+    def point(self, node_no) -> Point3D:
+        row = self.index[int(node_no)]
+        return Point3D(float(self.x[row]), float(self.y[row]), float(self.z[row]))
+
+    def as_points(self) -> 'NodePointView':
+        """Lazy {node_no: Point3D} view, the shape get_node_incidences has always returned."""
+        return NodePointView(self)
+
+class NodePointView(Mapping):
+    """Read-only dict[int, Point3D] adapter over a NodeSnapshot.
+
+    Points are created on first access and kept, so beams built from the
+    view share Point3D objects the same way they did with the old dict.
+    """
+
+    def __init__(self, snapshot:NodeSnapshot):
+        self.snapshot = snapshot
+        self._points = {}
+
+    def __getitem__(self, node_no) -> Point3D:
+        point = self._points.get(node_no)
+        if point is None:
+            point = self.snapshot.point(node_no)
+            self._points[node_no] = point
+        return point
+
+    def __iter__(self):
+        return (int(node_no) for node_no in self.snapshot.ids)
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def __contains__(self, node_no):
+        return node_no in self.snapshot
+
+    def __repr__(self):
+        return f'NodePointView({len(self)} nodes)'
+
+class ModelSnapshot:
+    """Columnar copy of the model members, built once per model state.
+
+    Attributes:
+        nodes (NodeSnapshot): Node arrays the member rows point into.
+        member_ids (np.ndarray): int32 member numbers, in STAAD beam-list order.
+        start_rows, end_rows (np.ndarray): int32 rows into nodes for each member end.
+        profile_codes (np.ndarray): int32 index into profile_table, -1 where no profile was read.
+        profile_table (list[str]): Section display names, one per distinct property.
+        profile_refs (np.ndarray): int32 STAAD property reference number for each profile_table entry.
+        lengths (np.ndarray): float64 member lengths.
+        directions (np.ndarray): (n,3) float64 unit vectors start -> end.
+        index (dict[int,int]): member number -> row.
+    """
+
+    def __init__(self, nodes:NodeSnapshot, member_ids, start_rows, end_rows,
+                 profile_codes=None, profile_table=None, profile_refs=None):
+        self.nodes = nodes
+        self.member_ids = np.ascontiguousarray(member_ids, dtype=np.int32)
+        self.start_rows = np.ascontiguousarray(start_rows, dtype=np.int32)
+        self.end_rows = np.ascontiguousarray(end_rows, dtype=np.int32)
+        self.index = {int(member_no): row for row, member_no in enumerate(self.member_ids)}
+        self.set_profiles(profile_codes, profile_table, profile_refs)
+
+        xyz = nodes.coordinates()
+        delta = xyz[self.end_rows] - xyz[self.start_rows] if len(self.member_ids) else np.zeros((0, 3))
+        self.lengths = np.round(np.linalg.norm(delta, axis=1), point_precision)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.directions = np.where(self.lengths[:, None] > 0, delta / self.lengths[:, None], 0.0)
+
+        self.points = nodes.as_points()
+        self._beams = None
+
+    def set_profiles(self, profile_codes=None, profile_table=None, profile_refs=None) -> None:
+        """Replace the profile columns, e.g. after properties were reassigned."""
+        count = len(self.member_ids)
+        self.profile_codes = np.full(count, -1, dtype=np.int32) if profile_codes is None else np.ascontiguousarray(profile_codes, dtype=np.int32)
+        self.profile_table = list(profile_table) if profile_table is not None else []
+        self.profile_refs = np.ascontiguousarray(profile_refs if profile_refs is not None else [], dtype=np.int32)
+        self._beams = None
+
+    def __len__(self):
+        return len(self.member_ids)
+
+    def __contains__(self, member_no):
+        return int(member_no) in self.index
+
+    def row(self, member_no) -> int:
+        return self.index[int(member_no)]
+
+    def rows(self, member_nos) -> np.ndarray:
+        return np.fromiter((self.index[int(member_no)] for member_no in member_nos), dtype=np.int32, count=len(member_nos))
+
+    def incidence(self, member_no) -> tuple[int,int]:
+        row = self.row(member_no)
+        return int(self.nodes.ids[self.start_rows[row]]), int(self.nodes.ids[self.end_rows[row]])
+
+    def profile(self, member_no) -> str:
+        code = self.profile_codes[self.row(member_no)]
+        return self.profile_table[code] if code >= 0 else ''
+
+    def profile_ref(self, member_no) -> int:
+        code = self.profile_codes[self.row(member_no)]
+        return int(self.profile_refs[code]) if code >= 0 else None
+
+    def members_with_profile(self, profile:str) -> np.ndarray:
+        if profile not in self.profile_table:
+            return np.zeros(0, dtype=np.int32)
+        return self.member_ids[self.profile_codes == self.profile_table.index(profile)]
+
+    def beam(self, member_no) -> Beam3D:
+        """Materialise one Beam3D; end points are shared with every other beam on the same node."""
+        row = self.row(member_no)
+        return Beam3D(id=int(member_no),
+                      start=self.points[int(self.nodes.ids[self.start_rows[row]])],
+                      end=self.points[int(self.nodes.ids[self.end_rows[row]])],
+                      profile=self.profile(member_no))
+
+    def as_beams(self) -> 'BeamObjectView':
+        """Lazy {member_no: Beam3D} view, the shape get_beam_objects has always returned."""
+        if self._beams is None:
+            self._beams = BeamObjectView(self)
+        return self._beams
+
+class BeamObjectView(Mapping):
+    """Read-only dict[int, Beam3D] adapter over a ModelSnapshot; beams are built on first access."""
+
+    def __init__(self, snapshot:ModelSnapshot):
+        self.snapshot = snapshot
+        self._beams = {}
+
+    def __getitem__(self, member_no) -> Beam3D:
+        beam = self._beams.get(member_no)
+        if beam is None:
+            beam = self.snapshot.beam(member_no)
+            self._beams[member_no] = beam
+        return beam
+
+    def __iter__(self):
+        return (int(member_no) for member_no in self.snapshot.member_ids)
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def __contains__(self, member_no):
+        return member_no in self.snapshot
+
+    def __repr__(self):
+        return f'BeamObjectView({len(self)} beams)'
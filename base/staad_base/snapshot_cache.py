@@ -0,0 +1,128 @@
+import os
+import time
+import hashlib
+import numpy as np
+from base.staad_base.geometry import *
+from base.staad_base.root import get_staad_file_name
+
+class SnapshotCache:
+    """Keeps one ModelSnapshot and re-reads only the parts of the model that changed.
+
+    Every get() runs cheap probes against the live model: node and member counts,
+    the STAAD file path and modification time, and a hash over a sample of node
+    coordinates, member incidences and property reference numbers. Matching probes
+    return the cached snapshot; otherwise only nodes, members or properties are refetched.
+
+    Attributes:
+        stats (dict): hits, misses, per-part refresh counts and time spent probing / fetching.
+    """
+
+    def __init__(self, geometry, property=None, file_name=get_staad_file_name, sample_size: int = 32):
+        self.geometry = geometry
+        self.property = property
+        self.file_name = file_name
+        self.sample_size = sample_size
+        self.snapshot = None
+        self.signature = None
+        self.stats = {'hits': 0, 'misses': 0, 'full': 0, 'nodes': 0, 'members': 0, 'properties': 0,
+                      'probe_seconds': 0.0, 'fetch_seconds': 0.0}
+
+    def invalidate(self) -> None:
+        self.snapshot = None
+        self.signature = None
+
+    def get(self) -> ModelSnapshot:
+        start = time.perf_counter()
+        file_probe = self._file_probe()
+        if self.snapshot is None or file_probe[0] != self.signature['path']:
+            self.stats['probe_seconds'] += time.perf_counter() - start
+            return self._refresh(['full'], file_probe)
+
+        sample_size = self.sample_size if file_probe[1] == self.signature['mtime'] else self.sample_size * 4
+        stale = self._stale_parts(sample_size)
+        self.stats['probe_seconds'] += time.perf_counter() - start
+
+        if not stale:
+            self.stats['hits'] += 1
+            self.signature['path'], self.signature['mtime'] = file_probe
+            return self.snapshot
+        return self._refresh(stale, file_probe)
+
+    def _file_probe(self) -> tuple:
+        path = self.file_name() if self.file_name else None
+        mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+        return path, mtime
+
+    def _stale_parts(self, sample_size: int) -> list[str]:
+        snapshot = self.snapshot
+        stale = []
+        if get_node_count(self.geometry) != len(snapshot.nodes) or self._node_hash(sample_size, live=True) != self._node_hash(sample_size, live=False):
+            stale.append('nodes')
+        if get_beam_count(self.geometry) != len(snapshot) or self._member_hash(sample_size, live=True) != self._member_hash(sample_size, live=False):
+            stale.append('members')
+        if self.property and self._property_hash(sample_size, live=True) != self._property_hash(sample_size, live=False):
+            stale.append('properties')
+        return stale
+
+    def _refresh(self, parts: list[str], file_probe: tuple) -> ModelSnapshot:
+        self.stats['misses'] += 1
+        for part in parts:
+            self.stats[part] += 1
+        start = time.perf_counter()
+        snapshot = self.snapshot
+
+        if 'full' in parts:
+            self.snapshot = get_model_snapshot(self.geometry, self.property)
+        else:
+            nodes = get_node_snapshot(self.geometry) if 'nodes' in parts else snapshot.nodes
+            # profiles of the members that kept their incidences are taken over unless they changed too
+            previous = snapshot if 'properties' not in parts else None
+            if 'members' in parts:
+                self.snapshot = get_model_snapshot(self.geometry, self.property, nodes=nodes, previous=previous)
+            elif 'nodes' in parts:
+                try:
+                    start_rows = nodes.rows(snapshot.nodes.ids[snapshot.start_rows])
+                    end_rows = nodes.rows(snapshot.nodes.ids[snapshot.end_rows])
+                    self.snapshot = ModelSnapshot(nodes, snapshot.member_ids, start_rows, end_rows,
+                                                  snapshot.profile_codes, snapshot.profile_table, snapshot.profile_refs)
+                except KeyError:
+                    # a member still points at a node that is gone, so incidences changed as well
+                    self.snapshot = get_model_snapshot(self.geometry, self.property, nodes=nodes, previous=previous)
+            if 'properties' in parts and 'members' not in parts:
+                self.snapshot.set_profiles(*get_member_profile_arrays(self.property, self.snapshot.member_ids))
+
+        self.stats['fetch_seconds'] += time.perf_counter() - start
+        self.signature = {'path': file_probe[0], 'mtime': file_probe[1]}
+        return self.snapshot
+
+    def _sample_rows(self, count: int, sample_size: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.linspace(0, count - 1, num=min(count, sample_size)).astype(np.int64))
+
+    def _node_hash(self, sample_size: int, live: bool) -> str:
+        nodes = self.snapshot.nodes
+        rows = self._sample_rows(len(nodes), sample_size)
+        if not live:
+            values = np.column_stack((nodes.x[rows], nodes.y[rows], nodes.z[rows]))
+        else:
+            values = np.array([get_node_incidence(self.geometry, nodes.ids[row]).tuple_ref() for row in rows]).reshape(-1, 3)
+        return hashlib.sha1(np.round(values, point_precision).tobytes()).hexdigest()
+
+    def _member_hash(self, sample_size: int, live: bool) -> str:
+        rows = self._sample_rows(len(self.snapshot), sample_size)
+        member_ids = self.snapshot.member_ids[rows]
+        if not live:
+            values = [self.snapshot.incidence(member_no) for member_no in member_ids]
+        else:
+            values = [get_beam_incidence(self.geometry, member_no) for member_no in member_ids]
+        return hashlib.sha1(np.array(values, dtype=np.int64).tobytes()).hexdigest()
+
+    def _property_hash(self, sample_size: int, live: bool) -> str:
+        rows = self._sample_rows(len(self.snapshot), sample_size)
+        member_ids = self.snapshot.member_ids[rows]
+        if not live:
+            values = [self.snapshot.profile_ref(member_no) or 0 for member_no in member_ids]
+        else:
+            values = [get_property_id(self.property, int(member_no)) or 0 for member_no in member_ids]
+        return hashlib.sha1(np.array(values, dtype=np.int64).tobytes()).hexdigest()
@@ -0,0 +1,409 @@
+import io
+import os
+from collections import defaultdict
+import numpy as np
+from base.staad_base.snapshot import *
+
+# statements that close a LOAD block; anything else inside one belongs to the load case
+LOAD_END_KEYWORDS = ('PERFORM', 'FINISH', 'PARAMETER', 'START', 'END', 'CHANGE', 'PRINT', 'DEFINE', 'CODE',
+                     'CHECK', 'SELECT', 'SET', 'JOINT COORD', 'MEMBER INCI', 'MEMBER PROP', 'MEMBER RELE',
+                     'MEMBER TRUSS', 'SUPPORT', 'CONSTANT', 'CUT OFF', 'ANALYSIS', 'STEEL', 'CONCRETE')
+
+def std_statements(source):
+    """(line number, statement) of a STAAD input: comments dropped, ' -' continuations joined, ';' split."""
+    pending = []
+    first = 0
+    for line_no, line in enumerate(source, 1):
+        text = line.strip()
+        if(not text or text[0] == '*'):
+            continue
+        if(not pending):
+            first = line_no
+        if(text[-1] == '-' and (len(text) == 1 or text[-2] == ' ')):
+            pending.append(text[:-1])
+            continue
+        if(pending):
+            pending.append(text)
+            text = ' '.join(pending)
+            pending = []
+        for statement in text.split(';'):
+            statement = statement.strip()
+            if(statement):
+                yield first, statement
+    if(pending):
+        yield first, ' '.join(pending)
+
+def parse_ids(tokens, start: int = 0, groups: dict = None) -> tuple[list,int]:
+    """
+    Id list at tokens[start:], e.g. '1 TO 14 BY 2 20 _COLUMNS'.
+
+    Returns:
+        (ids, index of the first token after the list)
+    """
+    ids = []
+    i = start
+    count = len(tokens)
+    while i < count:
+        token = tokens[i]
+        if(token.isdigit()):
+            ids.append(int(token))
+            i += 1
+        elif(token.upper() == 'TO' and ids and i + 1 < count and tokens[i + 1].isdigit()):
+            step = 1
+            last = int(tokens[i + 1])
+            i += 2
+            if(i + 1 < count and tokens[i].upper() == 'BY' and tokens[i + 1].isdigit()):
+                step = int(tokens[i + 1])
+                i += 2
+            ids.extend(range(ids[-1] + step, last + 1, step))
+        elif(token.upper() == 'LIST' and i == start):
+            i += 1
+        elif(token[0] == '_' and groups is not None and token.upper() in groups):
+            ids.extend(groups[token.upper()]['ids'])
+            i += 1
+        else:
+            break
+    return ids, i
+
+def section_display_name(spec: str) -> str:
+    """Name STAAD shows for a property spec: 'TABLE ST ISMB300' -> 'ISMB300', 'PRIS YD 1.2 ZD 0.8' -> 'Rect 1.20x0.80'."""
+    words = spec.split()
+    upper = [word.upper() for word in words]
+    try:
+        if(upper and upper[0] == 'PRIS'):
+            values = {upper[i]: float(words[i + 1]) for i in range(1, len(words) - 1, 2)}
+            if('ZD' in values):
+                return f"Rect {values['YD']:.2f}x{values['ZD']:.2f}"
+            if('YD' in values):
+                return f"Cir {values['YD']:.2f}"
+    except (ValueError, KeyError):
+        pass
+    if('TABLE' in upper):
+        # TABLE ST NAME, or TABLE 'IS BEAM' ST 'ISMB 200' in a database table
+        rest = spec[spec.upper().index('TABLE') + 5:].strip()
+        if(rest.startswith("'")):
+            rest = rest[rest.index("'", 1) + 1:].strip()
+        parts = rest.split(None, 1)
+        if(len(parts) == 2):
+            return parts[1].strip().strip("'")
+    return spec
+
+class StdModel:
+    """Model read from a STAAD input file, without STAAD.Pro.
+
+    The attribute shapes follow StdModelBuilder, so a parsed model reads like a
+    generated one; snapshot is the same ModelSnapshot get_model_snapshot builds
+    over COM and as_beams() the {member_no: Beam3D} view get_beam_objects returns.
+    Values are in the file's units (unit holds the UNIT line in force at JOINT COORDINATES).
+
+    Attributes:
+        nodes (dict[int,tuple]): node number -> (x, y, z).
+        members (dict[int,tuple]): member number -> (start node, end node).
+        profiles (dict): (table, spec) -> member ids, e.g. ('INDIAN', 'TABLE ST ISMB300').
+        member_profiles (dict): member number -> (table, spec) of the last property line naming it.
+        release_specs, materials, support_nodes (dict): release / material / support text -> ids.
+        truss_ids (list): MEMBER TRUSS members.
+        groups (dict): '_NAME' -> {'type': 'MEMBER', 'ids': [...]}.
+        load_cases (dict): primary case -> {'title', 'loadtype', 'unit', 'selfweight', 'joint_loads',
+            'member_loads', 'repeat', 'other'}.
+        combinations (dict): LOAD COMB case -> {'title', 'factors': {case: factor}}.
+        skipped (list): (line number, statement) of data the parser does not expand, e.g. REPEAT ALL.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.unit = None
+        self.nodes = {}
+        self.members = {}
+        self.profiles = defaultdict(list)
+        self.member_profiles = {}
+        self.release_specs = defaultdict(list)
+        self.materials = defaultdict(list)
+        self.truss_ids = []
+        self.support_nodes = defaultdict(list)
+        self.groups = {}
+        self.load_cases = {}
+        self.combinations = {}
+        self.skipped = []
+        self._snapshot = None
+
+    @property
+    def snapshot(self) -> ModelSnapshot:
+        if(self._snapshot is None):
+            self._snapshot = self._build_snapshot()
+        return self._snapshot
+
+    def _build_snapshot(self) -> ModelSnapshot:
+        count = len(self.nodes)
+        ids = np.fromiter(self.nodes.keys(), dtype=np.int32, count=count)
+        xyz = np.array(list(self.nodes.values()), dtype=np.float64).reshape(count, 3)
+        nodes = NodeSnapshot(ids, xyz[:, 0], xyz[:, 1], xyz[:, 2])
+
+        members = {no: ends for no, ends in self.members.items() if ends[0] in nodes.index and ends[1] in nodes.index}
+        member_ids = list(members)
+        start_rows = nodes.rows([ends[0] for ends in members.values()])
+        end_rows = nodes.rows([ends[1] for ends in members.values()])
+
+        # one table entry per distinct spec, refs numbered in file order; a member takes the
+        # spec of the last line naming it, as in STAAD, even when that spec first appeared earlier
+        code_of_spec = {key: code for code, key in enumerate(self.profiles)}
+        profile_table = [section_display_name(spec) for table, spec in self.profiles]
+        profile_codes = np.fromiter((code_of_spec[self.member_profiles[no]] if no in self.member_profiles else -1
+                                     for no in member_ids), dtype=np.int32, count=len(member_ids))
+        return ModelSnapshot(nodes, member_ids, start_rows, end_rows,
+                             profile_codes, profile_table, np.arange(1, len(profile_table) + 1))
+
+    def as_beams(self) -> BeamObjectView:
+        return self.snapshot.as_beams()
+
+    def group(self, name: str) -> list:
+        name = name.upper() if name.startswith('_') else '_' + name.upper()
+        return self.groups[name]['ids'] if name in self.groups else []
+
+    def primary_cases(self) -> list:
+        return list(self.load_cases)
+
+class _StdParser:
+    """State machine over std_statements; one handler per section, data statements go to the current one."""
+
+    def __init__(self, model: StdModel):
+        self.model = model
+        self.unit = None
+        self.section = None
+        self.load = None
+        self.load_mode = None
+        self.table = None
+        self.group_type = None
+
+    def run(self, source) -> StdModel:
+        handlers = {'joints': self.joint, 'members': self.member, 'supports': self.support,
+                    'releases': self.release, 'properties': self.property, 'constants': self.constant,
+                    'truss': self.truss, 'groups': self.group, 'load': self.load_data, 'comb': self.comb_data}
+        for line_no, statement in source:
+            first = statement[0]
+            if(first.isdigit() or first in '-._'):
+                handler = handlers.get(self.section)
+                if(handler is not None and handler(statement) is False):
+                    self.model.skipped.append((line_no, statement))
+            elif(self.keyword(statement, statement.upper()) is False):
+                self.model.skipped.append((line_no, statement))
+        self.resolve_all()
+        return self.model
+
+    def keyword(self, statement: str, upper: str):
+        if(upper.startswith('UNIT')):
+            self.unit = statement[4:].strip()
+            return
+        if(self.section == 'groups'):
+            return self.group(statement)
+        if(self.section == 'load' and not upper.startswith(LOAD_END_KEYWORDS + ('LOAD',))):
+            return self.load_keyword(statement, upper)
+        if(self.section == 'constants' and not upper.startswith(LOAD_END_KEYWORDS + ('LOAD',))):
+            return self.constant(statement)
+        if(upper.startswith('REPEAT') and self.section in ('joints', 'members')):
+            return False
+
+        self.section = 'other'
+        if(upper.startswith('JOINT COORD')):
+            self.section = 'joints'
+            self.model.unit = self.model.unit or self.unit
+        elif(upper.startswith('MEMBER INCI')):
+            self.section = 'members'
+        elif(upper.startswith('MEMBER PROP')):
+            self.section = 'properties'
+            words = statement[upper.index('PROP'):].split(None, 1)
+            self.table = words[1] if len(words) == 2 else None
+        elif(upper.startswith('MEMBER RELE')):
+            self.section = 'releases'
+        elif(upper.startswith('MEMBER TRUSS')):
+            self.section = 'truss'
+        elif(upper.startswith('SUPPORT')):
+            self.section = 'supports'
+        elif(upper.startswith('CONSTANT')):
+            self.section = 'constants'
+        elif(upper.startswith('START GROUP')):
+            self.section = 'groups'
+        elif(upper.startswith('LOAD COMB')):
+            return self.start_comb(statement)
+        elif(upper.startswith('LOAD') and not upper.startswith('LOAD LIST')):
+            return self.start_load(statement)
+
+    def joint(self, statement: str):
+        values = statement.split()
+        try:
+            if(len(values) == 4 or len(values) == 3):
+                self.model.nodes[int(values[0])] = (float(values[1]), float(values[2]), float(values[3]) if len(values) == 4 else 0.0)
+            elif(len(values) in (8, 9)):
+                # i1 x1 y1 z1 i2 x2 y2 z2 [increment]: joints between i1 and i2 evenly spaced
+                i1, i2 = int(values[0]), int(values[4])
+                step = int(values[8]) if len(values) == 9 else 1
+                start = [float(v) for v in values[1:4]]
+                end = [float(v) for v in values[5:8]]
+                count = (i2 - i1) // step
+                for k in range(count + 1):
+                    t = k / count if count else 0.0
+                    self.model.nodes[i1 + k * step] = tuple(a + (b - a) * t for a, b in zip(start, end))
+            else:
+                return False
+        except (ValueError, ZeroDivisionError):
+            return False
+
+    def member(self, statement: str):
+        values = statement.split()
+        try:
+            if(len(values) == 3):
+                self.model.members[int(values[0])] = (int(values[1]), int(values[2]))
+            elif(4 <= len(values) <= 6):
+                # m a b m2 [member increment [joint increment]]
+                member_no, a, b, last = (int(v) for v in values[:4])
+                member_step = int(values[4]) if len(values) > 4 else 1
+                joint_step = int(values[5]) if len(values) > 5 else 1
+                for k in range((last - member_no) // member_step + 1):
+                    self.model.members[member_no + k * member_step] = (a + k * joint_step, b + k * joint_step)
+            else:
+                return False
+        except (ValueError, ZeroDivisionError):
+            return False
+
+    def _ids_and_text(self, statement: str) -> tuple[list,str]:
+        tokens = statement.split()
+        ids, i = parse_ids(tokens, groups=self.model.groups)
+        return ids, ' '.join(tokens[i:])
+
+    def support(self, statement: str):
+        ids, text = self._ids_and_text(statement)
+        self.model.support_nodes[text].extend(ids)
+
+    def release(self, statement: str):
+        ids, text = self._ids_and_text(statement)
+        self.model.release_specs[text].extend(ids)
+
+    def property(self, statement: str):
+        ids, text = self._ids_and_text(statement)
+        if(not text):
+            return False
+        self.model.profiles[(self.table, text)].extend(ids)
+        self.model.member_profiles.update(dict.fromkeys(ids, (self.table, text)))
+
+    def truss(self, statement: str):
+        ids, _ = self._ids_and_text(statement)
+        self.model.truss_ids.extend(ids)
+
+    def constant(self, statement: str):
+        tokens = statement.split()
+        if(len(tokens) < 3 or tokens[0].upper() != 'MATERIAL'):
+            return
+        name = tokens[1]
+        if(tokens[2].upper() == 'ALL'):
+            self.model.materials[name].append('ALL')
+        elif(tokens[2].upper().startswith('MEM')):
+            self.model.materials[name].extend(parse_ids(tokens, 3, self.model.groups)[0])
+
+    def group(self, statement: str):
+        upper = statement.upper()
+        if(upper.startswith('END GROUP')):
+            self.section = 'other'
+        elif(statement[0] == '_'):
+            tokens = statement.split()
+            self.model.groups[tokens[0].upper()] = {'type': self.group_type, 'ids': parse_ids(tokens, 1)[0]}
+        elif(statement[0].isalpha()):
+            self.group_type = upper.split()[0]
+
+    def start_load(self, statement: str):
+        tokens = statement.split()
+        if(len(tokens) < 2 or not tokens[1].isdigit()):
+            return False
+        upper = statement.upper()
+        loadtype, title = 'None', ''
+        if(' TITLE ' in f"{upper} "):
+            title = statement[upper.index('TITLE') + 5:].strip()
+        if(len(tokens) > 3 and tokens[2].upper() == 'LOADTYPE'):
+            loadtype = tokens[3]
+        elif(not title):
+            title = ' '.join(tokens[2:])
+        self.section = 'load'
+        self.load_mode = None
+        self.load = self.model.load_cases[int(tokens[1])] = {
+            'title': title, 'loadtype': loadtype, 'unit': self.unit, 'selfweight': [],
+            'joint_loads': defaultdict(list), 'member_loads': defaultdict(list), 'repeat': [], 'other': []}
+
+    def start_comb(self, statement: str):
+        tokens = statement.split()
+        if(len(tokens) < 3 or not tokens[2].isdigit()):
+            return False
+        self.section = 'comb'
+        self.load = self.model.combinations[int(tokens[2])] = {'title': ' '.join(tokens[3:]), 'factors': {}}
+
+    def _pairs(self, statement: str, into) -> None:
+        values = statement.split()
+        for i in range(0, len(values) - 1, 2):
+            into(int(values[i]), float(values[i + 1]))
+
+    def comb_data(self, statement: str):
+        try:
+            self._pairs(statement, self.load['factors'].__setitem__)
+        except ValueError:
+            return False
+
+    def load_keyword(self, statement: str, upper: str):
+        if(upper.startswith('SELFWEIGHT')):
+            tokens = statement.split()
+            direction, factor, i = 'Y', -1.0, 1
+            if(i < len(tokens) and tokens[i].upper() in ('X', 'Y', 'Z')):
+                direction, i = tokens[i].upper(), i + 1
+            if(i < len(tokens)):
+                try:
+                    factor, i = float(tokens[i]), i + 1
+                except ValueError:
+                    pass
+            ids = parse_ids(tokens, i, self.model.groups)[0] if i < len(tokens) else []
+            self.load['selfweight'].append((direction, factor, ids or None))
+            self.load_mode = None
+        elif(upper.startswith('JOINT LOAD')):
+            self.load_mode = 'joint_loads'
+        elif(upper.startswith('MEMBER LOAD')):
+            self.load_mode = 'member_loads'
+        elif(upper.startswith('REPEAT LOAD')):
+            self.load_mode = 'repeat'
+        else:
+            self.load_mode = 'other'
+            self.load['other'].append(statement)
+
+    def load_data(self, statement: str):
+        if(self.load_mode in ('joint_loads', 'member_loads')):
+            ids, text = self._ids_and_text(statement)
+            self.load[self.load_mode][text].extend(ids)
+        elif(self.load_mode == 'repeat'):
+            try:
+                self._pairs(statement, lambda case, factor: self.load['repeat'].append((case, factor)))
+            except ValueError:
+                return False
+        elif(self.load_mode == 'other'):
+            self.load['other'].append(statement)
+        else:
+            return False
+
+    def resolve_all(self) -> None:
+        """MATERIAL ... ALL applies to every member; expanded once incidences are known."""
+        for name, ids in self.model.materials.items():
+            if('ALL' in ids):
+                self.model.materials[name] = list(self.model.members)
+
+def parse_std(source) -> StdModel:
+    """
+    Parse a STAAD input file into a StdModel in one streaming pass.
+
+    Args:
+        source: Path of the .std file, or an open text file / iterable of lines.
+
+    Example:
+        model = parse_std('archive/rev_C/ICPR_E-E.STD')
+        beams = model.as_beams()                # {member_no: Beam3D}, like get_beam_objects
+        model.snapshot.members_with_profile('WPB600X300X177.77')
+    """
+    if(isinstance(source, (str, os.PathLike))):
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            return _StdParser(StdModel(os.fspath(source))).run(std_statements(f))
+    if(isinstance(source, io.IOBase) or hasattr(source, '__iter__')):
+        return _StdParser(StdModel(getattr(source, 'name', None))).run(std_statements(source))
+    raise TypeError(f"Cannot read a STAAD input from {type(source).__name__}")
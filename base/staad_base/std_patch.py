@@ -0,0 +1,402 @@
+import os
+import re
+import shutil
+import tempfile
+from base.staad_base.std_writer import id_ranges, wrap_tokens
+from base.staad_base.std_parser import parse_ids
+
+class PatchContext:
+    """Where the patch pass is: section keyword, MEMBER PROPERTY table and PARAMETER block of the current statement."""
+
+    def __init__(self):
+        self.section = None
+        self.table = None
+        self.parameter = None
+        self.first_line = 0
+        self.last_line = 0
+
+    def enter(self, upper: str) -> None:
+        """Track the section a keyword statement opens; data statements keep the current one."""
+        if(upper.startswith('UNIT')):
+            return
+        if(upper.startswith('MEMBER PROP')):
+            self.section = 'MEMBER PROPERTY'
+        elif(upper.startswith('PARAMETER')):
+            self.section = 'PARAMETER'
+            words = upper.split()
+            self.parameter = int(words[1]) if len(words) > 1 and words[1].isdigit() else 1
+        elif(upper.startswith(('LOAD LIST', 'PERFORM', 'FINISH', 'CHANGE', 'START', 'LOAD '))):
+            self.section = upper.split()[0]
+            self.parameter = None
+        elif(self.parameter is None):
+            self.section = upper.split()[0]
+
+class StdEdit:
+    """
+    One structured change to a STAAD input.
+
+    The patch pass hands every statement (continuations joined) to statement();
+    returning None keeps it, a list of statements replaces it ([] drops it).
+    leave() may add statements where a section ends and finish() before FINISH.
+    Each edit counts its own hits; edits with none are reported as unmatched.
+    """
+
+    # sections whose data statements the edit wants to see; None for every statement
+    sections = None
+
+    def __init__(self):
+        self.hits = 0
+
+    def statement(self, context: PatchContext, text: str):
+        return None
+
+    def leave(self, context: PatchContext, section: str) -> list:
+        return []
+
+    def finish(self, context: PatchContext) -> list:
+        return []
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value!r}" for key, value in vars(self).items() if key != 'hits')
+        return f"{type(self).__name__}({fields})"
+
+class ReplaceStatement(StdEdit):
+    """Replace statements containing match with text (None deletes them); count=None for every occurrence."""
+
+    def __init__(self, match: str, text: str, count: int = 1):
+        super().__init__()
+        self.match = match
+        self.text = text
+        self.count = count
+
+    def statement(self, context, text):
+        if(self.match in text and (self.count is None or self.hits < self.count)):
+            self.hits += 1
+            return [] if self.text is None else [self.text]
+        return None
+
+class InsertStatements(StdEdit):
+    """Insert statements after (or before) statements starting with anchor, case-insensitively."""
+
+    def __init__(self, anchor: str, statements, before: bool = False, count: int = 1):
+        super().__init__()
+        self.anchor = anchor.upper()
+        self.statements = [*statements]
+        self.before = before
+        self.count = count
+
+    def statement(self, context, text):
+        if(text.upper().startswith(self.anchor) and (self.count is None or self.hits < self.count)):
+            self.hits += 1
+            return self.statements + [text] if self.before else [text] + self.statements
+        return None
+
+def load_list_text(cases) -> str:
+    return f"LOAD LIST {cases}" if isinstance(cases, str) else ' '.join(['LOAD LIST', *id_ranges(cases)])
+
+class LoadList(StdEdit):
+    """
+    Replace LOAD LIST statements, or insert one.
+
+    Args:
+        cases: Load case numbers, or the list text, e.g. 'ENV 2' or 'ALL'.
+        occurrence (int, optional): Replace only the n-th LOAD LIST (0 based); every one when None.
+        before (str, optional): Insert a new LOAD LIST before the first statement starting
+            with this, e.g. 'PARAMETER 2' or 'START CONCRETE DESIGN', instead of replacing.
+    """
+
+    def __init__(self, cases, occurrence: int = None, before: str = None):
+        super().__init__()
+        self.text = load_list_text(cases)
+        self.occurrence = occurrence
+        self.before = before.upper() if before else None
+        self.seen = 0
+
+    def statement(self, context, text):
+        upper = text.upper()
+        if(self.before is not None):
+            if(not self.hits and upper.startswith(self.before)):
+                self.hits += 1
+                return [self.text, text]
+            return None
+        if(upper.startswith('LOAD LIST')):
+            index = self.seen
+            self.seen += 1
+            if(self.occurrence is None or self.occurrence == index):
+                self.hits += 1
+                return [self.text]
+        return None
+
+class MemberProperty(StdEdit):
+    """
+    Give members a new section: their ids are taken out of the existing property lines
+    (lines left empty are dropped) and one line is added where MEMBER PROPERTY ends.
+
+    Args:
+        ids: Member numbers.
+        spec (str): e.g. 'TABLE ST ISMB300' or 'PRIS YD 1.2 ZD 0.8'.
+        table (str, optional): Property table of the header, e.g. 'INDIAN'.
+    """
+
+    sections = ('MEMBER PROPERTY',)
+
+    def __init__(self, ids, spec: str, table: str = None):
+        super().__init__()
+        self.ids = set(int(id) for id in ids)
+        self.spec = spec
+        self.table = table
+        self.done = False
+
+    def statement(self, context, text):
+        if(context.section != 'MEMBER PROPERTY' or not text[0].isdigit()):
+            return None
+        tokens = text.split()
+        ids, i = parse_ids(tokens)
+        kept = [id for id in ids if id not in self.ids]
+        if(len(kept) == len(ids)):
+            return None
+        self.hits += 1
+        return [' '.join([*id_ranges(kept), *tokens[i:]])] if kept else []
+
+    def leave(self, context, section):
+        if(section != 'MEMBER PROPERTY' or self.done):
+            return []
+        self.done = True
+        self.hits += 1
+        line = ' '.join([*id_ranges(self.ids), self.spec])
+        if(self.table != context.table):
+            return [f"MEMBER PROPERTY {self.table}" if self.table else 'MEMBER PROPERTY', line]
+        return [line]
+
+def design_parameter_text(parameter) -> str:
+    """'LZ 3 MEMB 15 TO 28' from ('LZ', 3, ids); strings pass through."""
+    if(isinstance(parameter, str)):
+        return parameter
+    name, value, ids = parameter
+    return ' '.join([name, str(value), 'MEMB', *id_ranges(ids)])
+
+class DesignParameters(StdEdit):
+    """
+    Add design parameters right after the CODE statement of a PARAMETER block.
+
+    Args:
+        parameters: Statements, or (name, value, member ids) tuples like ('LZ', 3, [15, 16]).
+        block (int, optional): PARAMETER block number; every block when None.
+    """
+
+    def __init__(self, parameters, block: int = None):
+        super().__init__()
+        self.parameters = [design_parameter_text(parameter) for parameter in parameters]
+        self.block = block
+        self.blocks_done = set()
+
+    def statement(self, context, text):
+        if(context.parameter is None or (self.block is not None and context.parameter != self.block)):
+            return None
+        if(context.parameter in self.blocks_done or not text.upper().startswith('CODE')):
+            return None
+        self.blocks_done.add(context.parameter)
+        self.hits += 1
+        return [text] + self.parameters
+
+class PerformAnalysis(StdEdit):
+    """
+    Set the options of PERFORM ANALYSIS statements, e.g. options='PRINT STATICS CHECK' or '' to turn printing off.
+
+    Args:
+        occurrence (int, optional): Only the n-th PERFORM ANALYSIS (0 based); every one when None.
+    """
+
+    def __init__(self, options: str = '', occurrence: int = None):
+        super().__init__()
+        self.options = options
+        self.occurrence = occurrence
+        self.seen = 0
+
+    def statement(self, context, text):
+        if(not text.upper().startswith('PERFORM ANALYSIS')):
+            return None
+        index = self.seen
+        self.seen += 1
+        if(self.occurrence is not None and self.occurrence != index):
+            return None
+        self.hits += 1
+        return [f"PERFORM ANALYSIS {self.options}".rstrip()]
+
+class PatchReport:
+    """
+    Outcome of patch_std.
+
+    Attributes:
+        changes (list): (first line, last line, edit, action) with 1-based line numbers of the
+            original file; action is 'replace', 'delete' or 'insert' (inserted before first line).
+        unmatched (list): Edits that found nothing to change.
+        written (bool): False for a dry run.
+    """
+
+    def __init__(self, path: str, dry_run: bool):
+        self.path = path
+        self.dry_run = dry_run
+        self.changes = []
+        self.unmatched = []
+        self.lines_in = 0
+        self.lines_out = 0
+        self.written = False
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def __str__(self):
+        lines = [f"{'Dry run on' if self.dry_run else 'Patched'} {self.path}: {len(self.changes)} changes"]
+        for first, last, edit, action in self.changes:
+            span = f"{first}" if first == last else f"{first}-{last}"
+            lines.append(f"  {action:<7} line {span:<12} {type(edit).__name__}")
+        lines.extend(f"  unmatched {edit!r}" for edit in self.unmatched)
+        return '\n'.join(lines)
+
+def _logical_lines(file):
+    """(first line no, last line no, raw lines, statement text); comments and blank lines come as text None."""
+    pending = []
+    first = 0
+    for line_no, line in enumerate(file, 1):
+        text = line.strip()
+        if(not pending):
+            first = line_no
+            if(not text or text[0] == '*'):
+                yield first, line_no, [line], None
+                continue
+        pending.append(line)
+        if(text and text[-1] == '-' and (len(text) == 1 or text[-2] == ' ')):
+            continue
+        parts = [raw.strip() for raw in pending]
+        yield first, line_no, pending, ' '.join([part[:-1].strip() for part in parts[:-1]] + parts[-1:])
+        pending = []
+    if(pending):
+        yield first, first + len(pending) - 1, pending, ' '.join(raw.strip()[:-1].strip() for raw in pending)
+
+class _Patcher:
+    def __init__(self, edits, report: PatchReport, width: int):
+        self.edits = [*edits]
+        self.report = report
+        self.width = width
+        self.context = PatchContext()
+        self.newline = '\n'
+
+    def _emit(self, out, statements) -> None:
+        for statement in statements:
+            # quoted names like 'ISMB 200' must not be broken across a continuation
+            for line in wrap_tokens(re.findall(r"'[^']*'|\S+", statement), self.width):
+                out.write(line + self.newline)
+                self.report.lines_out += 1
+
+    def _insert(self, out, first: int, edits_lines) -> None:
+        for edit, statements in edits_lines:
+            if(statements):
+                self.report.changes.append((first, first, edit, 'insert'))
+                self._emit(out, statements)
+
+    def run(self, source, out) -> None:
+        context = self.context
+        for first, last, lines, text in _logical_lines(source):
+            self.report.lines_in += len(lines)
+            if(first == 1 and lines[0].endswith('\r\n')):
+                self.newline = '\r\n'
+            if(text is None or not text):
+                out.write(''.join(lines))
+                self.report.lines_out += len(lines)
+                continue
+
+            head = text[0]
+            if(not (head.isdigit() or head in '-._')):
+                upper = text.upper()
+                section = context.section
+                context.enter(upper)
+                if(context.section != section and section is not None):
+                    self._insert(out, first, [(edit, edit.leave(context, section)) for edit in self.edits])
+                if(upper.startswith('MEMBER PROP')):
+                    words = text.split(None, 2)
+                    context.table = words[2] if len(words) == 3 else None
+                if(upper.startswith('FINISH')):
+                    self._insert(out, first, [(edit, edit.finish(context)) for edit in self.edits])
+                edits = self.edits
+            else:
+                edits = [edit for edit in self.edits if edit.sections is None or context.section in edit.sections]
+
+            context.first_line, context.last_line = first, last
+            statements = [text]
+            touched = []
+            for edit in edits:
+                result = []
+                changed = False
+                for statement in statements:
+                    replacement = edit.statement(context, statement)
+                    if(replacement is None):
+                        result.append(statement)
+                    else:
+                        result.extend(replacement)
+                        changed = True
+                if(changed):
+                    touched.append(edit)
+                    statements = result
+
+            if(not touched):
+                out.write(''.join(lines))
+                self.report.lines_out += len(lines)
+                continue
+            for edit in touched:
+                self.report.changes.append((first, last, edit, 'replace' if statements else 'delete'))
+            self._emit(out, statements)
+
+        # decks without FINISH still get what the edits hold back for the end
+        end = self.report.lines_in + 1
+        if(context.section != 'FINISH'):
+            self._insert(out, end, [(edit, edit.leave(context, context.section)) for edit in self.edits])
+            self._insert(out, end, [(edit, edit.finish(context)) for edit in self.edits])
+
+class _NullWriter:
+    def write(self, text):
+        pass
+
+def patch_std(path: str, edits, dry_run: bool = False, output: str = None, width: int = 79) -> PatchReport:
+    """
+    Apply several edits to a STAAD input in one streaming pass.
+
+    The file is read line by line and untouched lines are copied byte for byte, so
+    the cost does not depend on how many edits there are. The result goes to a
+    temporary file next to the target, which replaces it atomically only after the
+    pass succeeded. dry_run writes nothing and only reports the affected line ranges.
+
+    Example:
+        report = patch_std('rack.std', [LoadList('ENV 2', occurrence=0),
+                                        MemberProperty([37, 42], 'TABLE ST ISMB450', 'INDIAN'),
+                                        DesignParameters([('LZ', 3, [15, 16])], block=1),
+                                        PerformAnalysis('PRINT STATICS CHECK')], dry_run=True)
+        print(report)
+    """
+    target = os.fspath(output if output is not None else path)
+    report = PatchReport(os.fspath(path), dry_run)
+    patcher = _Patcher(edits, report, width)
+
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as source:
+        if(dry_run):
+            patcher.run(source, _NullWriter())
+        else:
+            directory = os.path.dirname(os.path.abspath(target))
+            handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(handle, 'w', encoding='utf-8', errors='surrogateescape', newline='') as out:
+                    patcher.run(source, out)
+                    out.flush()
+                    os.fsync(out.fileno())
+                if(report.changes or target != os.fspath(path)):
+                    shutil.copymode(path, temp_path)
+                    os.replace(temp_path, target)
+                    report.written = True
+                else:
+                    os.remove(temp_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+    report.unmatched = [edit for edit in patcher.edits if not edit.hits]
+    return report
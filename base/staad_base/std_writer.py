@@ -0,0 +1,380 @@
+import os
+from collections import defaultdict
+from base.geometry_base.point import Point3D
+from base.geometry_base.rectangle import Rectangle
+from base.geometry_base.circle import Circle
+from base.structural_elements.beam import Beam3D
+from base.load.nodal_load import NodalLoad
+from base.load.uniform_load import UniformLoad
+from base.load.conc_load import ConcentratedLoad
+from base.staad_base.load_enum import *
+from base.staad_base.helper import point_precision
+
+# order STAAD expects the input sections in; StdWriter refuses to go backwards
+STD_SECTIONS = ('header', 'JOINT COORDINATES', 'MEMBER INCIDENCES', 'SUPPORTS', 'MEMBER RELEASE',
+                'MEMBER PROPERTY', 'CONSTANTS', 'MEMBER TRUSS', 'LOAD', 'FINISH')
+
+def std_number(value) -> str:
+    """Shortest text for a value: 10 rather than 10.0, 413.05 rather than 413.0500000001."""
+    text = format(round(float(value), 6), '.10g')
+    return '0' if text == '-0' else text
+
+def id_ranges(ids) -> list[str]:
+    """Tokens of an id list with runs of three or more written as 'X TO Y', the way STAAD writes them."""
+    ids = sorted(set(int(id) for id in ids))
+    tokens = []
+    i = 0
+    while i < len(ids):
+        j = i
+        while j + 1 < len(ids) and ids[j + 1] == ids[j] + 1:
+            j += 1
+        if j - i >= 2:
+            tokens.extend((str(ids[i]), 'TO', str(ids[j])))
+        else:
+            tokens.extend(str(id) for id in ids[i:j + 1])
+        i = j + 1
+    return tokens
+
+def wrap_tokens(tokens, width: int = 79) -> list[str]:
+    """Physical lines of one statement, broken between tokens with STAAD's ' -' continuation to fit width."""
+    lines = []
+    line = ''
+    for token in tokens:
+        candidate = f"{line} {token}" if line else token
+        if(len(candidate) > width - 2 and line):
+            lines.append(line + ' -')
+            line = token
+        else:
+            line = candidate
+    if(line):
+        lines.append(line)
+    return lines
+
+def nodal_load_text(load_object: NodalLoad) -> str:
+    parts = [f"{name} {std_number(getattr(load_object, name))}" for name in ('FX', 'FY', 'FZ', 'MX', 'MY', 'MZ')
+             if getattr(load_object, name)]
+    return ' '.join(parts)
+
+def member_load_text(load_object) -> str:
+    """STAAD MEMBER LOAD line body for a UniformLoad or ConcentratedLoad, distances only when set."""
+    direction = MemberDirection(int(load_object.direction)).name
+    force = std_number(load_object.force_value)
+    if(isinstance(load_object, UniformLoad)):
+        distances = (load_object.d1_value, load_object.d2_value, load_object.d3_value)
+        distances = distances if distances[2] else distances[:2] if any(distances[:2]) else ()
+        return ' '.join(['UNI', direction, force, *map(std_number, distances)])
+    if(isinstance(load_object, ConcentratedLoad)):
+        distances = (load_object.d1_value,) + ((load_object.d2_value,) if load_object.d2_value else ())
+        return ' '.join(['CON', direction, force, *map(std_number, distances)])
+    raise TypeError(f"No STAAD member load text for {type(load_object).__name__}")
+
+def prismatic_text(shape) -> str:
+    if(isinstance(shape, Rectangle)):
+        return f"PRIS YD {std_number(shape.length)} ZD {std_number(shape.width)}"
+    if(isinstance(shape, Circle)):
+        return f"PRIS YD {std_number(shape.radius)}"
+    raise TypeError(f"No prismatic property for {type(shape).__name__}")
+
+class StdWriter:
+    """Streams a STAAD input file section by section.
+
+    Every section method takes an iterable and writes it as it is consumed, so a
+    model is never held as text; id lists are compacted to 'X TO Y' and wrapped at
+    `width` with STAAD's ' -' continuation. Sections must come in STD_SECTIONS order.
+
+    Example:
+        with StdWriter('rack.std') as std:
+            std.header(unit='METER KN')
+            std.joints(nodes)            # (node_no, x, y, z)
+            std.members(members)         # (member_no, start_node, end_node)
+            std.supports([(support_nodes, 'FIXED')])
+            std.load(401, 'OPERATING', member_loads={'UNI GY -2': [37, 42, 47]})
+    """
+
+    def __init__(self, target, width: int = 79):
+        self.width = width
+        self._owns = isinstance(target, (str, os.PathLike))
+        self.file = open(target, 'w', encoding='utf-8', newline='\n') if self._owns else target
+        self.path = target if self._owns else getattr(target, 'name', None)
+        self._section = -1
+        self.lines = 0
+
+    def _write(self, line: str) -> None:
+        self.file.write(line + '\n')
+        self.lines += 1
+
+    def _enter(self, name: str, title: str = None) -> None:
+        index = STD_SECTIONS.index(name)
+        if(index < self._section):
+            raise ValueError(f"{name} must come before {STD_SECTIONS[self._section]} in a STAAD input file")
+        if(title is not None and (index != self._section or name == 'MEMBER PROPERTY')):
+            self._write(title)
+        self._section = index
+
+    def _wrapped(self, tokens, suffix: str = '') -> None:
+        """One logical line of tokens (+ suffix), split with ' -' continuations to fit width."""
+        for line in wrap_tokens(list(tokens) + ([suffix] if suffix else []), self.width):
+            self._write(line)
+
+    def _packed(self, entries) -> None:
+        """'a b c; d e f;' entries packed into lines of at most width characters."""
+        line = ''
+        for entry in entries:
+            candidate = f"{line} {entry};" if line else f"{entry};"
+            if(len(candidate) > self.width and line):
+                self._write(line)
+                line = f"{entry};"
+            else:
+                line = candidate
+        if(line):
+            self._write(line)
+
+    def header(self, unit: str = 'METER KN', job: dict = None) -> None:
+        self._enter('header')
+        self._write('STAAD SPACE')
+        if(job):
+            self._write('START JOB INFORMATION')
+            for key, value in job.items():
+                self._write(f"{key.upper()} {value}")
+            self._write('END JOB INFORMATION')
+        self._write(f"INPUT WIDTH {self.width}")
+        self._write(f"UNIT {unit}")
+
+    def joints(self, rows) -> None:
+        self._enter('JOINT COORDINATES', 'JOINT COORDINATES')
+        self._packed(f"{int(no)} {std_number(x)} {std_number(y)} {std_number(z)}" for no, x, y, z in rows)
+
+    def members(self, rows) -> None:
+        self._enter('MEMBER INCIDENCES', 'MEMBER INCIDENCES')
+        self._packed(f"{int(no)} {int(a)} {int(b)}" for no, a, b in rows)
+
+    def supports(self, groups) -> None:
+        """groups: (node ids, 'FIXED' / 'PINNED' / ...)."""
+        self._enter('SUPPORTS', 'SUPPORTS')
+        for ids, support in groups:
+            self._wrapped(id_ranges(ids), support)
+
+    def releases(self, groups) -> None:
+        """groups: (member ids, 'START MY MZ' / 'END MY MZ' / ...)."""
+        self._enter('MEMBER RELEASE', 'MEMBER RELEASE')
+        for ids, release in groups:
+            self._wrapped(id_ranges(ids), release)
+
+    def properties(self, groups) -> None:
+        """groups: (table or None, member ids, 'TABLE ST ISMB300' / 'PRIS YD 1.2 ZD 0.8'), one header per table."""
+        table_of_last = ()
+        for table, ids, spec in groups:
+            if(table != table_of_last):
+                self._enter('MEMBER PROPERTY', f"MEMBER PROPERTY {table}" if table else 'MEMBER PROPERTY')
+                table_of_last = table
+            self._wrapped(id_ranges(ids), spec)
+
+    def constants(self, materials) -> None:
+        """materials: (material name, member ids)."""
+        self._enter('CONSTANTS', 'CONSTANTS')
+        for name, ids in materials:
+            self._wrapped(['MATERIAL', name, 'MEMB', *id_ranges(ids)])
+
+    def truss(self, ids) -> None:
+        self._enter('MEMBER TRUSS', 'MEMBER TRUSS')
+        self._wrapped(id_ranges(ids))
+
+    def load(self, case: int, title: str = '', loadtype: str = 'None', selfweight=(), joint_loads=None, member_loads=None) -> None:
+        """
+        One primary load case.
+
+        Args:
+            selfweight: (direction, factor, member ids or None for the whole model).
+            joint_loads (dict): load text, e.g. 'FY -3.16' -> node ids.
+            member_loads (dict): load text, e.g. 'UNI GY -0.2' -> member ids.
+        """
+        self._enter('LOAD')
+        self._write(f"LOAD {int(case)} LOADTYPE {loadtype}  TITLE {title}".rstrip())
+        for direction, factor, ids in selfweight:
+            direction = direction.name if isinstance(direction, MemberDirection) else direction
+            if(ids):
+                self._wrapped(['SELFWEIGHT', direction, std_number(factor), 'LIST', *id_ranges(ids)])
+            else:
+                self._write(f"SELFWEIGHT {direction} {std_number(factor)}")
+        if(joint_loads):
+            self._write('JOINT LOAD')
+            for text, ids in joint_loads.items():
+                self._wrapped(id_ranges(ids), text)
+        if(member_loads):
+            self._write('MEMBER LOAD')
+            for text, ids in member_loads.items():
+                self._wrapped(id_ranges(ids), text)
+
+    def raw(self, lines) -> None:
+        """Lines written as given, e.g. a DEFINE MATERIAL block or analysis commands."""
+        for line in lines:
+            self._write(line)
+
+    def finish(self) -> None:
+        if(self._section < STD_SECTIONS.index('FINISH')):
+            self._enter('FINISH')
+            self._write('FINISH')
+
+    def close(self) -> None:
+        if(self._owns):
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if(exc_type is None):
+            self.finish()
+        self.close()
+
+def _release_end(release: str):
+    """'START' / 'END' of a release spec, None for one on both ends."""
+    word = release.split()[0].upper() if release.split() else ''
+    return word if word in ('START', 'END') else None
+
+class StdModelBuilder:
+    """Numbers the members of a generated piperack locally and writes them as one .std file.
+
+    The notebook calls keep their shape: add_beams returns the member numbers at
+    once (nodes deduplicated on coordinates rounded to point_precision), and profiles,
+    releases, materials, supports and loads are recorded against those numbers.
+    write() streams the model through StdWriter; open it in STAAD with
+    openSTAAD.OpenSTAADFile(path) instead of issuing the calls one by one.
+    """
+
+    def __init__(self, first_node: int = 1, first_member: int = 1):
+        self.nodes = {}
+        self.members = []
+        self.next_node = first_node
+        self.first_member = first_member
+        self.profiles = defaultdict(list)
+        self.release_specs = defaultdict(list)
+        self.materials = defaultdict(list)
+        self.truss_ids = []
+        self.support_nodes = defaultdict(list)
+        self.load_cases = {}
+
+    def node(self, point: Point3D) -> int:
+        point = round(point, point_precision)
+        key = (point.x, point.y, point.z)
+        node_no = self.nodes.get(key)
+        if(node_no is None):
+            node_no = self.nodes[key] = self.next_node
+            self.next_node += 1
+        return node_no
+
+    def add_beams(self, beams) -> list:
+        ids = []
+        for beam in beams:
+            if(beam is None or beam.start is None or beam.end is None):
+                ids.append(None)
+                continue
+            self.members.append((self.node(beam.start), self.node(beam.end)))
+            ids.append(self.first_member + len(self.members) - 1)
+        return ids
+
+    @staticmethod
+    def _assign(groups: defaultdict, key, ids, replaces=lambda other: True) -> None:
+        """
+        Put ids under key and take them out of every other group replaces(other_key) is true for,
+        so a member assigned again carries only its last value whatever order write() puts the lines in.
+        """
+        ids = [id for id in ids if id is not None]
+        if(not ids):
+            return
+        moved = set(ids)
+        for other in [other for other in groups if other != key and replaces(other)]:
+            kept = [id for id in groups[other] if id not in moved]
+            if(kept):
+                groups[other] = kept
+            else:
+                del groups[other]
+        present = set(groups[key])
+        groups[key].extend(id for id in dict.fromkeys(ids) if id not in present)
+
+    def profile(self, ids, spec: str, table: str = None) -> 'StdModelBuilder':
+        """spec like 'TABLE ST ISMB300' with table 'INDIAN', or a prismatic shape (Rectangle / Circle)."""
+        if(isinstance(spec, (Rectangle, Circle))):
+            spec, table = prismatic_text(spec), None
+        self._assign(self.profiles, (table, spec), ids)
+        return self
+
+    def release(self, ids, release: str = 'START MY MZ') -> 'StdModelBuilder':
+        """A release of one end replaces the earlier release of that end; one without START / END covers both."""
+        end = _release_end(release)
+        self._assign(self.release_specs, release, ids, lambda other: end is None or _release_end(other) in (None, end))
+        return self
+
+    def start_end_release(self, ids) -> 'StdModelBuilder':
+        ids = [*ids]
+        return self.release(ids, 'START MY MZ').release(ids, 'END MY MZ')
+
+    def material(self, ids, name: str = 'STEEL') -> 'StdModelBuilder':
+        self._assign(self.materials, name, ids)
+        return self
+
+    def truss(self, ids) -> 'StdModelBuilder':
+        self.truss_ids.extend(id for id in ids if id is not None)
+        return self
+
+    def support(self, nodes_or_points, support: str = 'FIXED') -> list:
+        nodes = [self.node(node) if isinstance(node, Point3D) else int(node) for node in nodes_or_points]
+        self._assign(self.support_nodes, support, nodes)
+        return nodes
+
+    def load_case(self, case: int, title: str = '', loadtype: str = 'None') -> dict:
+        case = int(case)
+        if(case not in self.load_cases):
+            title = title or (LoadCase(case).name if case in LoadCase._value2member_map_ else f"LOAD CASE {case}")
+            self.load_cases[case] = {'title': title, 'loadtype': loadtype, 'selfweight': [],
+                                     'joint_loads': defaultdict(list), 'member_loads': defaultdict(list)}
+        elif(title):
+            self.load_cases[case]['title'] = title
+        return self.load_cases[case]
+
+    def selfweight(self, case: int, direction=MemberDirection.Y, factor: float = -1, ids=None) -> 'StdModelBuilder':
+        self.load_case(case)['selfweight'].append((direction, factor, list(ids) if ids else None))
+        return self
+
+    def nodal_load(self, nodes_or_points, load_object: NodalLoad, case: int = None) -> 'StdModelBuilder':
+        text = nodal_load_text(load_object)
+        if(text):
+            nodes = [self.node(node) if isinstance(node, Point3D) else int(node) for node in nodes_or_points]
+            self.load_case(case if case is not None else load_object.load_case)['joint_loads'][text].extend(nodes)
+        return self
+
+    def member_load(self, beams, load_object, case: int = None) -> 'StdModelBuilder':
+        """Members by number or Beam3D with an id; the same load on many members becomes one line."""
+        ids = [beam.id if isinstance(beam, Beam3D) else int(beam) for beam in beams]
+        self.load_case(case if case is not None else load_object.load_case)['member_loads'][member_load_text(load_object)].extend(ids)
+        return self
+
+    def write(self, target, unit: str = 'METER KN', job: dict = None, width: int = 79, extra=()) -> StdWriter:
+        """Stream the model to target (path or text file); extra lines go before FINISH (e.g. PERFORM ANALYSIS)."""
+        with StdWriter(target, width) as std:
+            std.header(unit, job)
+            std.joints((node_no, *key) for key, node_no in self.nodes.items())
+            std.members((self.first_member + i, a, b) for i, (a, b) in enumerate(self.members))
+            if(self.support_nodes):
+                std.supports((ids, name) for name, ids in self.support_nodes.items())
+            if(self.release_specs):
+                std.releases((ids, release) for release, ids in self.release_specs.items())
+            if(self.profiles):
+                std.properties((table, ids, spec) for (table, spec), ids in sorted(self.profiles.items(), key=lambda item: str(item[0][0])))
+            if(self.materials):
+                std.constants(self.materials.items())
+            if(self.truss_ids):
+                std.truss(self.truss_ids)
+            for case, load in self.load_cases.items():
+                std.load(case, load['title'], load['loadtype'], load['selfweight'], load['joint_loads'], load['member_loads'])
+            std.raw(extra)
+        return std
+
+    def write_and_open(self, openSTAAD, path: str, **kwargs) -> bool:
+        """Write the model to path and load it into the running STAAD with a single OpenSTAADFile call."""
+        from base.staad_base.assignment import clear_assignment_ledger
+        path = os.path.abspath(path)
+        self.write(path, **kwargs)
+        # whatever was assigned to the model previously at path is gone
+        clear_assignment_ledger(path)
+        return openSTAAD.OpenSTAADFile(path)
@@ -0,0 +1,105 @@
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from base.staad_base.root import *
+
+class StaadWorker:
+    """A single-threaded apartment that owns the OpenSTAAD objects and runs queued calls in order.
+
+    Helpers keep their usual signature; the worker passes its own sub-object as the first
+    argument, so get_beam_nos(geometry) becomes worker.geometry(get_beam_nos).
+    Every submit returns a concurrent.futures.Future, and each *_async variant
+    awaits the same call from an asyncio loop (e.g. a Jupyter cell or Qt event loop).
+
+    Args:
+        connection (StaadConnection, optional): Connection manager, the shared one by default.
+    """
+
+    TARGETS = ('os', 'objects', 'geometry', 'load', 'property', 'output', 'design', 'support')
+
+    def __init__(self, connection: StaadConnection = None, name: str = 'openstaad-worker'):
+        self.connection = connection if connection is not None else get_connection()
+        self._queue = queue.Queue()
+        self._targets = {}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        os = self.connection.openSTAAD()
+        objects = OpenSTAAD_objects(geometry=os.Geometry, output=os.Output, load=os.Load,
+                                    property=os.Property, design=os.Design, support=os.Support)
+        self._targets = {'os': os, 'objects': objects, **vars(objects)}
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, target, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if target is None:
+                    future.set_result(fn(*args, **kwargs))
+                else:
+                    future.set_result(fn(self._targets[target], *args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        self.connection.close()
+
+    def submit(self, target: str, fn, *args, **kwargs) -> Future:
+        """Queue fn(<target object>, *args, **kwargs); target None calls fn(*args, **kwargs) on the worker thread."""
+        if target is not None and target not in self.TARGETS:
+            raise ValueError(f"Unknown OpenSTAAD target '{target}', expected one of {self.TARGETS}")
+        if not self._thread.is_alive():
+            raise RuntimeError("StaadWorker has been shut down")
+        future = Future()
+        self._queue.put((future, target, fn, args, kwargs))
+        return future
+
+    async def run(self, target: str, fn, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(target, fn, *args, **kwargs))
+
+    def geometry(self, fn, *args, **kwargs) -> Future:
+        return self.submit('geometry', fn, *args, **kwargs)
+
+    def load(self, fn, *args, **kwargs) -> Future:
+        return self.submit('load', fn, *args, **kwargs)
+
+    def property(self, fn, *args, **kwargs) -> Future:
+        return self.submit('property', fn, *args, **kwargs)
+
+    def output(self, fn, *args, **kwargs) -> Future:
+        return self.submit('output', fn, *args, **kwargs)
+
+    def objects(self, fn, *args, **kwargs) -> Future:
+        """For helpers taking the whole OpenSTAAD_objects, e.g. convert_force_operation."""
+        return self.submit('objects', fn, *args, **kwargs)
+
+    async def geometry_async(self, fn, *args, **kwargs):
+        return await self.run('geometry', fn, *args, **kwargs)
+
+    async def load_async(self, fn, *args, **kwargs):
+        return await self.run('load', fn, *args, **kwargs)
+
+    async def property_async(self, fn, *args, **kwargs):
+        return await self.run('property', fn, *args, **kwargs)
+
+    async def output_async(self, fn, *args, **kwargs):
+        return await self.run('output', fn, *args, **kwargs)
+
+    async def objects_async(self, fn, *args, **kwargs):
+        return await self.run('objects', fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Finish the queued calls, release the worker's connection and stop the thread."""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()